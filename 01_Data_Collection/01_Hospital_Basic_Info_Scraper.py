@@ -1,102 +1,168 @@
-import requests
 import pandas as pd
-import xml.etree.ElementTree as ET
-import time
 import os
+import sys
 from urllib.parse import unquote
 from dotenv import load_dotenv
-from rapidfuzz import process, fuzz  # pip install rapidfuzz
+from rapidfuzz import fuzz  # pip install rapidfuzz
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.response_cache import ResponseCache
+from common.xml_stream import ResponseStream
+from common.delta import combine_deltas, diff_snapshots, read_snapshot
+from common.api_client import ApiClient
+from common.fetch_engine import TokenBucket
+from common.paginator import fetch_all_pages
+from common.match_index import MatchIndex
+from common.metrics import count, stage_report, step
 
 # 1. 설정
 load_dotenv()
 api_key = unquote(os.getenv("DATA_GO_KR_API_KEY"))  # 인코딩된 키일 경우 디코딩
-url = "http://apis.data.go.kr/B551182/hospInfoServicev2/getHospBasisList"
+url = os.getenv("HIRA_BASIC_API_URL", "http://apis.data.go.kr/B551182/hospInfoServicev2/getHospBasisList")
+
+# 수집할 종별코드 (01: 상급종합병원, 11: 종합병원, 21: 병원, 28: 요양병원, 29: 정신병원, 31: 의원)
+CL_CODES = os.getenv("HOSP_CL_CODES", "01,11,21,28,29,31").split(',')
+NUM_ROWS = 1000
+CONCURRENCY = int(os.getenv("BASIC_API_CONCURRENCY", 4))
+RATE_PER_SEC = float(os.getenv("BASIC_API_RATE_PER_SEC", 10))
+
+client = ApiClient(pool_size=CONCURRENCY)
+stage_report().attach_api(client.metrics)  # 실행 리포트에 엔드포인트별 응답시간 분포/오류 포함
+limiter = TokenBucket(RATE_PER_SEC)
+
+# 응답 캐시 (목록은 자주 바뀌므로 하루 단위로 갱신)
+CACHE_TTL_HOURS = float(os.getenv("BASIC_CACHE_TTL_HOURS", 24))
+cache = ResponseCache(ttl_seconds=CACHE_TTL_HOURS * 3600)
+purged = cache.purge_expired(url)  # 만료 항목은 다시 조회하므로 시작할 때 정리
+if purged:
+    print(f"만료된 캐시 {purged}건 삭제")
 
 
 # 2. 수집 함수 정의
-def get_hospital_list(page_no, num_rows=1000):
+def get_hospital_list(cl_cd, page_no, num_rows=NUM_ROWS):
+    """
+    한 페이지를 조회하여 (병원 목록, totalCount)를 반환.
+    일시적 오류는 ApiClient가 재시도하고, 최종 실패는 ApiError로 올라옵니다.
+    """
     params = {
         'ServiceKey': api_key,
         'pageNo': page_no,
         'numOfRows': num_rows,
-        'clCd': '01',  # 상급종합병원 (필요에 따라 11, 21 등 추가)
+        'clCd': cl_cd,
     }
 
-    try:
-        resp = requests.get(url, params=params, timeout=10)
-        if resp.status_code == 200:
-            root = ET.fromstring(resp.text)
-            items = root.findall(".//item")
-
-            data_list = []
-            for item in items:
-                data_list.append({
-                    'ykiho': item.findtext('ykiho'),  # 암호화된 요양기호
-                    'yadmNm': item.findtext('yadmNm'),  # 병원명
-                    'sgguCdNm': item.findtext('sgguCdNm'),  # 시군구명
-                    'addr': item.findtext('addr'),  # 주소
-                    'clCdNm': item.findtext('clCdNm')  # 종별코드명
-                })
-            return data_list
-        else:
-            print(f"API Error Code: {resp.status_code}")
-            return None
-    except Exception as e:
-        print(f"Error on page {page_no}: {e}")
-        return None
-
-
-# 3. 데이터 수집 실행
+    body = cache.get(url, params)
+    from_cache = body is not None
+    if not from_cache:
+        body = client.get(url, params, limiter=limiter)
+
+    stream = ResponseStream(body)
+    data_list = []
+    for item in stream:
+        data_list.append({
+            'ykiho': item.get('ykiho'),  # 암호화된 요양기호
+            'yadmNm': item.get('yadmNm'),  # 병원명
+            'sgguCdNm': item.get('sgguCdNm'),  # 시군구명
+            'addr': item.get('addr'),  # 주소
+            'clCd': item.get('clCd') or cl_cd,  # 종별코드
+            'clCdNm': item.get('clCdNm')  # 종별코드명
+        })
+
+    if not from_cache:
+        cache.set(url, params, body, negative=not data_list)
+
+    total_count = stream.total_count or 0
+    return data_list, total_count
+
+
+# 3. 데이터 수집 실행 (종별코드마다 totalCount 기준으로 전체 페이지 수집)
 all_hospitals = []
-max_pages = 10  # 예시 (실제 데이터 양에 맞춰 조절)
-
-print("병원 기본 정보를 수집합니다...")
-for page in range(1, max_pages + 1):
-    data = get_hospital_list(page)
-    if data:
-        all_hospitals.extend(data)
-        if page % 5 == 0:
-            print(f"{page}페이지 완료...")
-    else:
-        print(f"{page}페이지에서 데이터가 없거나 에러가 발생하여 종료합니다.")
-        break
-    time.sleep(0.1)
+incomplete = []
+
+print(f"병원 기본 정보를 수집합니다... (종별코드: {', '.join(CL_CODES)})")
+with step('fetch_basic_info', rows_in=len(CL_CODES)) as s:
+    for cl_cd in CL_CODES:
+        try:
+            # 재시도는 ApiClient가 담당
+            rows, total_count, failed_pages = fetch_all_pages(
+                lambda page_no: get_hospital_list(cl_cd, page_no), NUM_ROWS, max_workers=CONCURRENCY, retries=0
+            )
+        except Exception as e:
+            print(f"❌ 종별코드 {cl_cd}: 첫 페이지 조회 실패 ({e})")
+            incomplete.append(cl_cd)
+            continue
+
+        all_hospitals.extend(rows)
+        print(f"종별코드 {cl_cd}: {len(rows)}/{total_count}건")
+        if failed_pages or len(rows) < total_count:
+            print(f"⚠️ 종별코드 {cl_cd}: 재시도 후에도 실패한 페이지 {failed_pages}")
+            incomplete.append(cl_cd)
+            count('failed_pages', len(failed_pages))
+    s['rows_out'] = len(all_hospitals)
+count('incomplete_cl_codes', len(incomplete))
+
+client.metrics.print_summary()
 
 df_hospitals = pd.DataFrame(all_hospitals)
 print(f"수집된 병원 수: {len(df_hospitals)}건")
 
-# 4. 결과 저장
+# 4. 결과 저장 (이전 스냅샷과 비교하여 변경분 기록)
 output_path = '../data/raw/hospital_basic_info.csv'
+delta_path = '../data/raw/hospital_basic_delta.csv'
 os.makedirs(os.path.dirname(output_path), exist_ok=True)
-df_hospitals.to_csv(output_path, index=False, encoding='utf-8-sig')
+
+if incomplete:
+    # 일부 누락된 목록으로 스냅샷을 덮어쓰면 누락분이 '삭제'로 잘못 기록되므로 갱신하지 않음
+    print(f"⚠️ 수집이 완전하지 않아 스냅샷을 갱신하지 않습니다. (종별코드: {incomplete})")
+elif not df_hospitals.empty:
+    df_prev = read_snapshot(output_path, dtype=str)
+    df_delta = diff_snapshots(df_prev, df_hospitals, key='ykiho')
+    print(f"변경 내역: {df_delta['change'].value_counts().to_dict()}")
+
+    # 상세 수집이 아직 반영하지 않은 이전 변경 내역에 누적 (상세 수집 전에 다시 실행해도 누락되지 않도록)
+    df_pending = read_snapshot(delta_path, dtype=str)
+    df_delta = combine_deltas(df_pending, df_delta, key='ykiho')
+    df_delta.to_csv(delta_path, index=False, encoding='utf-8-sig')
+    print(f"상세 수집 대기: {len(df_delta)}개 병원 (저장 경로: {delta_path})")
+
+    df_hospitals.to_csv(output_path, index=False, encoding='utf-8-sig')
 
 # 5. 유사도 검사 (내부 거래처 vs 공공데이터 병원명)
+# 매칭 인덱스에 저장된 결과를 재사용하고, 신규/변경 거래처만 다시 계산
+# (주소의 시군구가 같은 병원끼리만 비교하며 거래처별 상위 후보를 점수와 함께 저장)
 client_file = '../data/raw/client_list.csv'
+manual_match_file = '../data/raw/manual_matches.csv'  # 담당자가 확정한 매칭 (client_name, ykiho)
+MATCH_TOP_K = int(os.getenv("MATCH_TOP_K", 5))
 
 if os.path.exists(client_file) and not df_hospitals.empty:
     print("\n[유사도 검사 시작]")
     df_clients = pd.read_csv(client_file)
 
-    # 비교 대상 병원명 리스트
-    public_names = df_hospitals['yadmNm'].tolist()
-
-    results = []
-
-    for client_name in df_clients['client_name']:  # 'client_name' 컬럼 가정
-        # 가장 유사한 상위 1개 추출
-        match = process.extractOne(client_name, public_names, scorer=fuzz.token_sort_ratio)
-        if match:
-            best_match, score, index = match
-            results.append({
-                'internal_name': client_name,
-                'public_name': best_match,
-                'score': score,
-                'ykiho': df_hospitals.iloc[index]['ykiho']
-            })
+    match_index = MatchIndex()
+    # 파일에서 지운 수동 매칭은 고정 해제 (파일이 없으면 모든 고정 해제)
+    pins = {}
+    if os.path.exists(manual_match_file):
+        df_manual = pd.read_csv(manual_match_file, dtype=str)
+        # 거래처명 또는 요양기호가 빈 행은 고정할 수 없으므로 제외 (공백만 있는 칸 포함)
+        df_manual = df_manual[['client_name', 'ykiho']].apply(lambda col: col.str.strip()).replace('', pd.NA)
+        blank = df_manual.isna().any(axis=1)
+        if blank.any():
+            print(f"⚠️ 수동 매칭 파일에서 거래처명/요양기호가 빈 {blank.sum()}행 제외: {manual_match_file}")
+        df_manual = df_manual[~blank]
+        pins = dict(zip(df_manual['client_name'], df_manual['ykiho']))
+    n_unpinned = match_index.sync_pins(pins)
+    if n_unpinned:
+        print(f"수동 매칭 해제: {n_unpinned}개 거래처 (다시 계산)")
+
+    with step('name_matching', rows_in=len(df_clients)) as s:
+        df_match, n_rescored = match_index.update(df_clients, df_hospitals, top_k=MATCH_TOP_K,
+                                                  scorer=fuzz.token_sort_ratio)
+        s['rows_out'] = len(df_match)
+    count('rescored_clients', n_rescored)
+    match_index.close()
 
-    df_match = pd.DataFrame(results)
     match_save_path = '../data/processed/name_similarity_check.csv'
     df_match.to_csv(match_save_path, index=False, encoding='utf-8-sig')
-    print(f"유사도 검사 완료. 저장 경로: {match_save_path}")
+    print(f"유사도 검사 완료 (재계산 {n_rescored}/{len(df_clients)}개 거래처, 후보 {MATCH_TOP_K}개). 저장 경로: {match_save_path}")
 else:
     print("\n거래처 파일이 없거나 수집된 데이터가 없어 유사도 검사를 건너뜁니다.")
\ No newline at end of file
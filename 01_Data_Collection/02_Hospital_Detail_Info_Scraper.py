@@ -1,11 +1,18 @@
 import pandas as pd
-import requests
-import xml.etree.ElementTree as ET
 from urllib.parse import unquote
-import time
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.api_client import ApiClient, ApiError
+from common.fetch_engine import TokenBucket, iter_concurrent
+from common.response_cache import ResponseCache
+from common.xml_stream import ParseError, ResponseStream
+from common.columnar_writer import ChunkedColumnarWriter
+from common.delta import CHANGE_CHANGED, CHANGE_NEW, CHANGE_REMOVED, merge_by_key, read_snapshot, write_snapshot
+from common.metrics import count, stage_report, step
+
 load_dotenv()
 api_key = unquote(os.getenv("DATA_GO_KR_API_KEY"))
 
@@ -18,61 +25,160 @@ API_TARGETS = {
     "facility_info": "getFcltyInfoList"  # 시설정보
 }
 
-BASE_URL = "http://apis.data.go.kr/B551182/hospInfoServicev2/"
+BASE_URL = os.getenv("HIRA_API_BASE_URL", "http://apis.data.go.kr/B551182/hospInfoServicev2/")
+
+# 수치형으로 저장할 태그 (나머지는 문자열)
+DETAIL_CONVERTERS = {
+    'ddt': int,  # 의사수
+    'mdeptSdrCnt': int,  # 전문과목별 전문의 수
+    'dgsbjtPrSdrCnt': int,  # 진료과목별 전문의 수
+    'cdiagDrCnt': int,  # 협진 의사수
+    'oftCnt': int,  # 장비대수
+}
+
+# 저장 형식 (csv 또는 parquet) 및 파일로 내보낼 청크 크기
+OUTPUT_FORMAT = os.getenv("SCRAPER_OUTPUT_FORMAT", "csv")
+CHUNK_ROWS = int(os.getenv("SCRAPER_CHUNK_ROWS", 50000))
+
+# 동시 요청 수 및 오퍼레이션별 초당 호출 한도 (공공데이터포털 트래픽 한도에 맞춰 조절)
+CONCURRENCY = int(os.getenv("DETAIL_API_CONCURRENCY", 8))
+RATE_PER_SEC = float(os.getenv("DETAIL_API_RATE_PER_SEC", 20))
+
+client = ApiClient(pool_size=CONCURRENCY, timeout=5)
+stage_report().attach_api(client.metrics)
+limiters = {key: TokenBucket(RATE_PER_SEC) for key in API_TARGETS}
+
+# 응답 캐시 (중단 후 재실행 시 캐시에 없는 요청만 호출)
+CACHE_TTL_HOURS = float(os.getenv("DETAIL_CACHE_TTL_HOURS", 24 * 7))
+cache = ResponseCache(ttl_seconds=CACHE_TTL_HOURS * 3600)
+purged = sum(cache.purge_expired(BASE_URL + operation) for operation in API_TARGETS.values())
+if purged:
+    print(f"만료된 캐시 {purged}건 삭제")
+
+# 수집 모드: incremental(기본, 변경된 병원만 수집 후 병합) / full(전체 재수집)
+COLLECT_MODE = os.getenv("COLLECT_MODE", "incremental")
 
 # 2. 요양기호 로드
 input_file = '../data/raw/hospital_basic_info.csv'
+delta_file = '../data/raw/hospital_basic_delta.csv'
+output_dir = '../data/raw'
 if not os.path.exists(input_file):
     raise FileNotFoundError("02번 스크립트를 먼저 실행하여 기본 정보를 수집하세요.")
 
-df_basic = pd.read_csv(input_file)
-target_ykiho_list = df_basic['ykiho'].unique()
-print(f"상세 정보 수집 대상: {len(target_ykiho_list)}개 병원")
+# 이전 상세 파일이 하나라도 없으면 병합할 기준이 없으므로 전체 수집
+has_previous = all(
+    os.path.exists(os.path.join(output_dir, f'hospital_detail_{key}.{OUTPUT_FORMAT}')) for key in API_TARGETS
+)
+incremental = COLLECT_MODE == "incremental" and os.path.exists(delta_file) and has_previous
+
+if incremental:
+    df_delta = pd.read_csv(delta_file, dtype=str)
+    target_ykiho_list = df_delta.loc[df_delta['change'] != CHANGE_REMOVED, 'ykiho'].unique()
+    changed_ykiho = set(df_delta.loc[df_delta['change'] == CHANGE_CHANGED, 'ykiho'])
+    replaced_ykiho = set(df_delta['ykiho'])  # 재수집 + 삭제 대상
+    print(f"[증분 모드] 상세 정보 수집 대상: {len(target_ykiho_list)}개 병원 "
+          f"(삭제: {len(replaced_ykiho) - len(target_ykiho_list)}개)")
+else:
+    df_basic = pd.read_csv(input_file)
+    target_ykiho_list = df_basic['ykiho'].unique()
+    changed_ykiho = set()
+    print(f"[전체 모드] 상세 정보 수집 대상: {len(target_ykiho_list)}개 병원")
 
 
 # 3. 수집 함수
-def fetch_detail(ykiho, operation):
+def parse_detail(body, ykiho):
+    # 모든 하위 태그를 딕셔너리로 변환 (식별자 ykiho 추가)
+    stream = ResponseStream(body, converters=DETAIL_CONVERTERS, extra={'ykiho': ykiho})
+    return stream, stream.rows()
+
+
+def fetch_detail(ykiho, operation, limiter):
+    """
+    상세 정보 조회. 실패 시 ApiError를 올려서 '데이터 없음'(빈 리스트)과 구분합니다.
+    """
     url = BASE_URL + operation
     params = {'ServiceKey': api_key, 'ykiho': ykiho, 'numOfRows': 100}
+
+    # 기본 정보가 바뀐 병원은 캐시를 무시하고 새로 조회
+    cached = None if ykiho in changed_ykiho else cache.get(url, params)
+    if cached is not None:
+        return parse_detail(cached, ykiho)[1]
+
+    # 오퍼레이션별 호출 제한 (캐시 적중 시에는 소모하지 않음)
+    body = client.get(url, params, limiter=limiter)
+    parsed_data = parse_detail(body, ykiho)[1]
+    cache.set(url, params, body, negative=not parsed_data)
+    return parsed_data
+
+
+def fetch_task(task):
+    """실패(API 오류, 깨진 응답 본문)는 예외 객체를 반환하여 전체 수집이 중단되지 않도록 합니다."""
+    ykiho, key = task
     try:
-        resp = requests.get(url, params=params, timeout=5)
-        if resp.status_code == 200:
-            root = ET.fromstring(resp.text)
-            items = root.findall('.//item')
-            parsed_data = []
-            for item in items:
-                # 모든 하위 태그를 딕셔너리로 변환
-                row = {child.tag: child.text for child in item}
-                row['ykiho'] = ykiho  # 식별자 추가
-                parsed_data.append(row)
-            return parsed_data
-        return []
-    except Exception:
-        return []
-
-
-# 4. 실행 루프
-results = {k: [] for k in API_TARGETS.keys()}
-
-print("상세 정보 수집 시작 (시간이 오래 걸릴 수 있습니다)...")
-
-for idx, ykiho in enumerate(target_ykiho_list):
-    for key, operation in API_TARGETS.items():
-        data = fetch_detail(ykiho, operation)
-        if data:
-            results[key].extend(data)
-
-    if (idx + 1) % 50 == 0:
-        print(f"진행률: {idx + 1}/{len(target_ykiho_list)}")
-    time.sleep(0.05)  # API 호출 제한 고려
-
-# 5. 저장
-output_dir = '../data/raw'
-for key, data_list in results.items():
-    if data_list:
-        df = pd.DataFrame(data_list)
-        save_name = os.path.join(output_dir, f'hospital_detail_{key}.csv')
-        df.to_csv(save_name, index=False, encoding='utf-8-sig')
-        print(f"저장 완료: {save_name} ({len(df)}건)")
+        return fetch_detail(ykiho, API_TARGETS[key], limiters[key])
+    except (ApiError, ParseError) as e:
+        return e
+
+
+# 4. 실행 루프 (병원 x 오퍼레이션 조합을 동시에 요청, 결과는 청크 단위로 바로 파일에 기록)
+# 증분 모드는 이번 수집분을 임시 파일에 쓴 뒤 기존 파일과 병합
+save_paths = {key: os.path.join(output_dir, f'hospital_detail_{key}.{OUTPUT_FORMAT}') for key in API_TARGETS}
+writers = {
+    key: ChunkedColumnarWriter(
+        path.replace(f'.{OUTPUT_FORMAT}', f'.new.{OUTPUT_FORMAT}') if incremental else path,
+        types=DETAIL_CONVERTERS, chunk_rows=CHUNK_ROWS,
+    )
+    for key, path in save_paths.items()
+}
+tasks = ((ykiho, key) for ykiho in target_ykiho_list for key in API_TARGETS)
+
+print(f"상세 정보 수집 시작 (동시 요청: {CONCURRENCY}, 오퍼레이션별 초당 {RATE_PER_SEC:g}건)...")
+
+# 실패한 병원은 다음 실행에서 다시 수집 (증분 모드에서는 기존 행을 유지)
+failed = {key: set() for key in API_TARGETS}
+
+with step('fetch_detail_info', rows_in=len(target_ykiho_list) * len(API_TARGETS)) as s:
+    for done, ((ykiho, key), data) in enumerate(iter_concurrent(fetch_task, tasks, CONCURRENCY), start=1):
+        if isinstance(data, (ApiError, ParseError)):
+            failed[key].add(ykiho)
+            count('parse_errors' if isinstance(data, ParseError) else 'api_errors')
+        elif data:
+            writers[key].write_rows(data)
+
+        if done % (50 * len(API_TARGETS)) == 0:
+            print(f"진행률: {done // len(API_TARGETS)}/{len(target_ykiho_list)}")
+    s['rows_out'] = sum(writer.rows_written for writer in writers.values())
+
+client.metrics.print_summary()
+
+# 5. 저장 (증분 모드는 기존 파일에 키 단위로 병합)
+for key, writer in writers.items():
+    count(f"rows_{key}", writer.rows_written)
+    if failed[key]:
+        print(f"⚠️ {key}: {len(failed[key])}개 병원 조회 실패 (다음 실행 시 재시도)")
+        count(f"failed_{key}", len(failed[key]))
+
+    writer.close()
+    save_name = save_paths[key]
+
+    if incremental:
+        df_new = read_snapshot(writer.path, dtype=str) if writer.rows_written else pd.DataFrame(columns=['ykiho'])
+        df = merge_by_key(read_snapshot(save_name, dtype=str), df_new, key='ykiho',
+                          replaced_keys=replaced_ykiho - failed[key])
+        write_snapshot(df, save_name)
+        if os.path.exists(writer.path):
+            os.remove(writer.path)
+        print(f"저장 완료: {save_name} ({len(df)}건, 이번 수집 {writer.rows_written}건)")
+    elif writer.rows_written:
+        print(f"저장 완료: {save_name} ({writer.rows_written}건)")
     else:
-        print(f"데이터 없음: {key}")
\ No newline at end of file
+        print(f"데이터 없음: {key}")
+
+# 6. 반영한 변경 내역 정리 (조회에 실패한 병원만 남겨 다음 실행에서 다시 수집)
+retry_ykiho = set().union(*failed.values())
+if incremental:
+    df_remaining = df_delta[df_delta['ykiho'].isin(retry_ykiho)]
+else:
+    df_remaining = pd.DataFrame({'ykiho': sorted(retry_ykiho), 'change': CHANGE_NEW})
+df_remaining.to_csv(delta_file, index=False, encoding='utf-8-sig')
+print(f"변경 내역 반영 완료 (재수집 대기: {len(df_remaining)}개 병원)")
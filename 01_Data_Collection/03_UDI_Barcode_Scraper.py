@@ -1,13 +1,20 @@
 import pandas as pd
-import requests
 import ssl
 from urllib3 import poolmanager
 from requests.adapters import HTTPAdapter
-import xml.etree.ElementTree as ET
 import os
-import time
+import sys
 from dotenv import load_dotenv
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.response_cache import ResponseCache
+from common.xml_stream import ResponseStream, ParseError
+from common.columnar_writer import ChunkedColumnarWriter
+from common.api_client import ApiClient, ApiError
+from common.fetch_engine import TokenBucket, iter_concurrent
+from common.gtin import canonical_gtin, is_valid_check_digit
+from common.metrics import stage_report, step
+
 # 1. 환경 변수 로드
 load_dotenv()
 api_key = os.getenv("DATA_GO_KR_API_KEY")
@@ -24,9 +31,14 @@ class TLSAdapter(HTTPAdapter):
         self.poolmanager = poolmanager.PoolManager(*args, ssl_context=ctx, **kwargs)
 
 
-session = requests.session()
-adapter = TLSAdapter()
-session.mount("https://", adapter)
+# 동시 요청 수 및 초당 호출 한도 (공공데이터포털 트래픽 한도에 맞춰 조절)
+CONCURRENCY = int(os.getenv("UDI_API_CONCURRENCY", 8))
+RATE_PER_SEC = float(os.getenv("UDI_API_RATE_PER_SEC", 10))
+
+# 커넥션 풀 크기를 동시 요청 수에 맞춘 클라이언트 (TLSAdapter 재사용)
+client = ApiClient(pool_size=CONCURRENCY, adapter_cls=TLSAdapter)
+stage_report().attach_api(client.metrics)
+limiter = TokenBucket(RATE_PER_SEC)
 
 # 3. 데이터 로드 (수집 대상 바코드)
 # 상위 폴더의 data/raw 경로 참조
@@ -37,20 +49,47 @@ if not os.path.exists(input_path):
     # 테스트용 데이터 생성 (실제 사용 시 제거 가능)
     df = pd.DataFrame({'barcode': ['08800026300229', '08806125619033']})
 else:
-    df = pd.read_csv(input_path)
+    df = pd.read_csv(input_path, dtype={'barcode': str})  # 앞자리 0 유지
 
-target_barcodes = df['barcode'].unique()
-print(f"총 조회 대상: {len(target_barcodes)}건")
+# 13자리/14자리 표기를 14자리 GTIN으로 통일하고 중복 제거
+df['gtin'] = df['barcode'].map(canonical_gtin)
+invalid = df[df['gtin'].isna()]
+if not invalid.empty:
+    print(f"⚠️ GTIN 형식이 아닌 바코드 {len(invalid)}건 제외: {invalid['barcode'].head(5).tolist()}")
+target_barcodes = df['gtin'].dropna().unique()
 
-# 4. API 설정
-url = 'https://apis.data.go.kr/1471000/MdrUdiSvc/getUdiInfo'
-results = []
-no_data_list = []
+bad_check = sum(not is_valid_check_digit(g) for g in target_barcodes)
+if bad_check:
+    print(f"⚠️ 체크 디지트가 맞지 않는 바코드 {bad_check}건 (조회는 진행)")
+print(f"총 조회 대상: {len(target_barcodes)}건 (원본 {len(df)}건에서 중복 제거)")
 
-print("데이터 수집을 시작합니다...")
+# 4. API 설정
+url = os.getenv("UDI_API_URL", 'https://apis.data.go.kr/1471000/MdrUdiSvc/getUdiInfo')
 
-# 5. 수집 루프
-for i, barcode in enumerate(target_barcodes):
+# 결과는 청크 단위로 바로 파일에 기록
+output_dir = '../data/raw'
+save_path = os.path.join(output_dir, 'udi_collection_result.csv')
+map_path = os.path.join(output_dir, 'udi_barcode_map.csv')
+retry_path = os.path.join(output_dir, 'udi_retry_barcodes.csv')  # API 오류로 조회하지 못한 바코드
+writer = ChunkedColumnarWriter(save_path, chunk_rows=int(os.getenv("SCRAPER_CHUNK_ROWS", 50000)))
+
+# 원본 바코드 → 정규화된 GTIN 매핑 (재고 데이터와 조인용)
+df[['barcode', 'gtin']].dropna().drop_duplicates().to_csv(map_path, index=False, encoding='utf-8-sig')
+
+# 응답 캐시 (제품 정보는 거의 바뀌지 않으므로 30일 유지, '데이터 없음'은 7일 후 재조회)
+CACHE_TTL_HOURS = float(os.getenv("UDI_CACHE_TTL_HOURS", 24 * 30))
+NEGATIVE_TTL_HOURS = float(os.getenv("UDI_NEGATIVE_TTL_HOURS", 24 * 7))
+cache = ResponseCache(ttl_seconds=CACHE_TTL_HOURS * 3600, negative_ttl_seconds=NEGATIVE_TTL_HOURS * 3600)
+purged = cache.purge_expired(url)  # 만료된 '데이터 없음' 항목 포함
+if purged:
+    print(f"만료된 캐시 {purged}건 삭제")
+
+
+def lookup_udi(barcode):
+    """
+    바코드 1건 조회. (결과 행 목록, 상태)를 반환 (오류 시 빈 목록)
+    상태: 'cache' (캐시 사용), 'api' (신규 조회), 'parse_error', 'api_error'
+    """
     params = {
         'serviceKey': api_key,  # Decoding 된 키 사용 (필요시 unquote 사용)
         'udi_di_code': barcode,
@@ -58,49 +97,77 @@ for i, barcode in enumerate(target_barcodes):
         'pageNo': 1
     }
 
-    try:
-        response = session.get(url, params=params, timeout=10)
+    body = cache.get(url, params)
+    status = 'cache' if body is not None else 'api'
 
-        # XML 파싱
+    if body is None:
         try:
-            root = ET.fromstring(response.content)
-            items = root.findall('.//item')
-
-            if items:
-                for item in items:
-                    data = {
-                        'barcode': barcode,
-                        'company_name': item.findtext('mnfcoNm'),  # 제조사
-                        'product_name': item.findtext('prductNm'),  # 제품명
-                        'model_name': item.findtext('mdlNm'),  # 모델명
-                        'storage_method': item.findtext('strgMthd')  # 보관방법
-                    }
-                    results.append(data)
-            else:
-                no_data_list.append(barcode)
-
-        except ET.ParseError:
+            body = client.get(url, params, limiter=limiter)  # 재시도/오류 응답 판별 포함
+        except ApiError as e:
+            print(f"API Error ({barcode}): {e}")
+            return [], 'api_error'
+
+    # XML 파싱
+    try:
+        stream = ResponseStream(body)
+        rows = [{
+            'barcode': barcode,
+            'company_name': item.get('mnfcoNm'),  # 제조사
+            'product_name': item.get('prductNm'),  # 제품명
+            'model_name': item.get('mdlNm'),  # 모델명
+            'storage_method': item.get('strgMthd')  # 보관방법
+        } for item in stream]
+    except ParseError:
+        return [], 'parse_error'
+
+    if status == 'api':
+        cache.set(url, params, body, negative=not rows)
+    return rows, status
+
+
+print(f"데이터 수집을 시작합니다... (동시 요청: {CONCURRENCY}, 초당 {RATE_PER_SEC:g}건)")
+
+# 5. 수집 루프
+no_data_list = []
+retry_list = []  # API 오류 바코드 (캐시되지 않으므로 다음 실행 시 다시 조회)
+counts = {'cache': 0, 'api': 0, 'parse_error': 0, 'api_error': 0}
+
+with step('fetch_udi', rows_in=len(target_barcodes)) as s:
+    for i, (barcode, (rows, status)) in enumerate(iter_concurrent(lookup_udi, target_barcodes, CONCURRENCY)):
+        counts[status] += 1
+
+        if status == 'api_error':
+            retry_list.append(barcode)
+        elif status == 'parse_error':
             print(f"XML Parsing Error: {barcode}")
             no_data_list.append(barcode)
+        elif rows:
+            writer.write_rows(rows)
+        else:
+            no_data_list.append(barcode)
 
-    except Exception as e:
-        print(f"Network Error ({barcode}): {e}")
-
-    # 진행상황 출력 (10건 단위)
-    if (i + 1) % 10 == 0:
-        print(f"진행 중... ({i + 1}/{len(target_barcodes)})")
+        # 진행상황 출력 (100건 단위)
+        if (i + 1) % 100 == 0:
+            print(f"진행 중... ({i + 1}/{len(target_barcodes)})")
+    s['rows_out'] = writer.rows_written
 
-    time.sleep(0.1)  # API 부하 방지
+client.metrics.print_summary()
+for status, n in counts.items():
+    stage_report().count(status, n)
 
 # 6. 결과 저장
-output_dir = '../data/raw'
-os.makedirs(output_dir, exist_ok=True)
+writer.close()
+
+# 재시도 목록: 실패가 있으면 기록, 없으면 이전 목록 삭제 (파이프라인이 목록 변경을 보고 다시 실행)
+if retry_list:
+    pd.DataFrame({'barcode': sorted(retry_list)}).to_csv(retry_path, index=False, encoding='utf-8-sig')
+    print(f"⚠️ API 오류 {len(retry_list)}건은 재시도 목록에 기록: {retry_path} (다음 실행 시 재시도)")
+elif os.path.exists(retry_path):
+    os.remove(retry_path)
 
-if results:
-    df_result = pd.DataFrame(results)
-    save_path = os.path.join(output_dir, 'udi_collection_result.csv')
-    df_result.to_csv(save_path, index=False, encoding='utf-8-sig')
+if writer.rows_written:
     print(f"✅ 수집 완료! 저장 경로: {save_path}")
-    print(f"데이터 있음: {len(df_result)}건, 없음: {len(no_data_list)}건")
+    print(f"데이터 있음: {writer.rows_written}건, 없음: {len(no_data_list)}건 "
+          f"(캐시 사용: {counts['cache']}건, 신규 조회: {counts['api']}건, 오류: {counts['api_error']}건)")
 else:
     print("수집된 데이터가 없습니다.")
\ No newline at end of file
@@ -1,6 +1,11 @@
 import pandas as pd
-import json
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.attributes import expand_attributes
+from common.metrics import step
+from common.storage import STORAGE_FORMAT, table_path, write_table
 
 # 1. 데이터 로드
 base_dir = '../data/raw'
@@ -15,51 +20,37 @@ else:
 print(f"원본 데이터 크기: {df.shape}")
 
 
-# 2. JSON 파싱 함수 (완전한 로직)
-def expand_attrs(row):
-    """
-    [{'name': 'Color', 'value': 'Red'}, ...] 형태의 문자열을
-    {'Color': 'Red'} 딕셔너리로 변환
-    """
-    if pd.isna(row) or row == '':
-        return {}
-
-    try:
-        # 문자열이면 JSON 로드, 리스트면 그대로 사용
-        data = json.loads(row) if isinstance(row, str) else row
-
-        if isinstance(data, list):
-            result = {}
-            for item in data:
-                # name과 value 키가 있는지 확인
-                if 'name' in item and 'value' in item:
-                    result[item['name']] = item['value']
-            return result
-        return {}
-
-    except (json.JSONDecodeError, TypeError):
-        return {}
-
-
-# 3. 적용 및 병합
+# 2. 적용 및 병합
+# 행마다 json.loads + pd.Series를 만드는 대신 묶어서 한 번에 파싱 후 전개
 if 'attributes' in df.columns:
     print("속성 파싱 중...")
-    attr_df = df['attributes'].apply(expand_attrs).apply(pd.Series)
+    with step('expand_attributes', rows_in=len(df)) as s:
+        attr_df = expand_attributes(df['attributes'])
+        s['rows_out'] = len(attr_df)
+        s['columns_out'] = attr_df.shape[1]
+
+    # 속성별 타입 지정
+    if 'Expiry' in attr_df.columns:
+        attr_df['Expiry'] = pd.to_datetime(attr_df['Expiry'], errors='coerce')
 
     # 원본과 병합
-    df_cleaned = pd.concat([df, attr_df], axis=1)
-    df_cleaned.drop(columns=['attributes'], inplace=True)
+    df_cleaned = pd.concat([df.drop(columns=['attributes']), attr_df], axis=1)
 else:
     df_cleaned = df.copy()
 
-# 4. 컬럼명 정제
+if 'quantity' in df_cleaned.columns:
+    df_cleaned['quantity'] = pd.to_numeric(df_cleaned['quantity'], errors='coerce').astype('Int64')
+
+# 3. 컬럼명 정제
 # 특수문자 제거 및 공백 제거
 df_cleaned.columns = df_cleaned.columns.str.replace('*', '', regex=False).str.strip()
 
-# 5. 저장
+# 4. 저장
 processed_dir = '../data/processed'
 os.makedirs(processed_dir, exist_ok=True)
-save_path = os.path.join(processed_dir, 'inventory_cleaned.csv')
+save_path = table_path('inventory_cleaned', processed_dir, STORAGE_FORMAT)
 
-df_cleaned.to_csv(save_path, index=False, encoding='utf-8-sig')
+# 날짜/정수 타입을 유지하도록 컬럼형 포맷으로 저장
+with step('write_table', rows_in=len(df_cleaned)):
+    write_table(df_cleaned, save_path)
 print(f"전처리 완료. 저장 경로: {save_path}")
\ No newline at end of file
@@ -1,16 +1,31 @@
-import pandas as pd
 import os
+import sys
 import glob
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.detail_transform import DETAIL_BATCH_ROWS, DETAIL_FILE_PREFIX, convert_detail_files, table_name
+from common.metrics import count, step
+from common.storage import STORAGE_FORMAT, export_excel, iter_batches, read_head, read_table, table_path, write_batches
+
 # 1. 경로 설정
 input_dir = '../data/raw'
 output_dir = '../data/processed'
+table_dir = os.path.join(output_dir, 'hospital_detail')
+basic_info_path = os.path.join(input_dir, 'hospital_basic_info.csv')
 os.makedirs(output_dir, exist_ok=True)
 
+# 파일 단위 동시 변환 프로세스 수, 작업자당 한 번에 읽는 행 수
+JOBS = int(os.getenv('DETAIL_TRANSFORM_JOBS') or os.cpu_count() or 1)
+BATCH_ROWS = int(os.getenv('DETAIL_TRANSFORM_BATCH_ROWS') or DETAIL_BATCH_ROWS)
+
+# 엑셀은 보고용 내보내기로만 생성 (EXPORT_EXCEL=1), 시트마다 앞의 EXCEL_MAX_ROWS행까지만
+EXPORT_EXCEL = os.getenv('EXPORT_EXCEL', '0') == '1'
+EXCEL_MAX_ROWS = int(os.getenv('EXCEL_MAX_ROWS', '100000'))
+
 # 2. 컬럼명 한글 매핑 (사용자 파일 기반 확장)
 col_map = {
     'ykiho': '암호화된 요양기호',
-    'yadmNm': '병원명',
+    'yadmNm': '출력명',
     'addr': '주소',
     'clCd': '종별코드',
     'clCdNm': '종별코드명',
@@ -19,41 +34,87 @@ col_map = {
     'ddt': '의사수',
     'mdeptSdrCnt': '전문과목별 전문의 수',
     'grade': '간호등급',
-    'gradeNm': '구분 코드명'
+    'typeCd': '구분 코드',
+    'gradeNm': '구분 코드명',
+    'oftCd': '장비코드',
+    'oftCdNm': '장비명',
+    'oftCnt': '장비대수',
+    'hghrSickbdCnt': '상급 입원실(병상수)',
+    'ptrmCnt': '수술실(병상수)'
+}
+
+# 병원명(출력명)을 붙일 테이블 (상세정보 응답에는 병원명이 없어 기본정보에서 가져옴)
+NAMED_TABLES = ('dgsbjt_info',)
+
+# 다른 테이블의 컬럼을 골라 만드는 테이블: 전문과목별 전문의 수는 진료과목 응답(mdeptSdrCnt)에 있음
+DERIVED_TABLES = {
+    'sdr_info': ('dgsbjt_info', ['암호화된 요양기호', '진료과목코드명', '전문과목별 전문의 수']),
 }
 
-# 3. 파일 병합 로직
-target_pattern = os.path.join(input_dir, "hospital_detail_*.csv")
-file_list = glob.glob(target_pattern)
 
-output_excel = os.path.join(output_dir, 'hospital_detail_combined.xlsx')
+def main():
+    # 3. 파일 변환 로직
+    # 수집 단계 출력(csv 또는 parquet, 증분 수집 임시 파일 .new.* 제외)
+    file_list = sorted(
+        path for ext in ('csv', 'parquet')
+        for path in glob.glob(os.path.join(input_dir, f"{DETAIL_FILE_PREFIX}*.{ext}"))
+        if '.new.' not in os.path.basename(path)
+    )
+    if not file_list:
+        print("처리할 파일이 없습니다.")
+        return
 
-if not file_list:
-    print("처리할 CSV 파일이 없습니다.")
-else:
-    print(f"총 {len(file_list)}개의 파일을 병합합니다.")
+    names = None
+    if os.path.exists(basic_info_path):
+        df_basic = read_table(basic_info_path, columns=['ykiho', 'yadmNm'], schema={'yadmNm': 'str'})
+        df_basic = df_basic.drop_duplicates('ykiho')
+        names = df_basic.set_index('ykiho')['yadmNm']
+    else:
+        print(f"⚠️ 병원 기본정보가 없어 출력명을 비워 둡니다: {basic_info_path}")
 
-    with pd.ExcelWriter(output_excel, engine='xlsxwriter') as writer:
-        for file_path in file_list:
-            # 파일명 파싱 (예: hospital_detail_equip_info.csv -> equip_info)
-            filename = os.path.basename(file_path)
-            sheet_name = filename.replace('hospital_detail_', '').replace('.csv', '')
+    print(f"총 {len(file_list)}개의 파일을 변환합니다. (프로세스 {min(JOBS, len(file_list))}개)")
+    tasks = [(path, table_path(table_name(path), table_dir, STORAGE_FORMAT), col_map, BATCH_ROWS,
+              names if table_name(path) in NAMED_TABLES else None)
+             for path in file_list]
+    outputs, rows = {}, {}
 
-            # 엑셀 시트 이름 길이 제한 (31자)
-            sheet_name = sheet_name[:31]
+    with step('convert_tables', rows_in=len(tasks)) as s:
+        for result in convert_detail_files(tasks, JOBS):
+            name = result['table']
+            if 'error' in result:
+                print(f"❌ 실패 ({name}): {result['error']}")
+                count('failed_tables')
+                continue
+            count(f"rows_{name}", result['rows'])
+            outputs[name], rows[name] = table_path(name, table_dir, STORAGE_FORMAT), result['rows']
+            print(f"✅ 테이블 생성: {name} (행: {result['rows']}, {result['seconds']}s)")
+            if result['retried']:
+                print(f"⚠️ {name}: 숫자가 아닌 값이 섞여 문자열로 저장한 컬럼 {result['retried']}")
 
-            try:
-                # 모든 데이터를 문자열로 읽어서 데이터 손실 방지
-                df = pd.read_csv(file_path, dtype=str)
+        # 파생 테이블 (원천 테이블을 배치 단위로 읽어 컬럼만 골라 기록, 같은 이름의 수집 결과가 있으면 그대로 사용)
+        for name, (source, columns) in DERIVED_TABLES.items():
+            if name in outputs or source not in outputs:
+                continue
+            outputs[name] = table_path(name, table_dir, STORAGE_FORMAT)
+            rows[name] = write_batches(iter_batches(outputs[source], columns=columns, batch_rows=BATCH_ROWS),
+                                       outputs[name])
+            print(f"✅ 테이블 생성: {name} (행: {rows[name]}, {source}에서 파생)")
+        s['rows_out'] = sum(rows.values())
 
-                # 컬럼명 변경
-                df.rename(columns=col_map, inplace=True)
+    # 4. 보고용 엑셀 (테이블별 앞부분만 읽어 기록)
+    if EXPORT_EXCEL and outputs:
+        output_excel = os.path.join(output_dir, 'hospital_detail_combined.xlsx')
+        tables = {name: read_head(path, EXCEL_MAX_ROWS) for name, path in sorted(outputs.items())}
+        with step('export_excel', rows_in=sum(len(df) for df in tables.values())):
+            export_excel(tables, output_excel, max_rows=EXCEL_MAX_ROWS)
+        for name in tables:
+            if rows[name] > len(tables[name]):
+                print(f"⚠️ 엑셀 시트 {name}: 전체 {rows[name]}행 중 앞의 {len(tables[name])}행만 기록")
+        print(f"보고용 엑셀 생성: {output_excel} (전체 데이터는 {table_dir})")
 
-                # 시트에 쓰기
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-                print(f"✅ 시트 생성: {sheet_name} (행: {len(df)})")
+    print(f"\n모든 작업 완료. 결과 폴더: {table_dir}")
 
-            except Exception as e:
-                print(f"❌ 실패 ({filename}): {e}")
 
-    print(f"\n모든 작업 완료. 결과 파일: {output_excel}")
\ No newline at end of file
+# 변환 작업자 프로세스가 이 스크립트를 다시 import해도 실행되지 않도록 (Windows spawn)
+if __name__ == '__main__':
+    main()
@@ -1,33 +1,38 @@
 /* 파일명: 02_Sales_Mart.sql
    설명: 제품별 매출 정보와 해당 제품을 사용하는 장비 정보를 매핑
+   대상: 내장 DuckDB 웨어하우스 전용 (03_SQL_Warehouse/04_Run_Warehouse.py로 실행).
+         hospital_id/sku_id 대리키와 dim_hospital/dim_sku는 common.warehouse의 적재 단계(Warehouse.load)가
+         만드는 테이블/컬럼이므로 외부 MySQL 스키마에서는 그대로 실행되지 않습니다.
+   비고: SKU 조인/집계는 정수 대리키(sku_id)로 수행 (product_equipment_mapping은 적재 시 중복 제거됨)
 */
 
 WITH Equipment_Mapping AS (
     -- 1. 제품(SKU)별 사용 가능한 장비 매핑
     SELECT
-        SKU,
+        sku_id,
         GROUP_CONCAT(DISTINCT 장비명 ORDER BY 장비명 SEPARATOR ', ') AS compatible_equipments,
         GROUP_CONCAT(DISTINCT 장비대분류명 ORDER BY 장비대분류명 SEPARATOR ', ') AS equipment_category
     FROM product_equipment_mapping -- (구: 장비정보)
-    GROUP BY SKU
+    GROUP BY sku_id
 ),
 
 Sales_Summary AS (
     -- 2. 제품별 평균 매입가 산출
     SELECT
-        제품_SKU AS SKU,
+        sku_id,
         제품_이름 AS product_name,
         AVG(`매입가 (vat.포함)`) AS avg_purchase_price
     FROM sales_transaction_data -- (구: 장비시약매칭 or 매출테이블)
-    GROUP BY 제품_SKU, 제품_이름
+    GROUP BY sku_id, 제품_이름
 )
 
 -- [최종] 매출 분석용 데이터셋
 SELECT
-    s.SKU,
+    k.sku AS SKU,
     s.product_name,
     s.avg_purchase_price,
     e.compatible_equipments,
     e.equipment_category
 FROM Sales_Summary s
-    LEFT JOIN Equipment_Mapping e ON s.SKU = e.SKU;
\ No newline at end of file
+    JOIN dim_sku k ON s.sku_id = k.sku_id
+    LEFT JOIN Equipment_Mapping e ON s.sku_id = e.sku_id;
@@ -1,23 +1,25 @@
 /* 파일명: 03_Equipment_Status.sql
    설명: SKU와 장비 모델명 간의 관계를 정제하고 유효 데이터 필터링
+   대상: 내장 DuckDB 웨어하우스 전용 (03_SQL_Warehouse/04_Run_Warehouse.py로 실행).
+         hospital_id/sku_id 대리키와 dim_hospital/dim_sku는 common.warehouse의 적재 단계(Warehouse.load)가
+         만드는 테이블/컬럼이므로 외부 MySQL 스키마에서는 그대로 실행되지 않습니다.
+   비고: sku_equipment_matching / equipment_list는 적재 시 한 번 중복 제거되므로
+         기존 Valid_SKU_Mapping(SELECT DISTINCT *) 단계 없이 바로 조인합니다 (결과 동일).
+         기존 client_equipment_status LEFT JOIN은 조회하는 컬럼이 없고 결과가 SELECT DISTINCT라
+         결과 행에 영향이 없었으므로 제거했습니다 (행만 늘려 DISTINCT 부담을 키웠음).
 */
 
-WITH Valid_SKU_Mapping AS (
-    -- 1. 중복 제거된 SKU-장비 매핑 테이블
-    SELECT DISTINCT * FROM sku_equipment_matching -- (구: sku매칭)
-),
-
-Equipment_Enrichment AS (
-    -- 2. 장비 대분류 정보 추가 및 특정 조건 필터링
+WITH Equipment_Enrichment AS (
+    -- 1. 장비 대분류 정보 추가 및 특정 조건 필터링
     SELECT DISTINCT
         m.장비대분류명 AS category,
         e.장비_SKU,
         e.장비명 AS model_name,
+        m.sku_id,
         m.SKU,
         e.제품명 AS product_name
     FROM equipment_list e
-        LEFT JOIN Valid_SKU_Mapping m USING(sku)
-        LEFT JOIN client_equipment_status s ON s.장비_SKU = m.장비_SKU
+        LEFT JOIN sku_equipment_matching m ON e.sku_id = m.sku_id -- (구: sku매칭)
     WHERE
         -- 특정 장비 제외 로직 (예: 구형 모델 필터링)
         NOT (e.장비명 = 'Legacy_Model_A' AND m.장비대분류명 = 'Urinalysis')
@@ -25,19 +27,23 @@ Equipment_Enrichment AS (
 ),
 
 Aggregated_Equipment AS (
-    -- 3. SKU별 장비 리스트 통합
+    -- 2. SKU별 장비 리스트 통합
     SELECT
-        SKU,
+        sku_id,
         GROUP_CONCAT(DISTINCT model_name ORDER BY model_name SEPARATOR ', ') AS model_list,
         GROUP_CONCAT(DISTINCT category ORDER BY category SEPARATOR ', ') AS category_list
     FROM Equipment_Enrichment
-    GROUP BY SKU
+    GROUP BY sku_id
 )
 
 -- [최종] 정제된 장비 마스터
 SELECT
-    base.*,
+    base.category,
+    base.장비_SKU,
+    base.model_name,
+    base.SKU,
+    base.product_name,
     agg.model_list,
     agg.category_list
 FROM Equipment_Enrichment base
-    JOIN Aggregated_Equipment agg USING(SKU);
\ No newline at end of file
+    JOIN Aggregated_Equipment agg ON base.sku_id = agg.sku_id;
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.metrics import count, step
+from common.storage import (ANALYSIS_MART_DIR, RAW_DIR, SCHEMAS, STORAGE_FORMAT, iter_batches, table_path,
+                            write_batches)
+from common.warehouse import MissingSourceError, Warehouse, find_source
+
+# 1. 설정
+sql_dir = os.path.dirname(os.path.abspath(__file__))
+
+# (SQL 파일, 저장할 마트 테이블명, 증분 갱신 키)
+# 키가 있는 마트는 원천 테이블의 키별 해시를 비교하여 바뀐 병원만 다시 계산
+MARTS = [
+    ('01_Hospital_Features.sql', 'hospital_features', 'ykiho'),
+    ('02_Sales_Mart.sql', 'sales_mart', None),
+    ('03_Equipment_Status.sql', 'equipment_status', None),
+    ('05_Hospital_Feature_Counts.sql', 'hospital_feature_counts', 'ykiho'),
+]
+
+# 빌드 모드: incremental(기본) | full (증분 상태를 무시하고 전체 재계산)
+WAREHOUSE_MODE = os.getenv('WAREHOUSE_MODE', 'incremental')
+
+# 기본은 메모리 DB. 파일 경로를 지정하면 원천 뷰가 남아 있어 직접 조회 가능
+WAREHOUSE_DB = os.getenv('WAREHOUSE_DB', ':memory:')
+
+# 2. 매출 이력 게시
+# 매출 시스템 내보내기(data/raw/Sales_Data.*)를 스키마를 적용해 분석 마트(RFM 입력)로 옮김.
+# 원천이 없으면 기존 분석 마트(또는 이전 엑셀 마트)의 Sales_Data를 그대로 사용합니다.
+sales_source = find_source('Sales_Data', source_dirs=(RAW_DIR,))
+if sales_source:
+    sales_path = table_path('Sales_Data', ANALYSIS_MART_DIR, STORAGE_FORMAT)
+    with step('publish_sales_data') as s:
+        s['rows_out'] = write_batches(iter_batches(sales_source, schema=SCHEMAS['Sales_Data']), sales_path,
+                                      schema=SCHEMAS['Sales_Data'])
+    print(f"✅ Sales_Data: {s['rows_out']}행 → {sales_path}")
+else:
+    print(f"원천 매출 이력이 없어 기존 분석 마트의 Sales_Data를 사용합니다: {os.path.join(RAW_DIR, 'Sales_Data.*')}")
+
+# 3. 마트 생성
+# 원천 테이블(상세정보 변환 결과, 내부 거래처/매출 테이블)을 DuckDB 뷰로 등록하고
+# MySQL 쿼리를 변환 실행하여 analysis_mart 폴더에 바로 저장
+warehouse = Warehouse(WAREHOUSE_DB)
+skipped, failed = [], []
+
+try:
+    for sql_file, mart_name, key in MARTS:
+        sql_path = os.path.join(sql_dir, sql_file)
+        start = time.perf_counter()
+        try:
+            with step(f"mart_{mart_name}") as s:
+                if key:
+                    path, n_rows, n_recomputed = warehouse.materialize_incremental(
+                        sql_path, mart_name, key, ANALYSIS_MART_DIR, full=(WAREHOUSE_MODE == 'full'))
+                    detail = '전체 재계산' if n_recomputed is None else f"재계산 {n_recomputed}건"
+                    s['recomputed'] = n_recomputed
+                else:
+                    path, n_rows = warehouse.materialize(sql_path, mart_name, ANALYSIS_MART_DIR)
+                    detail = '전체 재계산'
+                s['rows_out'] = n_rows
+            print(f"✅ {mart_name}: {n_rows}행, {detail} ({time.perf_counter() - start:.2f}s) → {path}")
+        except MissingSourceError as e:
+            print(f"⚠️ {sql_file} 건너뜀: {e}")
+            skipped.append(sql_file)
+            count('skipped_marts')
+        except Exception as e:
+            print(f"❌ {sql_file} 실행 실패: {e}")
+            failed.append(sql_file)
+            count('failed_marts')
+finally:
+    warehouse.close()
+
+# 4. 결과
+if skipped:
+    print(f"\n원천 테이블이 없어 건너뛴 마트: {', '.join(skipped)}")
+if failed:
+    print(f"❌ 실패한 마트: {', '.join(failed)}")
+    sys.exit(1)
+print(f"\n마트 생성 완료. 결과 폴더: {ANALYSIS_MART_DIR}")
@@ -0,0 +1,66 @@
+/* 파일명: 05_Hospital_Feature_Counts.sql
+   설명: 병원별 진료과목 의사 수, 장비 대수, 간호등급을 long 형식(병원, 항목, 코드, 값)으로 생성
+         01_Hospital_Features의 GROUP_CONCAT 문자열("내과(5), 정형외과(3)")을 다시 파싱하지 않고
+         전체 진료과목/장비 코드에 대한 희소 벡터(common.feature_vectors)로 바로 사용합니다.
+   대상: 내장 DuckDB 웨어하우스 전용 (03_SQL_Warehouse/04_Run_Warehouse.py로 실행).
+         hospital_id/sku_id 대리키와 dim_hospital/dim_sku는 common.warehouse의 적재 단계(Warehouse.load)가
+         만드는 테이블/컬럼이므로 외부 MySQL 스키마에서는 그대로 실행되지 않습니다.
+*/
+
+WITH Specialty_Counts AS (
+    -- 1. 진료과목코드별 의사 수
+    SELECT
+        hospital_id,
+        'specialty' AS feature,
+        진료과목코드 AS code,
+        MAX(진료과목코드명) AS code_name,
+        CAST(SUM(의사수) AS BIGINT) AS value
+    FROM hospital_detail_dgsbjt_info
+    WHERE 진료과목코드 IS NOT NULL
+    GROUP BY hospital_id, 진료과목코드
+),
+
+Equipment_Counts AS (
+    -- 2. 장비코드별 보유 대수
+    SELECT
+        hospital_id,
+        'equipment' AS feature,
+        장비코드 AS code,
+        MAX(장비명) AS code_name,
+        CAST(SUM(장비대수) AS BIGINT) AS value
+    FROM hospital_detail_equip_info
+    WHERE 장비코드 IS NOT NULL
+    GROUP BY hospital_id, 장비코드
+),
+
+Nursing_Grades AS (
+    -- 3. 구분 코드(병동 등)별 간호등급 (숫자가 아닌 등급은 제외)
+    SELECT
+        hospital_id,
+        'nursing_grade' AS feature,
+        `구분 코드` AS code,
+        MAX(`구분 코드명`) AS code_name,
+        CAST(MAX(TRY_CAST(간호등급 AS INTEGER)) AS BIGINT) AS value
+    FROM hospital_detail_nursing_info
+    WHERE `구분 코드` IS NOT NULL
+    GROUP BY hospital_id, `구분 코드`
+),
+
+Feature_Counts AS (
+    SELECT * FROM Specialty_Counts
+    UNION ALL
+    SELECT * FROM Equipment_Counts
+    UNION ALL
+    SELECT * FROM Nursing_Grades
+)
+
+-- [최종] 병원 × 코드 long 테이블 (값이 없는 항목은 행 없음 = 희소)
+SELECT
+    h.ykiho,
+    f.feature,
+    CAST(f.code AS VARCHAR) AS code,
+    f.code_name,
+    f.value
+FROM Feature_Counts f
+    JOIN dim_hospital h ON f.hospital_id = h.hospital_id
+WHERE f.value IS NOT NULL AND f.value <> 0;
@@ -3,8 +3,14 @@ import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 import os
+import sys
 import platform
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.metrics import step
+from common.rfm import DEFAULT_SEGMENT, SEGMENT_RULES, run_rfm, run_rfm_chunked
+from common.storage import ANALYSIS_MART_DIR, SCHEMAS, count_rows, find_table, read_mart_table, write_table
+
 # 1. 폰트 설정
 if platform.system() == 'Windows':
     plt.rc('font', family='Malgun Gothic')
@@ -12,68 +18,62 @@ else:
     plt.rc('font', family='AppleGothic')
 plt.rcParams['axes.unicode_minus'] = False
 
-# 2. 데이터 로드
-# 03단계 SQL 결과를 엑셀로 저장했다고 가정
-data_path = '../data/processed/analysis_mart.xlsx'
-
-if not os.path.exists(data_path):
-    print(f"파일 없음: {data_path}. (더미 데이터를 생성합니다)")
-    # 데모용 더미 데이터
-    data = {
-        'ykiho': ['A001', 'A002', 'A003', 'A001', 'A002'],
-        'sales_date': pd.to_datetime(['2025-01-01', '2025-02-01', '2024-12-01', '2025-03-01', '2025-01-15']),
-        'amount': [100000, 200000, 50000, 150000, 30000],
-        'order_id': [1, 2, 3, 4, 5]
-    }
-    df_sales = pd.DataFrame(data)
-else:
-    df_sales = pd.read_excel(data_path, sheet_name='Sales_Data')
-
-print(f"데이터 로드: {df_sales.shape}")
-
-# 3. RFM 계산
-reference_date = pd.to_datetime('2025-06-30')
+# 2. 실행 설정
+# 실행 모드: memory(기본) | chunked (여러 해의 매출 이력을 배치 단위로 읽어 집계, 메모리 사용량 제한)
+RFM_MODE = os.getenv('RFM_MODE', 'memory')
+RFM_BATCH_ROWS = int(os.getenv('RFM_BATCH_ROWS', '1000000'))
+# chunked 모드에서 읽을 매출 이력 파일 (CSV/Parquet/Feather). 미지정 시 분석 마트의 Sales_Data
+SALES_PATH = os.getenv('SALES_PATH') or find_table(ANALYSIS_MART_DIR, 'Sales_Data')
 
-rfm = df_sales.groupby('ykiho').agg({
-    'sales_date': lambda x: (reference_date - pd.to_datetime(x).max()).days, # Recency
-    'order_id': 'count', # Frequency
-    'amount': 'sum'      # Monetary
-}).rename(columns={
-    'sales_date': 'Recency',
-    'order_id': 'Frequency',
-    'amount': 'Monetary'
-})
+# Recency 기준일 (월별 추이는 02_RFM_Snapshots.py)
+reference_date = pd.to_datetime(os.getenv('RFM_REFERENCE_DATE', '2025-06-30'))
+sales_columns = ['ykiho', 'sales_date', 'order_id', 'amount']
 
-# 4. 등급 산정 (Quantile)
-r_labels = range(5, 0, -1) # 값이 작을수록 높은 점수
-f_labels = range(1, 6)     # 값이 클수록 높은 점수
-m_labels = range(1, 6)
-
-rfm['R_Score'] = pd.qcut(rfm['Recency'], q=5, labels=r_labels).astype(int)
-rfm['F_Score'] = pd.qcut(rfm['Frequency'], q=5, labels=f_labels).astype(int)
-rfm['M_Score'] = pd.qcut(rfm['Monetary'], q=5, labels=m_labels).astype(int)
-
-rfm['RFM_Score'] = rfm['R_Score'] + rfm['F_Score'] + rfm['M_Score']
+# 3. RFM 계산 및 등급 산정 (common.rfm)
+# R/F/M은 groupby 기본 집계로, 점수는 5분위(값이 몰려 분위 경계가 겹쳐도 동작)로 계산
+# 등급 기준을 바꾸려면 SEGMENT_RULES와 같은 (등급명, 조건식) 목록을 rules로 전달
+if RFM_MODE == 'chunked' and SALES_PATH:
+    print(f"배치 집계: {SALES_PATH} ({RFM_BATCH_ROWS:,}행 단위)")
+    with step('rfm_scoring_chunked', rows_in=count_rows(SALES_PATH) if SALES_PATH.endswith('.parquet') else None) as s:
+        rfm = run_rfm_chunked(SALES_PATH, reference_date, batch_rows=RFM_BATCH_ROWS, q=5,
+                              rules=SEGMENT_RULES, default=DEFAULT_SEGMENT, schema=SCHEMAS['Sales_Data'])
+        s['rows_out'] = len(rfm)
+else:
+    if RFM_MODE == 'chunked':
+        print("⚠️ 매출 이력 파일이 없어 메모리 모드로 실행합니다.")
 
-# 5. 고객 세분화 함수
-def segment_customer(score):
-    if score >= 13: return 'VIP (최우수)'
-    elif score >= 9: return 'Loyal (우수)'
-    elif score >= 5: return 'Potential (잠재)'
-    else: return 'Risk (이탈위험)'
+    # 03단계 SQL 결과(analysis_mart)에서 RFM 계산에 필요한 컬럼만 로드
+    try:
+        df_sales = read_mart_table('Sales_Data', columns=sales_columns)
+    except FileNotFoundError as e:
+        print(f"{e}. (더미 데이터를 생성합니다)")
+        # 데모용 더미 데이터
+        data = {
+            'ykiho': ['A001', 'A002', 'A003', 'A001', 'A002'],
+            'sales_date': pd.to_datetime(['2025-01-01', '2025-02-01', '2024-12-01', '2025-03-01', '2025-01-15']),
+            'amount': [100000, 200000, 50000, 150000, 30000],
+            'order_id': [1, 2, 3, 4, 5]
+        }
+        df_sales = pd.DataFrame(data)
 
-rfm['Segment'] = rfm['RFM_Score'].apply(segment_customer)
+    print(f"데이터 로드: {df_sales.shape}")
+    with step('rfm_scoring', rows_in=len(df_sales)) as s:
+        rfm = run_rfm(df_sales, reference_date, q=5, rules=SEGMENT_RULES, default=DEFAULT_SEGMENT)
+        s['rows_out'] = len(rfm)
 
-# 6. 시각화 및 결과 확인
+# 4. 시각화 및 결과 확인
 print("\n[고객 세분화 결과 요약]")
 print(rfm['Segment'].value_counts())
 
 plt.figure(figsize=(10, 6))
-sns.countplot(x='Segment', data=rfm, order=['VIP (최우수)', 'Loyal (우수)', 'Potential (잠재)', 'Risk (이탈위험)'])
+sns.countplot(x='Segment', data=rfm, order=list(rfm['Segment'].cat.categories))
 plt.title('고객 등급별 분포')
 plt.show()
 
-# 7. 저장
-save_path = '../data/processed/client_rfm_result.csv'
-rfm.to_csv(save_path, encoding='utf-8-sig')
+# 5. 저장
+save_path = '../data/processed/client_rfm_result.parquet'
+write_table(rfm.reset_index(), save_path)
+
+# 보고용 CSV
+rfm.to_csv('../data/processed/client_rfm_result.csv', encoding='utf-8-sig')
 print(f"분석 저장 완료: {save_path}")
\ No newline at end of file
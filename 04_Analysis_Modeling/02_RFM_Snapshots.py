@@ -0,0 +1,81 @@
+import seaborn as sns
+import matplotlib.pyplot as plt
+import os
+import sys
+import platform
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.metrics import step
+from common.rfm import DEFAULT_SEGMENT
+from common.rfm_snapshots import (RFM_SNAPSHOT_DIR, build_snapshots, list_snapshots, read_snapshot,
+                                  segment_moves, transition_matrix)
+from common.storage import ANALYSIS_MART_DIR, PROCESSED_DIR, SCHEMAS, count_rows, find_table, read_mart_table
+
+# 1. 폰트 설정
+if platform.system() == 'Windows':
+    plt.rc('font', family='Malgun Gothic')
+else:
+    plt.rc('font', family='AppleGothic')
+plt.rcParams['axes.unicode_minus'] = False
+
+# 2. 실행 설정
+# incremental(기본): 마지막 스냅샷 이후 거래만 누적 | full: 전체 이력으로 다시 생성
+RFM_SNAPSHOT_MODE = os.getenv('RFM_SNAPSHOT_MODE', 'incremental')
+RFM_BATCH_ROWS = int(os.getenv('RFM_BATCH_ROWS', '1000000'))
+# 매출 이력 파일 (CSV/Parquet/Feather). 미지정 시 분석 마트의 Sales_Data
+SALES_PATH = os.getenv('SALES_PATH') or find_table(ANALYSIS_MART_DIR, 'Sales_Data')
+# 거래가 없어도 스냅샷을 만들 마지막 기간 (예: 2025-06). Recency만 증가
+RFM_UNTIL = os.getenv('RFM_UNTIL')
+
+# 3. 월별 스냅샷 갱신
+source = SALES_PATH
+if source is None:
+    try:
+        source = read_mart_table('Sales_Data', columns=['ykiho', 'sales_date', 'order_id', 'amount'])
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+if isinstance(source, str):
+    rows_in = count_rows(source) if source.endswith('.parquet') else None  # Parquet은 메타데이터만 읽음
+else:
+    rows_in = len(source)
+with step('build_snapshots', rows_in=rows_in) as s:
+    written = build_snapshots(source, RFM_SNAPSHOT_DIR, until=RFM_UNTIL, full=(RFM_SNAPSHOT_MODE == 'full'),
+                              batch_rows=RFM_BATCH_ROWS, schema=SCHEMAS['Sales_Data'])
+    s['snapshots_written'] = len(written)
+if written:
+    print(f"✅ 스냅샷 {len(written)}개 저장: {written[0]} ~ {written[-1]} → {RFM_SNAPSHOT_DIR}")
+else:
+    print("새로 반영할 거래가 없습니다.")
+
+# 4. 최근 두 스냅샷 사이의 등급 이동
+periods = list_snapshots(RFM_SNAPSHOT_DIR)
+if len(periods) < 2:
+    print("⚠️ 등급 이동을 비교하려면 스냅샷이 2개 이상 필요합니다.")
+    sys.exit(0)
+
+prev_period, curr_period = periods[-2], periods[-1]
+prev, curr = read_snapshot(prev_period), read_snapshot(curr_period)
+with step('segment_transitions', rows_in=len(curr)) as s:
+    matrix = transition_matrix(prev, curr)
+    moved = segment_moves(prev, curr, to_segment=DEFAULT_SEGMENT)
+    s['rows_out'] = len(moved)
+
+print(f"\n[등급 이동: {prev_period} → {curr_period}]")
+print(matrix.to_string())
+print(f"\n{DEFAULT_SEGMENT}(으)로 새로 이동한 거래처: {len(moved)}곳")
+print(moved.sort_values('Monetary', ascending=False).head(10).to_string())
+
+plt.figure(figsize=(9, 6))
+sns.heatmap(transition_matrix(prev, curr, normalize=True), annot=True, fmt='.0%', cmap='Blues')
+plt.title(f'고객 등급 이동 ({prev_period} → {curr_period})')
+plt.tight_layout()
+plt.show()
+
+# 5. 저장 (보고용 CSV)
+matrix_path = os.path.join(PROCESSED_DIR, f'rfm_transition_{prev_period}_{curr_period}.csv')
+moved_path = os.path.join(PROCESSED_DIR, f'rfm_churn_risk_{curr_period}.csv')
+matrix.to_csv(matrix_path, encoding='utf-8-sig')
+moved.to_csv(moved_path, encoding='utf-8-sig')
+print(f"분석 저장 완료: {matrix_path}, {moved_path}")
@@ -1,26 +1,38 @@
-import pandas as pd
-import numpy as np
-from scipy.stats import chi2_contingency, pearsonr, f_oneway
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
+import multiprocessing
 import sys
 import os
 import platform
+import time
 import warnings
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
 # --- 1. 환경 설정 ---
 # 경고 무시
 warnings.filterwarnings('ignore')
 
-# OS별 한글 폰트 설정
-if platform.system() == 'Windows':
-    plt.rc('font', family='Malgun Gothic')
-elif platform.system() == 'Darwin':  # Mac
-    plt.rc('font', family='AppleGothic')
-else:
-    plt.rc('font', family='NanumGothic')
+# pandas/scipy(common.stat_tests), matplotlib/seaborn은 무거우므로(EXE 시작 수 초)
+# 메뉴를 먼저 띄우고 처음 사용하는 시점에 불러옵니다.
+_plt = None
+
 
-plt.rcParams['axes.unicode_minus'] = False
+def get_pyplot():
+    """matplotlib/seaborn 로드 (첫 그래프에서 한 번, OS별 한글 폰트 설정 포함)"""
+    global _plt
+    if _plt is None:
+        import matplotlib.pyplot as plt
+
+        if platform.system() == 'Windows':
+            plt.rc('font', family='Malgun Gothic')
+        elif platform.system() == 'Darwin':  # Mac
+            plt.rc('font', family='AppleGothic')
+        else:
+            plt.rc('font', family='NanumGothic')
+        plt.rcParams['axes.unicode_minus'] = False
+        _plt = plt
+    import seaborn as sns
+    return _plt, sns
 
 
 def get_resource_path(relative_path):
@@ -41,44 +53,43 @@ def get_resource_path(relative_path):
 # --- 2. 데이터 로드 함수 ---
 def load_dataset():
     """
-    데이터 파일을 로드합니다.
-    1순위: 개발용 폴더 (../data/processed/)
+    데이터 파일을 찾아 테이블 목록만 읽습니다. 각 시트는 처음 분석할 때 로드합니다 (LazyMart).
+    1순위: 개발용 폴더 (../data/processed/analysis_mart/)
     2순위: 배포용 번들 (EXE 내부)
+    테이블 폴더에 없는 시트는 엑셀 마트에서 그 시트만 변환하여 캐시(MART_CACHE_DIR)에 저장합니다.
     """
-    print("\n[System] 데이터베이스를 로딩 중입니다...")
+    from common.storage import ANALYSIS_MART_DIR, LEGACY_MART_XLSX, LazyMart
 
-    # 개발 환경 경로 (상위 폴더 참조)
-    dev_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'processed', 'analysis_mart.xlsx')
+    print("\n[System] 데이터베이스를 확인 중입니다...")
 
-    # 배포 환경 경로 (같은 폴더 혹은 번들 내부)
-    bundled_path = get_resource_path('analysis_data.xlsx')
-
-    target_path = None
-
-    if os.path.exists(dev_path):
-        target_path = dev_path
-    elif os.path.exists(bundled_path):
-        target_path = bundled_path
-    else:
+    # (테이블 폴더, 이전 엑셀 파일) 후보
+    candidates = [
+        # 개발 환경 경로 (상위 폴더 참조)
+        (ANALYSIS_MART_DIR, LEGACY_MART_XLSX),
+        # 배포 환경 경로 (같은 폴더 혹은 번들 내부)
+        (get_resource_path('analysis_mart'), get_resource_path('analysis_data.xlsx')),
         # 로컬 테스트용 (같은 폴더에 파일이 있을 경우)
-        local_path = 'analysis_mart.xlsx'
-        if os.path.exists(local_path):
-            target_path = local_path
-
-    if target_path is None:
-        print("❌ 오류: 데이터 파일을 찾을 수 없습니다.")
-        print(f"확인된 경로:\n1) {dev_path}\n2) {bundled_path}")
-        return None
-
-    try:
-        # 엑셀의 모든 시트를 딕셔너리 형태로 로드
-        df_dict = pd.read_excel(target_path, sheet_name=None)
-        print(f"✅ 데이터 로드 완료! (파일: {os.path.basename(target_path)})")
-        print(f"   포함된 시트: {list(df_dict.keys())}")
-        return df_dict
-    except Exception as e:
-        print(f"❌ 데이터 로드 중 치명적 오류 발생: {e}")
-        return None
+        ('analysis_mart', 'analysis_mart.xlsx'),
+    ]
+
+    for directory, legacy_xlsx in candidates:
+        if not (os.path.isdir(directory) or os.path.exists(legacy_xlsx)):
+            continue
+        try:
+            # 테이블 이름만 먼저 읽고, 시트는 사용할 때 로드 (읽기 전용이므로 메모리 매핑)
+            df_dict = LazyMart(directory=directory, legacy_xlsx=legacy_xlsx, memory_map=True)
+            print(f"✅ 데이터 연결 완료! (경로: {directory if os.path.isdir(directory) else legacy_xlsx})")
+            print(f"   포함된 시트: {list(df_dict.keys())}")
+            return df_dict
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            print(f"❌ 데이터 로드 중 치명적 오류 발생: {e}")
+            return None
+
+    print("❌ 오류: 데이터 파일을 찾을 수 없습니다.")
+    print("확인된 경로:\n" + "\n".join(f"{i + 1}) {d}" for i, (d, _) in enumerate(candidates)))
+    return None
 
 
 # --- 3. 분석 함수들 ---
@@ -87,9 +98,10 @@ def run_chi2_test(df):
     """카이제곱 검정: 두 범주형 변수 간의 독립성 검정"""
     print("\n--- 📊 카이제곱 검정 (Chi-Square Test) ---")
     print("설명: 두 범주형 변수(예: 장비보유여부 vs 등급)가 서로 연관성이 있는지 확인합니다.")
+    from common.stat_tests import MAX_LEVELS, categorical_columns, chi2_matrix, chi2_result, top_pairs
 
-    # 범주형 컬럼만 추출
-    cat_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    # 범주형 컬럼만 추출 (요양기호처럼 수준이 너무 많은 컬럼 제외)
+    cat_cols = categorical_columns(df, MAX_LEVELS)
 
     if len(cat_cols) < 2:
         print("⚠️ 분석할 범주형 변수가 부족합니다. (최소 2개 필요)")
@@ -98,23 +110,36 @@ def run_chi2_test(df):
     print(f"\n[분석 가능 변수 목록]\n{cat_cols}")
 
     try:
-        col1 = input("첫 번째 변수명을 입력하세요: ").strip()
+        col1 = input("첫 번째 변수명을 입력하세요 (전체 쌍 탐색: all): ").strip()
+        if col1.lower() == 'all':
+            chi2, p, cramers_v = chi2_matrix(df, cat_cols)
+            print("\n[연관성 상위 변수 쌍 (BH 보정)]")
+            print(top_pairs(p, cramers_v).rename(columns={'effect_size': "Cramér's V"}).to_string(index=False))
+
+            plt, sns = get_pyplot()
+            plt.figure(figsize=(10, 8))
+            sns.heatmap(cramers_v, cmap='YlGnBu', vmin=0, vmax=1)
+            plt.title("Cramér's V (전체 범주형 변수 쌍)")
+            plt.show()
+            return
         if col1 not in cat_cols: raise ValueError("존재하지 않는 변수입니다.")
 
         col2 = input("두 번째 변수명을 입력하세요: ").strip()
         if col2 not in cat_cols: raise ValueError("존재하지 않는 변수입니다.")
 
-        # 교차표 생성
-        contingency_table = pd.crosstab(df[col1], df[col2])
+        # 교차표 생성 + 검정 수행
+        result, contingency_table = chi2_result(df[col1], df[col2])
         print("\n[교차표 (Observed)]")
         print(contingency_table)
-
-        # 검정 수행
-        chi2, p, dof, expected = chi2_contingency(contingency_table)
+        if 'p_value' not in result:
+            print(f"⚠️ {result['note']}")
+            return
+        chi2, p = result['statistic'], result['p_value']
 
         print(f"\n[검정 결과]")
         print(f" - Chi2 통계량: {chi2:.4f}")
         print(f" - P-value: {p:.4f}")
+        print(f" - Cramér's V: {result['effect_size']:.4f}")
 
         if p < 0.05:
             print("🔴 결과 해석: P-value < 0.05 이므로, 두 변수는 통계적으로 유의미한 연관성이 **있습니다**.")
@@ -122,6 +147,7 @@ def run_chi2_test(df):
             print("🔵 결과 해석: P-value >= 0.05 이므로, 두 변수는 서로 독립적입니다 (연관성 없음).")
 
         # 시각화
+        plt, sns = get_pyplot()
         plt.figure(figsize=(10, 6))
         sns.heatmap(contingency_table, annot=True, fmt='d', cmap='YlGnBu')
         plt.title(f'Chi-Square Heatmap: {col1} vs {col2}')
@@ -135,9 +161,10 @@ def run_anova_test(df):
     """분산 분석(ANOVA): 범주형 그룹에 따른 수치형 변수의 평균 차이 검정"""
     print("\n--- 📊 분산 분석 (One-way ANOVA) ---")
     print("설명: 그룹(예: 등급) 간에 수치(예: 매출액)의 평균 차이가 있는지 확인합니다.")
+    from common.stat_tests import MAX_LEVELS, anova_result, categorical_columns, numeric_columns
 
-    cat_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-    num_cols = df.select_dtypes(include=['number']).columns.tolist()
+    cat_cols = categorical_columns(df, MAX_LEVELS)
+    num_cols = numeric_columns(df)
 
     if not cat_cols or not num_cols:
         print("⚠️ 변수가 부족합니다. (범주형 1개, 수치형 1개 이상 필요)")
@@ -153,19 +180,17 @@ def run_anova_test(df):
         value_col = input("평균을 비교할 변수(예: 매출)를 입력하세요: ").strip()
         if value_col not in num_cols: raise ValueError("존재하지 않는 수치 변수입니다.")
 
-        # 그룹별 데이터 준비
-        groups = [group[value_col].dropna() for name, group in df.groupby(group_col)]
-
-        if len(groups) < 2:
-            print("⚠️ 비교할 그룹이 2개 미만입니다.")
-            return
-
         # 검정 수행
-        f_stat, p_val = f_oneway(*groups)
+        result = anova_result(df[group_col], df[value_col])
+        if 'p_value' not in result:
+            print(f"⚠️ {result['note']}")
+            return
+        f_stat, p_val = result['statistic'], result['p_value']
 
         print(f"\n[검정 결과]")
         print(f" - F-statistic: {f_stat:.4f}")
         print(f" - P-value: {p_val:.4f}")
+        print(f" - η²: {result['effect_size']:.4f}")
 
         if p_val < 0.05:
             print(f"🔴 결과 해석: 그룹 간 '{value_col}'의 평균 차이가 통계적으로 **유의미합니다**.")
@@ -173,6 +198,7 @@ def run_anova_test(df):
             print(f"🔵 결과 해석: 그룹 간 평균 차이가 없다고 볼 수 있습니다.")
 
         # 시각화 (Boxplot)
+        plt, sns = get_pyplot()
         plt.figure(figsize=(10, 6))
         sns.boxplot(x=group_col, y=value_col, data=df)
         plt.title(f'ANOVA Boxplot: {value_col} by {group_col}')
@@ -185,8 +211,9 @@ def run_anova_test(df):
 def run_correlation_analysis(df):
     """상관관계 분석: 두 수치형 변수 간의 관계"""
     print("\n--- 📊 상관관계 분석 (Pearson Correlation) ---")
+    from common.stat_tests import corr_matrix, numeric_columns, pearson_result, strength_label, top_pairs
 
-    num_cols = df.select_dtypes(include=['number']).columns.tolist()
+    num_cols = numeric_columns(df)
     if len(num_cols) < 2:
         print("⚠️ 수치형 변수가 2개 이상 필요합니다.")
         return
@@ -194,7 +221,18 @@ def run_correlation_analysis(df):
     print(f"\n[수치형 변수 목록]\n{num_cols}")
 
     try:
-        col1 = input("변수 1: ").strip()
+        col1 = input("변수 1 (전체 상관행렬: all): ").strip()
+        if col1.lower() == 'all':
+            r, p, n = corr_matrix(df, num_cols)
+            print("\n[상관관계 상위 변수 쌍 (BH 보정)]")
+            print(top_pairs(p, r).rename(columns={'effect_size': 'r'}).to_string(index=False))
+
+            plt, sns = get_pyplot()
+            plt.figure(figsize=(10, 8))
+            sns.heatmap(r, cmap='coolwarm', vmin=-1, vmax=1, center=0)
+            plt.title('Pearson 상관행렬 (결측은 쌍별 제외)')
+            plt.show()
+            return
         col2 = input("변수 2: ").strip()
 
         if col1 not in num_cols or col2 not in num_cols:
@@ -202,26 +240,23 @@ def run_correlation_analysis(df):
 
         # 결측치 제거 후 계산
         temp_df = df[[col1, col2]].dropna()
-        coef, p_val = pearsonr(temp_df[col1], temp_df[col2])
+        result = pearson_result(df[col1], df[col2])
+        if 'p_value' not in result:
+            raise ValueError(result['note'])
+        coef, p_val = result['statistic'], result['p_value']
 
         print(f"\n[분석 결과]")
         print(f" - 상관계수(r): {coef:.4f}")
         print(f" - P-value: {p_val:.4f}")
 
-        if abs(coef) > 0.7:
-            strength = "매우 강한"
-        elif abs(coef) > 0.5:
-            strength = "강한"
-        elif abs(coef) > 0.3:
-            strength = "뚜렷한"
-        else:
-            strength = "약한"
+        strength = strength_label(coef)
 
         direction = "양(+)" if coef > 0 else "음(-)"
 
         print(f"📝 해석: 두 변수는 **{strength} {direction}의 상관관계**를 가집니다.")
 
         # 시각화 (Scatter)
+        plt, sns = get_pyplot()
         plt.figure(figsize=(8, 6))
         sns.regplot(x=col1, y=col2, data=temp_df)
         plt.title(f'Correlation: {col1} vs {col2}')
@@ -255,9 +290,10 @@ def main():
         choice = input(">> 선택: ").strip().upper()
 
         if choice == '1':
-            print("\n[현재 로드된 시트 목록]")
+            print("\n[시트 목록]")
             for i, sheet in enumerate(df_dict.keys()):
-                print(f"{i + 1}. {sheet} (행: {len(df_dict[sheet])}개)")
+                n_rows = df_dict.row_count(sheet)
+                print(f"{i + 1}. {sheet} (행: {n_rows}개)" if n_rows is not None else f"{i + 1}. {sheet} (미변환)")
 
         elif choice in ['2', '3', '4']:
             # 분석할 시트 선택
@@ -280,5 +316,91 @@ def main():
             print("⚠️ 올바른 번호를 입력해주세요.")
 
 
+# --- 5. 배치 모드 ---
+def batch_main(argv=None):
+    """
+    대상 컬럼(예: 등급)에 대해 시트의 모든 변수를 한 번에 검정 (입력 대기 없음)
+    예: Statistical_Analysis_GUI.py --sheet Client_Info --target 등급 --jobs 4
+    --target을 생략하면 모든 변수 쌍의 상관/연관성을 계산합니다 (pairs_pearson.csv, pairs_chi2.csv)
+    """
+    from common.metrics import count, step
+    from common.stat_tests import ALPHA, run_batch
+    parser = argparse.ArgumentParser(description="통계 검정 일괄 실행 (배치 모드)")
+    parser.add_argument('--sheet', required=True, help='분석할 시트(테이블) 이름')
+    parser.add_argument('--target', help='대상 컬럼 (예: 등급). 생략 시 전체 변수 쌍 탐색')
+    parser.add_argument('--out', help='결과 폴더 (기본: stat_screen/<시트>_<대상 또는 pairs>)')
+    parser.add_argument('--jobs', type=int, default=None, help='프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--correction', choices=['fdr_bh', 'bonferroni'], default='fdr_bh', help='다중 검정 보정')
+    parser.add_argument('--alpha', type=float, default=ALPHA)
+    parser.add_argument('--no-plots', action='store_true', help='그래프 저장 생략')
+    args = parser.parse_args(argv)
+
+    df_dict = load_dataset()
+    if df_dict is None:
+        return 1
+    if args.sheet not in df_dict:
+        print(f"❌ 시트가 없습니다: {args.sheet} (포함된 시트: {list(df_dict.keys())})")
+        return 1
+
+    out_dir = args.out or os.path.join('stat_screen', f"{args.sheet}_{args.target or 'pairs'}")
+    plot_dir = None if args.no_plots else os.path.join(out_dir, 'plots')
+    os.makedirs(out_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    if args.target is None:
+        return _batch_pairs(df_dict[args.sheet], out_dir, args.correction, args.alpha, start)
+    try:
+        with step('screen', rows_in=len(df_dict[args.sheet])) as s:
+            results = run_batch(df_dict[args.sheet], args.target, plot_dir=plot_dir, jobs=args.jobs,
+                                method=args.correction, alpha=args.alpha)
+            s['rows_out'] = len(results)
+    except KeyError as e:
+        print(f"❌ {e}")
+        return 1
+
+    result_path = os.path.join(out_dir, 'results.csv')
+    results.to_csv(result_path, index=False, encoding='utf-8-sig')
+
+    tested = results[results['test'] != 'skip']
+    for test, n in tested['test'].value_counts().items():
+        count(f"tests_{test}", int(n))
+    print(f"\n[검정 결과] {len(tested)}건 ({time.perf_counter() - start:.1f}s), "
+          f"보정({args.correction}) 후 유의: {int(results['significant'].sum())}건")
+    print(tested.head(20)[['feature', 'test', 'n', 'statistic', 'p_value', 'p_adjusted',
+                           'effect_name', 'effect_size']].to_string(index=False))
+    print(f"✅ 결과 저장: {result_path}" + (f" (그래프: {plot_dir})" if plot_dir else ""))
+    return 0
+
+
+def _batch_pairs(df, out_dir, correction, alpha, start):
+    """수치형 전체 상관행렬 + 범주형 전체 카이제곱을 보정 p값 순 목록으로 저장"""
+    from common.metrics import step
+    from common.stat_tests import chi2_matrix, corr_matrix, top_pairs
+
+    with step('pairs_pearson', rows_in=len(df)) as s:
+        r, p_r, _ = corr_matrix(df)
+        outputs = {'pearson': top_pairs(p_r, r, None, correction, alpha)}
+        s['rows_out'] = len(outputs['pearson'])
+    with step('pairs_chi2', rows_in=len(df)) as s:
+        _, p_c, cramers_v = chi2_matrix(df)
+        outputs['chi2'] = top_pairs(p_c, cramers_v, None, correction, alpha)
+        s['rows_out'] = len(outputs['chi2'])
+
+    print(f"\n[전체 변수 쌍] 수치형 {len(r)}개, 범주형 {len(cramers_v)}개 ({time.perf_counter() - start:.1f}s)")
+    for name, pairs in outputs.items():
+        path = os.path.join(out_dir, f'pairs_{name}.csv')
+        pairs.to_csv(path, index=False, encoding='utf-8-sig')
+        print(f"\n{name}: {len(pairs)}쌍, 보정({correction}) 후 유의 {int(pairs['significant'].sum())}쌍")
+        print(pairs.head(10).to_string(index=False))
+        print(f"✅ 결과 저장: {path}")
+    return 0
+
+
 if __name__ == "__main__":
+    # PyInstaller EXE에서 작업자 프로세스로 실행된 경우 여기서 작업자로 동작하고 끝남
+    # (없으면 multiprocessing 인자를 배치 모드 인자로 해석하여 실패)
+    multiprocessing.freeze_support()
+    # 인자가 있으면 배치 모드, 없으면(EXE 더블클릭 등) 대화형 메뉴
+    if len(sys.argv) > 1:
+        sys.exit(batch_main())
     main()
\ No newline at end of file
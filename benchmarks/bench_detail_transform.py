@@ -0,0 +1,141 @@
+"""
+상세정보 변환 벤치마크: 파일별 순차 전체 로드 (기존) vs 프로세스 풀 + 배치 변환 (common.detail_transform)
+
+--hospitals 개 병원의 수집 형태 상세정보 CSV(진료과목, 장비, 간호등급, 시설)를 만든 뒤
+각 방식을 별도 프로세스에서 실행하여 시간과 최대 메모리(RSS, 작업자 프로세스 포함)를 비교하고
+결과 값이 같은지 확인합니다. (새 방식은 숫자 컬럼을 추론하므로 타입은 기존 방식에 맞춘 뒤 비교)
+
+실행: python benchmarks/bench_detail_transform.py --hospitals 200000 1000000 --jobs 1 4
+"""
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from synthetic_data import EQUIPMENT, SUBJECTS
+from common.detail_transform import DETAIL_BATCH_ROWS, convert_detail_files, table_name
+from common.storage import DETAIL_SCHEMA, apply_schema, is_text, read_table, write_table
+
+COL_MAP = {'ykiho': '암호화된 요양기호', 'dgsbjtCd': '진료과목코드', 'ddt': '의사수', 'oftCnt': '장비대수'}
+
+
+def generate(n_hospitals, raw_dir, seed=0):
+    """수집 단계 출력과 같은 형태의 hospital_detail_*.csv (모든 값 문자열)"""
+    rng = np.random.default_rng(seed)
+    ykiho = np.array([f"JDQ4MTYyMiM{i:010d}" for i in range(n_hospitals)])
+
+    def repeat(max_rows):
+        return np.repeat(ykiho, rng.integers(0, max_rows + 1, n_hospitals))
+
+    subj = repeat(5)
+    picked = rng.integers(0, len(SUBJECTS), len(subj))
+    equip = repeat(4)
+    eq = rng.integers(0, len(EQUIPMENT), len(equip))
+    tables = {
+        'dgsbjt_info': pd.DataFrame({
+            'dgsbjtCd': [SUBJECTS[i][0] for i in picked], 'dgsbjtCdNm': [SUBJECTS[i][1] for i in picked],
+            'ddt': rng.integers(1, 10, len(subj)), 'mdeptSdrCnt': rng.integers(0, 5, len(subj)),
+            'cdiagDrCnt': rng.integers(0, 2, len(subj)), 'ykiho': subj}),
+        'equip_info': pd.DataFrame({
+            'oftCd': [EQUIPMENT[i][0] for i in eq], 'oftCdNm': [EQUIPMENT[i][1] for i in eq],
+            'oftCnt': rng.integers(1, 5, len(equip)), 'ykiho': equip}),
+        'nursing_info': pd.DataFrame({'typeCd': '1', 'gradeNm': '일반병동', 'grade': rng.integers(1, 8, n_hospitals),
+                                      'ykiho': ykiho}),
+        'facility_info': pd.DataFrame({'stdSickbdCnt': rng.integers(0, 300, n_hospitals),
+                                       'ptrmCnt': rng.integers(0, 5, n_hospitals), 'ykiho': ykiho}),
+    }
+    for name, df in tables.items():
+        df.to_csv(os.path.join(raw_dir, f"hospital_detail_{name}.csv"), index=False, encoding='utf-8-sig')
+    return sum(len(df) for df in tables.values())
+
+
+def worker(mode, raw_dir, out_dir, jobs, batch_rows):
+    """한 가지 방식을 실행하고 (시간, 최대 RSS MB)를 JSON으로 출력"""
+    files = sorted(glob.glob(os.path.join(raw_dir, 'hospital_detail_*.csv')))
+    start = time.perf_counter()
+    if mode == 'serial':
+        for path in files:
+            df = read_table(path, schema=DETAIL_SCHEMA).rename(columns=COL_MAP)
+            write_table(df, os.path.join(out_dir, f"{table_name(path)}.parquet"))
+    else:
+        tasks = [(path, os.path.join(out_dir, f"{table_name(path)}.parquet"), COL_MAP, batch_rows, None)
+                 for path in files]
+        for result in convert_detail_files(tasks, jobs):
+            if 'error' in result:
+                raise RuntimeError(result['error'])
+    elapsed = time.perf_counter() - start
+    peak_mb = max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)) / 1024
+    print(json.dumps({'seconds': elapsed, 'peak_mb': peak_mb}))
+
+
+def run_self(*args):
+    """
+    이 스크립트를 별도 프로세스로 실행하고 마지막 줄(JSON)을 반환.
+    데이터 생성과 결과 비교도 별도 프로세스에서 합니다.
+    (Linux는 최대 RSS를 exec 후에도 이어받으므로 부모 프로세스의 메모리가 측정값에 섞이지 않도록)
+    """
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), *map(str, args)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def assert_same(serial_dir, pool_dir):
+    for path in sorted(glob.glob(os.path.join(serial_dir, '*.parquet'))):
+        expected = read_table(path)
+        actual = read_table(os.path.join(pool_dir, os.path.basename(path)))
+        # 기존 방식의 문자열 컬럼은 문자열로 바꿔 비교 (pandas 2.x는 object라 astype만으로는 숫자가 남음)
+        actual = apply_schema(actual, {col: 'str' for col in expected.columns if is_text(expected[col])})
+        pd.testing.assert_frame_equal(expected, actual.astype(expected.dtypes.to_dict()))
+    print(json.dumps({'same': True}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hospitals', type=int, nargs='+', default=[200000, 1000000])
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--batch-rows', type=int, default=DETAIL_BATCH_ROWS)
+    parser.add_argument('--worker', nargs=4, metavar=('MODE', 'RAW', 'OUT', 'JOBS'), help=argparse.SUPPRESS)
+    parser.add_argument('--generate', metavar='RAW', help=argparse.SUPPRESS)
+    parser.add_argument('--compare', nargs=2, metavar=('SERIAL', 'POOL'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        mode, raw_dir, out_dir, jobs = args.worker
+        worker(mode, raw_dir, out_dir, int(jobs), args.batch_rows)
+        return
+    if args.generate:
+        print(json.dumps({'rows': generate(args.hospitals[0], args.generate)}))
+        return
+    if args.compare:
+        assert_same(*args.compare)
+        return
+
+    for n in args.hospitals:
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_dir = os.path.join(tmp, 'raw')
+            os.makedirs(raw_dir)
+            n_rows = run_self('--hospitals', n, '--generate', raw_dir)['rows']
+
+            serial_dir = os.path.join(tmp, 'serial')
+            s = run_self('--worker', 'serial', raw_dir, serial_dir, 1)
+            print(f"{n:>10,}개 병원 ({n_rows:,}행) | 순차 전체 로드 {s['seconds']:6.2f}s {s['peak_mb']:7.0f}MB")
+            for jobs in sorted(set(args.jobs)):
+                pool_dir = os.path.join(tmp, f"pool_{jobs}")
+                p = run_self('--worker', 'pool', raw_dir, pool_dir, jobs, '--batch-rows', args.batch_rows)
+                run_self('--compare', serial_dir, pool_dir)
+                print(f"{'':>31}| 프로세스 {jobs}개 배치   {p['seconds']:6.2f}s {p['peak_mb']:7.0f}MB "
+                      f"(x{s['seconds'] / p['seconds']:.1f}) | 결과 일치")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+전체 파이프라인 벤치마크 (운영 규모 합성 데이터 + 로컬 목 API 서버)
+
+임시 작업 폴더에 코드(common, 단계 스크립트, SQL)를 복사하고 synthetic_data로 입력을 만든 뒤
+run_pipeline.py로 모든 단계를 실제로 실행합니다. 저장소의 data/ 는 건드리지 않습니다.
+단계마다 소요 시간, 처리 행 수와 처리량(행/초), 최대 메모리(RSS)를 기록하며
+(common.metrics 실행 리포트), 저장된 기준값(--baseline)과 비교하여 느려지거나 메모리가 늘어난 단계를 표시합니다.
+
+실행 순서
+1. 파이프라인 전체: 수집(hospital_basic, hospital_detail, udi_barcode: 목 서버) → 전처리(inventory_cleaning,
+   detail_transform) → 웨어하우스(warehouse: detail_transform 결과를 그대로 읽음) → 분석(rfm, rfm_snapshots)
+2. stat_screen: 통계 분석 GUI 배치 모드 (hospital_features 전체 변수 vs has_dialysis_machine)
+
+실행 예:
+  python benchmarks/bench_end_to_end.py --scale 100k
+  python benchmarks/bench_end_to_end.py --scale 1m --save-baseline    # 기준값 저장
+  python benchmarks/bench_end_to_end.py --scale 1m                    # 저장된 기준값과 비교
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from mock_api_server import start_mock_server
+from synthetic_data import CL_CODES, SCALES, Scale, generate
+from common.metrics import REGRESSION_RATIO, find_regressions, peak_rss_mb, write_json
+
+ROOT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# 작업 폴더로 복사할 코드 (data/, benchmarks/ 제외)
+CODE_DIRS = ('common', '01_Data_Collection', '02_Data_Preprocessing', '03_SQL_Warehouse', '04_Analysis_Modeling',
+             '05_Application')
+SCREEN_ARGS = ['--sheet', 'hospital_features', '--target', 'has_dialysis_machine', '--no-plots', '--jobs', '1']
+
+
+def make_workspace(work_dir):
+    for name in CODE_DIRS:
+        shutil.copytree(os.path.join(ROOT_DIR, name), os.path.join(work_dir, name),
+                        ignore=shutil.ignore_patterns('__pycache__', '*.xlsx', 'stat_screen'))
+    shutil.copy2(os.path.join(ROOT_DIR, 'run_pipeline.py'), work_dir)
+
+
+def stage_env(work_dir, base_url, jobs):
+    """목 서버 주소, 호출 한도 해제, 캐시/리포트 경로를 작업 폴더로"""
+    fast = '1000000'
+    return {
+        **os.environ, 'DATA_GO_KR_API_KEY': 'BENCHMARK', 'HIRA_BASIC_API_URL': base_url + 'getHospBasisList',
+        'HIRA_API_BASE_URL': base_url, 'UDI_API_URL': base_url + 'getUdiInfo',
+        'HOSP_CL_CODES': ','.join(code for code, _, _ in CL_CODES), 'COLLECT_MODE': 'full',
+        'BASIC_API_RATE_PER_SEC': fast, 'DETAIL_API_RATE_PER_SEC': fast, 'UDI_API_RATE_PER_SEC': fast,
+        'MART_CACHE_DIR': os.path.join(work_dir, 'mart_cache'), 'PIPELINE_JOBS': str(jobs),
+        'RUN_REPORT_DIR': os.path.join(work_dir, 'run_reports'), 'MPLBACKEND': 'Agg',
+    }
+
+
+def run_logged(command, cwd, env, log_path):
+    with open(log_path, 'w', encoding='utf-8') as log:
+        return subprocess.run(command, cwd=cwd, env=env, stdin=subprocess.DEVNULL, stdout=log,
+                              stderr=subprocess.STDOUT).returncode
+
+
+def stage_rows(report):
+    """단계 리포트에서 처리 행 수 (작업 구간의 입력/출력 행 수 중 최대)"""
+    rows = [v for step in report.get('steps', []) for v in (step.get('rows_in'), step.get('rows_out'))
+            if isinstance(v, int)]
+    return max(rows) if rows else None
+
+
+def collect(report_dir):
+    """실행 리포트 폴더 → {단계: {status, seconds, peak_rss_mb, rows, rows_per_sec}}"""
+    stages = {}
+    for run_id in sorted(os.listdir(report_dir)):
+        run_path = os.path.join(report_dir, run_id, 'run.json')
+        if os.path.exists(run_path):
+            with open(run_path, encoding='utf-8') as f:
+                entries = json.load(f)['stages'].items()
+        else:  # run_pipeline 밖에서 실행한 단계 (stat_screen)
+            entries = []
+            for name in os.listdir(os.path.join(report_dir, run_id)):
+                with open(os.path.join(report_dir, run_id, name), encoding='utf-8') as f:
+                    report = json.load(f)
+                entries.append((report['stage'], {'status': 'ran' if report['status'] == 'ok' else 'failed',
+                                                  'seconds': report['seconds'], 'peak_rss_mb': report['peak_rss_mb'],
+                                                  'report': report}))
+        for name, entry in entries:
+            if entry['status'] not in ('ran', 'failed'):
+                continue
+            rows = stage_rows(entry.get('report') or {})
+            stages[name] = {'status': entry['status'], 'seconds': entry['seconds'],
+                            'peak_rss_mb': entry['peak_rss_mb'], 'rows': rows,
+                            'rows_per_sec': round(rows / entry['seconds']) if rows and entry['seconds'] else None}
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=list(SCALES), default='10k')
+    for field in Scale._fields:
+        parser.add_argument(f"--{field}", type=int, help=f"{field} 크기 (기본: 규모별 값)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='목 API 응답 지연')
+    parser.add_argument('--jobs', type=int, default=1, help='동시 실행 단계 수 (1: 단계별 측정이 서로 간섭하지 않음)')
+    parser.add_argument('--workdir', help='작업 폴더 (지정하면 삭제하지 않음, 기본: 임시 폴더)')
+    parser.add_argument('--baseline', help='비교할 기준값 JSON (기본: baselines/e2e_<scale>.json이 있으면 사용)')
+    parser.add_argument('--save-baseline', action='store_true', help='이번 결과를 기준값으로 저장')
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_RATIO, help='회귀로 볼 배수')
+    args = parser.parse_args()
+
+    scale = SCALES[args.scale]._replace(**{f: getattr(args, f) for f in Scale._fields if getattr(args, f)})
+    if args.workdir and os.path.isdir(args.workdir) and os.listdir(args.workdir):
+        print(f"❌ 작업 폴더가 비어 있지 않습니다: {args.workdir}")
+        return 1
+    work_dir = args.workdir or tempfile.mkdtemp(prefix='bench_e2e_')
+    os.makedirs(work_dir, exist_ok=True)
+    make_workspace(work_dir)
+    log_dir = os.path.join(work_dir, 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+
+    print(f"[합성 데이터] {args.scale}: {scale} → {work_dir}")
+    start = time.perf_counter()
+    sizes, portal = generate(work_dir, scale, args.seed)
+    t_generate = time.perf_counter() - start
+
+    server, base_url = start_mock_server(latency=args.latency_ms / 1000, responder=portal)
+    env = stage_env(work_dir, base_url, args.jobs)
+    failed = False
+    try:
+        print("\n[파이프라인] 전체 단계")
+        code = run_logged([sys.executable, 'run_pipeline.py'], work_dir, env, os.path.join(log_dir, 'pipeline.log'))
+        failed |= code != 0
+
+        print("\n[stat_screen] 통계 분석 GUI 배치 모드")
+        screen_env = {**env, 'METRICS_STAGE': 'stat_screen'}
+        app_dir = os.path.join(work_dir, '05_Application')
+        code = run_logged([sys.executable, 'Statistical_Analysis_GUI.py', *SCREEN_ARGS], app_dir, screen_env,
+                          os.path.join(log_dir, 'stat_screen.log'))
+        failed |= code != 0
+    finally:
+        server.shutdown()
+
+    stages = collect(env['RUN_REPORT_DIR'])
+    result = {
+        'scale': args.scale, 'sizes': scale._asdict(), 'rows_generated': sizes, 'seed': args.seed,
+        'generate_seconds': round(t_generate, 3), 'generate_peak_rss_mb': peak_rss_mb(),
+        'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count(),
+        'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'stages': stages,
+    }
+
+    print(f"\n[결과] 합성 데이터 생성 {t_generate:.1f}s")
+    print(f"{'단계':<20} {'상태':<6} {'시간(s)':>8} {'행':>12} {'행/초':>12} {'최대 RSS(MB)':>12}")
+    for name, s in stages.items():
+        rows = f"{s['rows']:,}" if s['rows'] is not None else '-'
+        rate = f"{s['rows_per_sec']:,}" if s['rows_per_sec'] is not None else '-'
+        print(f"{name:<20} {s['status']:<6} {s['seconds']:>8.2f} {rows:>12} {rate:>12} {s['peak_rss_mb'] or 0:>12.1f}")
+    write_json(result, os.path.join(work_dir, 'result.json'))
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"e2e_{args.scale}.json")
+    if args.save_baseline:
+        print(f"✅ 기준값 저장: {write_json(result, baseline_path)}")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('sizes') != result['sizes']:
+            print(f"⚠️ 기준값과 데이터 크기가 다릅니다: {baseline.get('sizes')}")
+        regressions = find_regressions(baseline, result, ratio=args.tolerance)
+        for stage, metric, before, after in regressions:
+            print(f"⚠️ 회귀: {stage} {metric} {before} → {after}")
+        if not regressions:
+            print(f"✅ 기준값 대비 회귀 없음 ({baseline_path}, 허용 x{args.tolerance:g})")
+        failed |= bool(regressions)
+
+    if failed:
+        print(f"❌ 실패한 단계 또는 회귀가 있습니다. (작업 폴더: {work_dir}, 단계 로그: {log_dir})")
+    elif args.workdir:
+        print(f"결과: {os.path.join(work_dir, 'result.json')} (단계 로그: {log_dir})")
+    else:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+병원 Feature 마트 빌드 벤치마크: 전체 재계산 vs 증분 갱신 (common.warehouse)
+
+--hospitals 개 병원의 합성 상세정보 테이블로 마트를 한 번 만든 뒤,
+--churn 비율의 병원을 변경/추가/삭제하고 전체 재계산과 증분 갱신 시간을 비교합니다.
+두 결과가 같은지도 확인합니다.
+
+실행: python benchmarks/bench_feature_mart.py --hospitals 100000 --churn 0.001 0.01 0.1
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.warehouse import Warehouse
+
+SQL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '03_SQL_Warehouse',
+                        '01_Hospital_Features.sql')
+KEY = '암호화된 요양기호'
+SUBJECTS = ['내과', '외과', '가정의학과', '비뇨의학과', '소아청소년과', '정형외과', '안과', '피부과']
+EQUIPMENT = ['인공신장기', 'CT', 'MRI', '초음파', 'X-Ray', '내시경']
+
+
+def make_sources(ykiho, rng):
+    """병원 목록에 대한 상세정보 테이블 (테이블명 → DataFrame)"""
+    n = len(ykiho)
+
+    def repeat(k_max):
+        counts = rng.integers(1, k_max + 1, n)
+        return np.repeat(ykiho, counts), int(counts.sum())
+
+    names = pd.Series(ykiho).str.replace('H', '병원', regex=False).to_numpy()
+    dg_keys, m = repeat(5)
+    dg_subject = rng.integers(0, len(SUBJECTS), m)
+    eq_keys, e = repeat(4)
+    eq_code = rng.integers(0, len(EQUIPMENT), e)
+    sd_keys, s = repeat(3)
+    return {
+        'dgsbjt_info': pd.DataFrame({
+            KEY: dg_keys, '출력명': pd.Series(names, index=ykiho)[dg_keys].to_numpy(),
+            '진료과목코드명': np.array(SUBJECTS)[dg_subject], '진료과목코드': dg_subject.astype(str),
+            '의사수': rng.integers(1, 10, m)}),
+        'equip_info': pd.DataFrame({
+            KEY: eq_keys, '장비명': np.array(EQUIPMENT)[eq_code], '장비코드': eq_code.astype(str),
+            '장비대수': rng.integers(1, 5, e)}),
+        'nursing_info': pd.DataFrame({KEY: ykiho, '구분 코드명': '일반병동', '구분 코드': '1',
+                                      '간호등급': rng.integers(1, 8, n).astype(str)}),
+        'sdr_info': pd.DataFrame({
+            KEY: sd_keys, '진료과목코드명': np.array(SUBJECTS)[rng.integers(0, len(SUBJECTS), s)],
+            '전문과목별 전문의 수': rng.integers(0, 5, s)}),
+        'facility_info': pd.DataFrame({KEY: ykiho, '상급 입원실(병상수)': rng.integers(0, 20, n),
+                                       '수술실(병상수)': rng.integers(0, 5, n)}),
+    }
+
+
+def write_sources(tables, detail_dir, raw_dir, ykiho):
+    for name, df in tables.items():
+        df.to_parquet(os.path.join(detail_dir, f"{name}.parquet"), index=False)
+    pd.DataFrame({'ykiho': ykiho}).to_parquet(os.path.join(raw_dir, 'client_basic_info.parquet'), index=False)
+
+
+def apply_churn(tables, ykiho, churn, rng):
+    """churn 비율만큼 병원 변경(절반), 추가/삭제(각 1/4)"""
+    n_churn = max(1, int(len(ykiho) * churn))
+    picked = rng.choice(ykiho, n_churn, replace=False)
+    changed, removed = picked[:n_churn // 2], picked[n_churn // 2:n_churn * 3 // 4]
+    added = np.array([f"N{i:07d}" for i in range(n_churn - len(changed) - len(removed))])
+
+    kept = np.setdiff1d(ykiho, removed)
+    new_tables = make_sources(added, rng)
+    result = {}
+    for name, df in tables.items():
+        df = df[~df[KEY].isin(removed)].copy()
+        if name == 'equip_info':
+            df.loc[df[KEY].isin(changed), '장비대수'] += 1
+        result[name] = pd.concat([df, new_tables[name]], ignore_index=True)
+    return result, np.concatenate([kept, added])
+
+
+def build(detail_dir, raw_dir, out_dir, state_dir, full):
+    warehouse = Warehouse(source_dirs=[raw_dir], detail_dir=detail_dir)
+    try:
+        start = time.perf_counter()
+        path, n_rows, n_recomputed = warehouse.materialize_incremental(
+            SQL_PATH, 'hospital_features', out_dir=out_dir, fmt='parquet', state_dir=state_dir, full=full)
+        return time.perf_counter() - start, path, n_recomputed
+    finally:
+        warehouse.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hospitals', type=int, default=100000)
+    parser.add_argument('--churn', type=float, nargs='+', default=[0.001, 0.01, 0.1])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    base_ykiho = np.array([f"H{i:07d}" for i in range(args.hospitals)])
+    base_tables = make_sources(base_ykiho, rng)
+
+    for churn in args.churn:
+        with tempfile.TemporaryDirectory() as tmp:
+            detail_dir, raw_dir = os.path.join(tmp, 'detail'), os.path.join(tmp, 'raw')
+            inc_out, inc_state = os.path.join(tmp, 'inc'), os.path.join(tmp, 'inc_state')
+            full_out, full_state = os.path.join(tmp, 'full'), os.path.join(tmp, 'full_state')
+            for d in (detail_dir, raw_dir):
+                os.makedirs(d)
+
+            # 초기 빌드 (증분 상태 생성)
+            write_sources(base_tables, detail_dir, raw_dir, base_ykiho)
+            t_init, _, _ = build(detail_dir, raw_dir, inc_out, inc_state, full=True)
+
+            tables, ykiho = apply_churn(base_tables, base_ykiho, churn, rng)
+            write_sources(tables, detail_dir, raw_dir, ykiho)
+
+            t_inc, inc_path, n_recomputed = build(detail_dir, raw_dir, inc_out, inc_state, full=False)
+            t_full, full_path, _ = build(detail_dir, raw_dir, full_out, full_state, full=True)
+
+            inc = pq.read_table(inc_path).to_pandas().sort_values('ykiho', ignore_index=True)
+            ref = pq.read_table(full_path).to_pandas().sort_values('ykiho', ignore_index=True)
+            pd.testing.assert_frame_equal(inc, ref, check_dtype=False)
+            shutil.rmtree(inc_state)
+
+            print(f"병원 {args.hospitals:,} | churn {churn:.1%} (재계산 {n_recomputed:,}곳) | "
+                  f"초기 {t_init:.2f}s | 전체 {t_full:.2f}s | 증분 {t_inc:.2f}s | x{t_full / t_inc:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+병원 특성 벡터 벤치마크: GROUP_CONCAT 문자열 파싱 vs 희소 행렬 로드 (common.feature_vectors)
+
+--hospitals 개 병원의 합성 상세정보로 hospital_features(문자열)와
+hospital_feature_counts(long 형식) 마트를 만든 뒤,
+진료과목/장비별 병원 × 코드 행렬을 얻는 시간을 비교하고 결과가 같은지 확인합니다.
+
+실행: python benchmarks/bench_feature_vectors.py --hospitals 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bench_feature_mart import make_sources, write_sources
+from common.feature_vectors import load_feature_matrix
+from common.storage import read_table
+from common.warehouse import Warehouse
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '03_SQL_Warehouse')
+# (문자열 컬럼, 희소 행렬 항목)
+COLUMNS = [('doctors_by_subject', 'specialty'), ('equipment_list', 'equipment')]
+_ITEM = r'([^,(]+)\((\d+)\)'
+
+
+def parse_strings(features_path, column):
+    """기존 방식: "내과(5), 정형외과(3)" 문자열을 정규식으로 파싱하여 wide 형식으로"""
+    df = read_table(features_path, columns=['ykiho', column])
+    items = df[column].str.extractall(_ITEM)
+    items[0] = items[0].str.strip()
+    items[1] = items[1].astype('int64')
+    rows = items.index.get_level_values(0)
+    wide = items.groupby([rows, items[0]])[1].sum().unstack(fill_value=0)
+    wide = wide.reindex(range(len(df)), fill_value=0)
+    wide.index = df['ykiho'].to_numpy()
+    return wide
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hospitals', type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ykiho = np.array([f"H{i:07d}" for i in range(args.hospitals)])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        detail_dir, raw_dir, out_dir = (os.path.join(tmp, d) for d in ('detail', 'raw', 'out'))
+        for d in (detail_dir, raw_dir):
+            os.makedirs(d)
+        write_sources(make_sources(ykiho, rng), detail_dir, raw_dir, ykiho)
+
+        warehouse = Warehouse(source_dirs=[raw_dir], detail_dir=detail_dir)
+        try:
+            features_path, _ = warehouse.materialize(
+                os.path.join(SQL_DIR, '01_Hospital_Features.sql'), 'hospital_features', out_dir, 'parquet')
+            warehouse.materialize(
+                os.path.join(SQL_DIR, '05_Hospital_Feature_Counts.sql'), 'hospital_feature_counts', out_dir, 'parquet')
+        finally:
+            warehouse.close()
+
+        for column, feature in COLUMNS:
+            start = time.perf_counter()
+            wide = parse_strings(features_path, column)
+            t_parse = time.perf_counter() - start
+
+            start = time.perf_counter()
+            fm = load_feature_matrix(feature, ykiho=wide.index, directory=out_dir)
+            t_sparse = time.perf_counter() - start
+
+            names = fm.codes['code_name'].to_numpy()
+            ref = wide[names].to_numpy()
+            assert (fm.matrix.toarray() == ref).all(), f"{feature} 결과가 다릅니다"
+
+            print(f"병원 {args.hospitals:,} | {feature} ({len(names)}개 코드, nnz {fm.matrix.nnz:,}) | "
+                  f"문자열 파싱 {t_parse:.2f}s | 희소 행렬 {t_sparse:.2f}s | x{t_parse / t_sparse:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+통계 분석 GUI 시작 시간 벤치마크: 전체 시트 즉시 로드 (기존) vs 지연 로드 + 시트 캐시 (LazyMart)
+
+합성 엑셀 마트(--rows 행의 Sales_Data 등)를 만든 뒤 각 방식을 새 프로세스에서 실행하여
+메뉴가 뜰 때까지의 시간(인터프리터 시작 포함)과 첫 시트를 분석할 수 있을 때까지의 시간을 비교합니다.
+- 기존: pandas/scipy/matplotlib/seaborn import + pd.read_excel(sheet_name=None)
+- 지연(최초): GUI 모듈 import + 시트 이름만 읽기 → 첫 시트만 엑셀에서 변환하여 캐시
+- 지연(재실행): 캐시에서 메모리 매핑으로 읽기 (엑셀 파싱 없음)
+
+실행: python benchmarks/bench_gui_startup.py --rows 50000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.storage import SCHEMAS, LazyMart, apply_schema, export_excel
+
+GUI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '05_Application',
+                        'Statistical_Analysis_GUI.py')
+SHEET = 'Sales_Data'
+
+
+def make_workbook(path, n_rows, seed=0):
+    """분석 마트 형태의 합성 엑셀 (Sales_Data, Client_Info, Equipment_Info)"""
+    rng = np.random.default_rng(seed)
+    n_clients = max(n_rows // 20, 10)
+    ykiho = np.array([f"JD{i:07d}" for i in range(n_clients)], dtype=object)
+    export_excel({
+        'Sales_Data': pd.DataFrame({
+            'ykiho': ykiho[rng.integers(0, n_clients, n_rows)],
+            'sales_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, n_rows), unit='D'),
+            'order_id': np.arange(n_rows).astype(str), 'amount': rng.integers(1, 500, n_rows) * 10000,
+        }),
+        'Client_Info': pd.DataFrame({
+            'ykiho': ykiho, 'has_dialysis': rng.choice(['Y', 'N'], n_clients),
+            'total_equip_cnt': rng.integers(0, 30, n_clients),
+        }),
+        'Equipment_Info': pd.DataFrame({
+            'ykiho': ykiho[rng.integers(0, n_clients, n_clients * 2)],
+            'category': rng.choice(['CT', 'MRI', 'US'], n_clients * 2),
+        }),
+    }, path)
+
+
+def worker(mode, xlsx_path, cache_dir, out_path):
+    """한 가지 방식으로 (메뉴 준비, 첫 시트 준비) 시각을 인터프리터 시작 기준 초로 출력"""
+    if mode == 'eager':
+        import matplotlib.pyplot  # noqa: F401
+        import scipy.stats  # noqa: F401
+        import seaborn  # noqa: F401
+
+        tables = {name: apply_schema(df, SCHEMAS.get(name))
+                  for name, df in pd.read_excel(xlsx_path, sheet_name=None).items()}
+        menu = time.time()
+        df = tables[SHEET]
+    else:
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location('gui', GUI_PATH)
+        spec.loader.exec_module(importlib.util.module_from_spec(spec))
+        mart = LazyMart(directory=os.path.join(cache_dir, 'no_tables'), legacy_xlsx=xlsx_path, cache_dir=cache_dir)
+        menu = time.time()
+        df = mart[SHEET]
+    sheet = time.time()
+    df.to_pickle(out_path)
+    print(json.dumps({'menu': menu, 'sheet': sheet}))
+
+
+def run_worker(mode, xlsx_path, cache_dir, out_path):
+    start = time.time()
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', mode, xlsx_path, cache_dir,
+                             out_path], capture_output=True, text=True, check=True)
+    stamps = json.loads(result.stdout.strip().splitlines()[-1])
+    return stamps['menu'] - start, stamps['sheet'] - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--worker', nargs=4, metavar=('MODE', 'XLSX', 'CACHE', 'OUT'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx_path, cache_dir = os.path.join(tmp, 'analysis_mart.xlsx'), os.path.join(tmp, 'cache')
+        make_workbook(xlsx_path, args.rows)
+
+        timings, frames = {}, {}
+        for mode, label in (('eager', '기존 (전체 로드)'), ('lazy', '지연 (최초 실행)'), ('lazy', '지연 (재실행)')):
+            out_path = os.path.join(tmp, f"{len(timings)}.pkl")
+            timings[label] = run_worker(mode, xlsx_path, cache_dir, out_path)
+            frames[label] = pd.read_pickle(out_path)
+
+        expected = frames['기존 (전체 로드)']
+        for label, df in frames.items():
+            pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+        print(f"엑셀 마트 {os.path.getsize(xlsx_path) / 1e6:.1f}MB ({SHEET} {args.rows:,}행)")
+        for label, (menu, sheet) in timings.items():
+            print(f"{label:<14} | 메뉴 표시 {menu:6.2f}s | 첫 시트({SHEET}) 준비 {sheet:6.2f}s")
+        print("결과 일치")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+BoxHero attributes 전개 벤치마크: apply(expand_attrs).apply(pd.Series) (기존)
+vs 일괄 파싱 + long→wide 전개 (common.attributes.expand_attributes)
+
+실행: python benchmarks/bench_inventory_attrs.py --rows 10000 100000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.attributes import expand_attrs, expand_attributes
+
+ATTR_NAMES = ['Manufacturer', 'Expiry', 'Storage', 'Lot', 'Category', 'Unit', 'Supplier', 'Origin', 'Grade', 'Memo']
+
+
+def make_attributes(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    values = []
+    for i in range(n_rows):
+        n_attrs = rng.integers(7, len(ATTR_NAMES) + 1)
+        attrs = [{'name': name, 'value': f"{name}-{rng.integers(100)}"} for name in ATTR_NAMES[:n_attrs]]
+        attrs[1]['value'] = f"2026-{rng.integers(1, 13):02d}-{rng.integers(1, 29):02d}"
+        values.append(json.dumps(attrs, ensure_ascii=False))
+    values[::97] = [''] * len(values[::97])  # 속성이 없는 행
+    return pd.Series(values, name='attributes')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+
+    for n in args.rows:
+        series = make_attributes(n)
+
+        start = time.perf_counter()
+        old = series.apply(expand_attrs).apply(pd.Series)
+        t_old = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new = expand_attributes(series)
+        t_new = time.perf_counter() - start
+
+        pd.testing.assert_frame_equal(old.astype(object), new[old.columns].astype(object))
+        print(f"{n:>8}행 | 기존 {t_old:7.2f}s | 일괄 {t_new:7.2f}s | x{t_old / t_new:.1f}")
+
+
+if __name__ == '__main__':
+    main()
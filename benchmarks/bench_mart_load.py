@@ -0,0 +1,113 @@
+"""
+분석 마트 로드 시간 벤치마크: 엑셀(read_excel, sheet_name=None) vs Parquet / Feather (common.storage)
+
+data/processed/analysis_mart.xlsx의 시트 구성을 따라 Sales_Data를 --rows 행으로 늘린
+합성 마트를 각 포맷으로 저장한 뒤 전체 로드, RFM용 컬럼만 로드하는 시간을 비교합니다.
+
+실행: python benchmarks/bench_mart_load.py --rows 10000 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.storage import SCHEMAS, apply_schema, export_excel, read_dataset, read_table, write_dataset
+
+RFM_COLUMNS = ['ykiho', 'sales_date', 'order_id', 'amount']
+
+
+def make_mart(n_sales, seed=0):
+    rng = np.random.default_rng(seed)
+    n_hosp = max(20, n_sales // 15)
+    ykiho = np.array([f"JD{i:06d}" for i in range(n_hosp)])
+    names = np.array([f"메디{i}병원" for i in range(n_hosp)])
+    products = np.array(['Blood Glucose Strip', 'COVID-19 Kit', 'Influenza A/B', 'Pregnancy Test'])
+
+    h = rng.integers(0, n_hosp, n_sales)
+    sales = pd.DataFrame({
+        'ykiho': ykiho[h],
+        'hospital_name': names[h],
+        'sales_date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 900, n_sales), unit='D'),
+        'order_id': [f"ORD-{i:08d}" for i in rng.integers(0, 10 ** 8, n_sales)],
+        'product_name': products[rng.integers(0, len(products), n_sales)],
+        'amount': rng.integers(1, 40, n_sales) * 5000,
+        'sku': [f"SKU-{i}" for i in rng.integers(0, 1000, n_sales)],
+    })
+    clients = pd.DataFrame({
+        'ykiho': ykiho, 'hospital_name': names,
+        'doctors_by_subject': '내과:2, 외과:1',
+        'has_dialysis': rng.choice(['Y', 'N'], n_hosp),
+        'total_equip_cnt': rng.integers(0, 50, n_hosp),
+        'nursing_grade_info': rng.choice([f"간호등급({g}등급)" for g in range(1, 6)], n_hosp),
+    })
+    n_equip = n_hosp * 3
+    equipment = pd.DataFrame({
+        'ykiho': ykiho[rng.integers(0, n_hosp, n_equip)],
+        'model_name': [f"MediScan-{i}" for i in rng.integers(1, 10, n_equip)],
+        'category': rng.choice(['MRI', 'CT', 'X-Ray', 'Ultrasound'], n_equip),
+        'install_date': pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 3650, n_equip), unit='D'),
+    })
+    tables = {'Sales_Data': sales, 'Client_Info': clients, 'Equipment_Info': equipment}
+    return {name: apply_schema(df, SCHEMAS[name]) for name, df in tables.items()}
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def dir_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 200000], help='Sales_Data 행 수')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for n in args.rows:
+        tables = make_mart(n)
+        with tempfile.TemporaryDirectory() as tmp:
+            xlsx = os.path.join(tmp, 'analysis_mart.xlsx')
+            pq_dir = os.path.join(tmp, 'parquet')
+            ft_dir = os.path.join(tmp, 'feather')
+            export_excel(tables, xlsx)
+            write_dataset(tables, pq_dir, fmt='parquet')
+            write_dataset(tables, ft_dir, fmt='feather')
+
+            # 엑셀은 한 번만 측정 (수십 초 이상 걸릴 수 있음)
+            cases = [
+                ('xlsx 전체', lambda: pd.read_excel(xlsx, sheet_name=None), 1, xlsx),
+                ('parquet 전체', lambda: read_dataset(pq_dir), args.repeat, pq_dir),
+                ('feather 전체', lambda: read_dataset(ft_dir), args.repeat, ft_dir),
+                ('feather 전체 (mmap)', lambda: read_dataset(ft_dir, memory_map=True), args.repeat, ft_dir),
+                ('xlsx Sales_Data 4컬럼', lambda: pd.read_excel(xlsx, sheet_name='Sales_Data', usecols=RFM_COLUMNS),
+                 1, None),
+                ('parquet Sales_Data 4컬럼',
+                 lambda: read_table(os.path.join(pq_dir, 'Sales_Data.parquet'), columns=RFM_COLUMNS), args.repeat, None),
+            ]
+
+            print(f"\n[Sales_Data {n:,}행]")
+            base = None
+            for label, fn, repeat, path in cases:
+                elapsed = timed(fn, repeat)
+                if label.startswith('xlsx'):
+                    base = elapsed
+                size = f"{dir_size(path) / 1e6:8.2f}MB" if path else ' ' * 10
+                print(f" - {label:<26} {elapsed:8.3f}s {size}  x{base / elapsed:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+RFM 계산 벤치마크: groupby.agg(lambda) + pd.qcut + apply (기존) vs common.rfm.run_rfm
+
+--rows 건의 합성 주문(--clients 거래처, 주문 수는 롱테일 분포)으로 두 방식을 비교합니다.
+R/F/M 값은 항상, 점수/등급은 기존 pd.qcut이 동작하는 경우에만 같은지 확인합니다
+(주문 수가 몰려 분위 경계가 겹치면 pd.qcut은 ValueError).
+
+실행: python benchmarks/bench_rfm.py --rows 1000000 10000000 --clients 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.rfm import run_rfm
+
+REFERENCE_DATE = pd.Timestamp('2025-06-30')
+
+
+def make_sales(n_rows, n_clients, seed=0):
+    rng = np.random.default_rng(seed)
+    # 일부 거래처에 주문이 몰리는 분포
+    weights = rng.pareto(1.5, n_clients) + 1
+    client = rng.choice(n_clients, n_rows, p=weights / weights.sum())
+    ykiho = pd.Series([f"JD{i:07d}" for i in range(n_clients)], dtype=object).to_numpy()[client]
+    dates = REFERENCE_DATE - pd.to_timedelta(rng.integers(1, 730, n_rows), unit='D')
+    return pd.DataFrame({'ykiho': ykiho, 'sales_date': dates, 'order_id': np.arange(n_rows),
+                         'amount': rng.integers(1, 500, n_rows) * 10000})
+
+
+def baseline(df_sales, reference_date):
+    """기존 01_Client_Segmentation_RFM.py 방식"""
+    rfm = df_sales.groupby('ykiho').agg({
+        'sales_date': lambda x: (reference_date - pd.to_datetime(x).max()).days,
+        'order_id': 'count',
+        'amount': 'sum'
+    }).rename(columns={'sales_date': 'Recency', 'order_id': 'Frequency', 'amount': 'Monetary'})
+
+    try:
+        rfm['R_Score'] = pd.qcut(rfm['Recency'], q=5, labels=range(5, 0, -1)).astype(int)
+        rfm['F_Score'] = pd.qcut(rfm['Frequency'], q=5, labels=range(1, 6)).astype(int)
+        rfm['M_Score'] = pd.qcut(rfm['Monetary'], q=5, labels=range(1, 6)).astype(int)
+    except ValueError as e:
+        return rfm, str(e)
+    rfm['RFM_Score'] = rfm['R_Score'] + rfm['F_Score'] + rfm['M_Score']
+
+    def segment_customer(score):
+        if score >= 13: return 'VIP (최우수)'
+        elif score >= 9: return 'Loyal (우수)'
+        elif score >= 5: return 'Potential (잠재)'
+        else: return 'Risk (이탈위험)'
+
+    rfm['Segment'] = rfm['RFM_Score'].apply(segment_customer)
+    return rfm, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000000, 10000000])
+    parser.add_argument('--clients', type=int, default=100000)
+    args = parser.parse_args()
+
+    for n in args.rows:
+        df_sales = make_sales(n, args.clients)
+
+        start = time.perf_counter()
+        old, error = baseline(df_sales, REFERENCE_DATE)
+        t_old = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new = run_rfm(df_sales, REFERENCE_DATE)
+        t_new = time.perf_counter() - start
+
+        pd.testing.assert_frame_equal(old[['Recency', 'Frequency', 'Monetary']],
+                                      new[['Recency', 'Frequency', 'Monetary']], check_dtype=False)
+        if error is None:
+            cols = ['R_Score', 'F_Score', 'M_Score', 'RFM_Score']
+            pd.testing.assert_frame_equal(old[cols], new[cols], check_dtype=False)
+            assert (old['Segment'].to_numpy() == new['Segment'].astype(str).to_numpy()).all()
+            checked = 'R/F/M·점수·등급 일치'
+        else:
+            checked = f"R/F/M 일치 (기존 qcut 실패: {error.splitlines()[0][:40]}...)"
+
+        print(f"{n:>10,}행 / 거래처 {len(new):,} | 기존 {t_old:6.2f}s | 엔진 {t_new:5.2f}s | "
+              f"x{t_old / t_new:.1f} | {checked}")
+
+
+if __name__ == '__main__':
+    main()
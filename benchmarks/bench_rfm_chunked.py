@@ -0,0 +1,92 @@
+"""
+RFM 배치 집계 벤치마크: 전체 로드 후 계산 (run_rfm) vs 배치 집계 (run_rfm_chunked)
+
+--rows 건의 합성 주문 이력을 Parquet(및 --csv 지정 시 CSV)로 저장한 뒤,
+각 방식을 별도 프로세스에서 실행하여 시간과 최대 메모리(RSS)를 비교하고 결과가 같은지 확인합니다.
+
+실행: python benchmarks/bench_rfm_chunked.py --rows 2000000 10000000 --batch-rows 1000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bench_rfm import REFERENCE_DATE, make_sales
+from common.rfm import run_rfm, run_rfm_chunked
+from common.storage import SCHEMAS, read_table, write_table
+
+COLUMNS = ['ykiho', 'sales_date', 'order_id', 'amount']
+
+
+def generate(n_rows, n_clients, paths):
+    """합성 이력 저장 (파이프라인과 같이 스키마를 적용하여 저장)"""
+    sales = make_sales(n_rows, n_clients)
+    for path in paths:
+        write_table(sales, path, schema=SCHEMAS['Sales_Data'])
+
+
+def worker(mode, path, out_path, batch_rows):
+    """한 가지 방식을 실행하고 (시간, 최대 RSS MB)를 JSON으로 출력"""
+    start = time.perf_counter()
+    if mode == 'memory':
+        rfm = run_rfm(read_table(path, columns=COLUMNS, schema=SCHEMAS['Sales_Data']), REFERENCE_DATE)
+    else:
+        rfm = run_rfm_chunked(path, REFERENCE_DATE, batch_rows=batch_rows, schema=SCHEMAS['Sales_Data'])
+    elapsed = time.perf_counter() - start
+    write_table(rfm.reset_index(), out_path)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KB
+    print(json.dumps({'seconds': elapsed, 'peak_mb': peak_mb}))
+
+
+def run_self(*args):
+    """이 스크립트를 별도 프로세스로 실행 (최대 RSS가 부모 프로세스의 메모리에 섞이지 않도록)"""
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), *map(str, args)],
+                            capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[2000000, 10000000])
+    parser.add_argument('--clients', type=int, default=100000)
+    parser.add_argument('--batch-rows', type=int, default=1000000)
+    parser.add_argument('--csv', action='store_true', help='CSV 입력도 비교')
+    parser.add_argument('--worker', nargs=3, metavar=('MODE', 'PATH', 'OUT'), help=argparse.SUPPRESS)
+    parser.add_argument('--generate', nargs='+', metavar='PATH', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker, args.batch_rows)
+        return
+    if args.generate:
+        generate(args.rows[0], args.clients, args.generate)
+        return
+
+    for n in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, 'sales.parquet')] + ([os.path.join(tmp, 'sales.csv')] if args.csv else [])
+            run_self('--rows', n, '--clients', args.clients, '--generate', *paths)
+
+            for path in paths:
+                stats, results = {}, {}
+                for mode in ('memory', 'chunked'):
+                    out_path = os.path.join(tmp, f"rfm_{mode}.parquet")
+                    output = run_self('--worker', mode, path, out_path, '--batch-rows', args.batch_rows)
+                    stats[mode] = json.loads(output.strip().splitlines()[-1])
+                    results[mode] = read_table(out_path)
+                pd.testing.assert_frame_equal(results['memory'], results['chunked'])
+
+                m, c = stats['memory'], stats['chunked']
+                print(f"{n:>11,}행 {os.path.splitext(path)[1]:>8} | 전체 로드 {m['seconds']:6.2f}s {m['peak_mb']:7.0f}MB | "
+                      f"배치 {c['seconds']:6.2f}s {c['peak_mb']:7.0f}MB | 결과 일치")
+
+
+if __name__ == '__main__':
+    main()
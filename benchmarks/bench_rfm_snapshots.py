@@ -0,0 +1,97 @@
+"""
+월별 RFM 스냅샷 벤치마크: 월말마다 전체 이력 재계산 (기존) vs 스냅샷 누적 (common.rfm_snapshots)
+
+--months 개월의 합성 주문 이력으로 월별 스냅샷을 만들고,
+각 월말 기준 run_rfm(해당 월까지의 전체 이력) 결과와 같은지 확인합니다.
+이어서 한 달치 거래를 추가했을 때의 증분 갱신 시간도 측정합니다.
+
+실행: python benchmarks/bench_rfm_snapshots.py --rows 5000000 --months 36
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.rfm import run_rfm
+from common.rfm_snapshots import build_snapshots, list_snapshots, period_end, read_snapshot, transition_matrix
+
+START = pd.Timestamp('2023-01-01')
+
+
+def make_history(n_rows, n_clients, n_months, seed=0):
+    """n_months 개월에 걸친 주문 (거래처마다 거래 시작/중단 시점이 다름)"""
+    rng = np.random.default_rng(seed)
+    weights = rng.pareto(1.5, n_clients) + 1
+    client = rng.choice(n_clients, n_rows, p=weights / weights.sum())
+    span = (START + pd.DateOffset(months=n_months) - START).days
+    # 거래처별 활동 기간 안에서 주문일 생성
+    begin = rng.integers(0, span // 2, n_clients)
+    length = rng.integers(span // 6, span, n_clients)
+    offset = begin[client] + (rng.random(n_rows) * length[client]).astype(np.int64)
+    dates = START + pd.to_timedelta(np.minimum(offset, span - 1), unit='D')
+    return pd.DataFrame({'ykiho': np.array([f"JD{i:07d}" for i in range(n_clients)], dtype=object)[client],
+                         'sales_date': dates, 'order_id': np.arange(n_rows).astype(str),
+                         'amount': rng.integers(1, 500, n_rows) * 10000}).sort_values('sales_date', ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000000)
+    parser.add_argument('--clients', type=int, default=100000)
+    parser.add_argument('--months', type=int, default=36)
+    args = parser.parse_args()
+
+    sales = make_history(args.rows, args.clients, args.months + 1)
+    last_period = sales['sales_date'].max().to_period('M')
+    history, new_month = (sales[sales['sales_date'].dt.to_period('M') < last_period],
+                          sales[sales['sales_date'].dt.to_period('M') == last_period])
+    periods = pd.period_range(history['sales_date'].min(), history['sales_date'].max(), freq='M')
+
+    # 참고: 전체 이력 1회 계산
+    start = time.perf_counter()
+    run_rfm(history, period_end(periods[-1]))
+    t_once = time.perf_counter() - start
+
+    # 기존: 월말마다 그때까지의 전체 이력으로 재계산
+    start = time.perf_counter()
+    expected = {}
+    for period in periods:
+        end = period_end(period)
+        expected[period] = run_rfm(history[history['sales_date'] <= end], end)
+    t_full = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        written = build_snapshots(history, tmp)
+        t_snap = time.perf_counter() - start
+        assert written == list(periods)
+
+        for period in periods:
+            snap = read_snapshot(period, tmp).drop(columns='last_date')
+            pd.testing.assert_frame_equal(snap, expected[period], check_dtype=False, check_categorical=False)
+
+        start = time.perf_counter()
+        added = build_snapshots(new_month, tmp)
+        t_inc = time.perf_counter() - start
+
+        expected_last = run_rfm(sales, period_end(last_period))
+        pd.testing.assert_frame_equal(read_snapshot(last_period, tmp).drop(columns='last_date'), expected_last,
+                                      check_dtype=False, check_categorical=False)
+
+        prev, curr = list_snapshots(tmp)[-2:]
+        print(f"\n[등급 이동: {prev} → {curr}]")
+        print(transition_matrix(read_snapshot(prev, tmp), read_snapshot(curr, tmp)).to_string())
+
+    print(f"\n주문 {args.rows:,}건 / 거래처 {args.clients:,} / {len(periods)}개월 | "
+          f"전체 1회 {t_once:.2f}s | 월별 전체 재계산 {t_full:.2f}s | 스냅샷 누적 {t_snap:.2f}s | "
+          f"x{t_full / t_snap:.1f} | 결과 일치")
+    print(f"다음 달({', '.join(map(str, added))}) 거래 {len(new_month):,}건 증분 추가: {t_inc:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
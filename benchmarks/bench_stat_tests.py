@@ -0,0 +1,90 @@
+"""
+전체 변수 쌍 검정 벤치마크: 쌍마다 scipy 호출 (기존 GUI 방식) vs 행렬 단위 계산 (common.stat_tests)
+
+- Pearson: dropna + pearsonr 쌍별 호출 vs corr_matrix (결측 쌍별 제외, p값 벡터화)
+- 카이제곱: pd.crosstab + chi2_contingency 쌍별 호출 vs chi2_matrix (정수 코드 + np.bincount)
+결측이 섞인 합성 피처 마트로 두 방식의 통계량/p값이 같은지 확인합니다.
+
+실행: python benchmarks/bench_stat_tests.py --rows 20000 --numeric 200 --categorical 60
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2_contingency, pearsonr
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.stat_tests import chi2_matrix, corr_matrix
+
+
+def make_mart(n_rows, n_numeric, n_categorical, missing=0.05, seed=0):
+    """수치형/범주형 피처 (일부 컬럼끼리 연관, 결측 포함)"""
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(n_rows, 1))
+    numeric = rng.normal(size=(n_rows, n_numeric)) + base * rng.uniform(0, 1, n_numeric)
+    numeric[rng.random(numeric.shape) < missing] = np.nan
+    df = pd.DataFrame(numeric * 1e4, columns=[f"num_{i}" for i in range(n_numeric)])
+
+    levels = np.array(list('ABCDEFGH'), dtype=object)
+    for i in range(n_categorical):
+        codes = np.clip((base[:, 0] * (i % 3) + rng.normal(size=n_rows) * 2 + 4).astype(int), 0, 7)
+        values = levels[codes]
+        values[rng.random(n_rows) < missing] = None
+        df[f"cat_{i}"] = values
+    return df
+
+
+def pairwise_pearson(df, columns):
+    """기존: 쌍마다 dropna + pearsonr"""
+    r, p = {}, {}
+    for i, a in enumerate(columns):
+        for b in columns[i + 1:]:
+            pair = df[[a, b]].dropna()
+            r[a, b], p[a, b] = pearsonr(pair[a], pair[b])
+    return r, p
+
+
+def pairwise_chi2(df, columns):
+    """기존: 쌍마다 crosstab + chi2_contingency"""
+    stat, p = {}, {}
+    for i, a in enumerate(columns):
+        for b in columns[i + 1:]:
+            stat[a, b], p[a, b], _, _ = chi2_contingency(pd.crosstab(df[a], df[b]))
+    return stat, p
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--numeric', type=int, default=200)
+    parser.add_argument('--categorical', type=int, default=60)
+    args = parser.parse_args()
+
+    df = make_mart(args.rows, args.numeric, args.categorical)
+    num_cols = [c for c in df.columns if c.startswith('num_')]
+    cat_cols = [c for c in df.columns if c.startswith('cat_')]
+
+    for name, naive, matrix, cols in (('Pearson', pairwise_pearson, corr_matrix, num_cols),
+                                      ('카이제곱', pairwise_chi2, chi2_matrix, cat_cols)):
+        start = time.perf_counter()
+        expected_stat, expected_p = naive(df, cols)
+        t_naive = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stat, p = matrix(df, cols)[:2]
+        t_matrix = time.perf_counter() - start
+
+        pairs = list(expected_stat)
+        np.testing.assert_allclose([stat.loc[a, b] for a, b in pairs], [expected_stat[k] for k in pairs],
+                                   rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose([p.loc[a, b] for a, b in pairs], [expected_p[k] for k in pairs],
+                                   rtol=1e-6, atol=1e-12)
+        print(f"{name:>6} | 변수 {len(cols):>4}개 ({len(pairs):,}쌍) x {args.rows:,}행 | "
+              f"쌍별 {t_naive:7.2f}s | 행렬 {t_matrix:6.2f}s | x{t_naive / t_matrix:.1f} | 결과 일치")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+웨어하우스 조인 키 벤치마크: 문자열 키 직접 조인 (기존) vs 정수 대리키 + 적재 시 중복 제거 (common.warehouse)
+
+--hospitals 개 병원의 합성 상세정보와 SKU/장비 매핑 테이블로
+01_Hospital_Features, 02_Sales_Mart, 03_Equipment_Status를 실행하여 시간을 비교하고
+두 방식의 결과가 같은지 확인합니다. 기존 방식은 원천 파일 뷰에 이전 쿼리를 그대로 실행합니다.
+
+실행: python benchmarks/bench_warehouse_keys.py --hospitals 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bench_feature_mart import make_sources
+from common.warehouse import Warehouse, fetch_arrow, translate_mysql
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '03_SQL_Warehouse')
+MARTS = ['01_Hospital_Features.sql', '02_Sales_Mart.sql', '03_Equipment_Status.sql']
+
+# 대리키 도입 전 쿼리 (문자열 키 조인, 쿼리마다 중복 제거)
+BASELINE_SQL = {
+    '01_Hospital_Features.sql': """
+WITH Doctor_Stats AS (
+    SELECT `암호화된 요양기호` AS ykiho, 출력명 AS hospital_name,
+        GROUP_CONCAT(CONCAT(진료과목코드명, '(', 의사수, ')') ORDER BY 진료과목코드 ASC SEPARATOR ', ') AS doctors_by_subject
+    FROM hospital_detail_dgsbjt_info GROUP BY `암호화된 요양기호`, 출력명
+),
+Equipment_Stats AS (
+    SELECT `암호화된 요양기호` AS ykiho,
+        GROUP_CONCAT(CONCAT(장비명, '(', 장비대수, ')') ORDER BY 장비코드 ASC SEPARATOR ', ') AS equipment_list
+    FROM hospital_detail_equip_info GROUP BY `암호화된 요양기호`
+),
+Nursing_Grade AS (
+    SELECT `암호화된 요양기호` AS ykiho,
+        GROUP_CONCAT(CONCAT(`구분 코드명`, '(', 간호등급, ')') ORDER BY `구분 코드` ASC SEPARATOR ', ') AS nursing_grade_info
+    FROM hospital_detail_nursing_info GROUP BY `암호화된 요양기호`
+),
+Key_Equipment_Flag AS (
+    SELECT `암호화된 요양기호` AS ykiho, SUM(장비대수) AS total_equip_count,
+        CASE WHEN SUM(CASE WHEN 장비명 LIKE '%인공신장기%' THEN 1 ELSE 0 END) > 0 THEN 'Y' ELSE 'N' END AS has_dialysis_machine
+    FROM hospital_detail_equip_info GROUP BY `암호화된 요양기호`
+),
+Specialist_Count AS (
+    SELECT `암호화된 요양기호` AS ykiho,
+        SUM(CASE WHEN 진료과목코드명 = '가정의학과' THEN `전문과목별 전문의 수` ELSE 0 END) AS cnt_family_med,
+        SUM(CASE WHEN 진료과목코드명 = '내과' THEN `전문과목별 전문의 수` ELSE 0 END) AS cnt_internal_med,
+        SUM(CASE WHEN 진료과목코드명 = '비뇨의학과' THEN `전문과목별 전문의 수` ELSE 0 END) AS cnt_urology
+    FROM hospital_detail_sdr_info GROUP BY `암호화된 요양기호`
+)
+SELECT a.ykiho, a.hospital_name, b.doctors_by_subject, c.equipment_list, d.nursing_grade_info,
+    e.total_equip_count, e.has_dialysis_machine, f.cnt_family_med, f.cnt_internal_med, f.cnt_urology,
+    g.`상급 입원실(병상수)` AS vip_beds, g.`수술실(병상수)` AS operating_rooms
+FROM Doctor_Stats a
+    LEFT JOIN client_basic_info m ON a.ykiho = m.ykiho
+    LEFT JOIN Doctor_Stats b ON a.ykiho = b.ykiho
+    LEFT JOIN Equipment_Stats c ON a.ykiho = c.ykiho
+    LEFT JOIN Nursing_Grade d ON a.ykiho = d.ykiho
+    LEFT JOIN Key_Equipment_Flag e ON a.ykiho = e.ykiho
+    LEFT JOIN Specialist_Count f ON a.ykiho = f.ykiho
+    LEFT JOIN hospital_detail_facility_info g ON a.ykiho = g.`암호화된 요양기호`
+""",
+    '02_Sales_Mart.sql': """
+WITH Equipment_Mapping AS (
+    SELECT SKU,
+        GROUP_CONCAT(DISTINCT 장비명 ORDER BY 장비명 SEPARATOR ', ') AS compatible_equipments,
+        GROUP_CONCAT(DISTINCT 장비대분류명 ORDER BY 장비대분류명 SEPARATOR ', ') AS equipment_category
+    FROM product_equipment_mapping GROUP BY SKU
+),
+Sales_Summary AS (
+    SELECT 제품_SKU AS SKU, 제품_이름 AS product_name, AVG(`매입가 (vat.포함)`) AS avg_purchase_price
+    FROM sales_transaction_data GROUP BY 제품_SKU, 제품_이름
+)
+SELECT s.SKU, s.product_name, s.avg_purchase_price, e.compatible_equipments, e.equipment_category
+FROM Sales_Summary s LEFT JOIN Equipment_Mapping e ON s.SKU = e.SKU
+""",
+    '03_Equipment_Status.sql': """
+WITH Valid_SKU_Mapping AS (
+    SELECT DISTINCT * FROM sku_equipment_matching
+),
+Equipment_Enrichment AS (
+    SELECT DISTINCT m.장비대분류명 AS category, e.장비_SKU, e.장비명 AS model_name, m.SKU, e.제품명 AS product_name
+    FROM equipment_list e
+        LEFT JOIN Valid_SKU_Mapping m USING(sku)
+        LEFT JOIN client_equipment_status s ON s.장비_SKU = m.장비_SKU
+    WHERE NOT (e.장비명 = 'Legacy_Model_A' AND m.장비대분류명 = 'Urinalysis') OR e.장비명 IS NOT NULL
+),
+Aggregated_Equipment AS (
+    SELECT SKU,
+        GROUP_CONCAT(DISTINCT model_name ORDER BY model_name SEPARATOR ', ') AS model_list,
+        GROUP_CONCAT(DISTINCT category ORDER BY category SEPARATOR ', ') AS category_list
+    FROM Equipment_Enrichment GROUP BY SKU
+)
+SELECT base.*, agg.model_list, agg.category_list
+FROM Equipment_Enrichment base JOIN Aggregated_Equipment agg USING(SKU)
+""",
+}
+
+
+def make_sku_tables(n_sku, n_hospitals, rng):
+    """SKU/장비 매핑 원천 테이블 (중복 행 포함)"""
+    sku = np.array([f"SKU-{i:08d}-{'X' * 24}" for i in range(n_sku)])
+    equip_sku = np.array([f"EQ-{i:07d}" for i in range(n_sku // 4)])
+    categories = np.array(['Urinalysis', 'Chemistry', 'Immunoassay', 'Hematology', 'POCT'])
+    models = np.array([f"Model-{i}" for i in range(200)] + ['Legacy_Model_A'])
+
+    def sample(n):
+        return rng.integers(0, n_sku, n), rng.integers(0, len(equip_sku), n)
+
+    s, e = sample(n_sku * 3)
+    matching = pd.DataFrame({'sku': sku[s], '장비_SKU': equip_sku[e],
+                             '장비대분류명': categories[rng.integers(0, len(categories), len(s))]})
+    s, e = sample(n_sku * 2)
+    equipment = pd.DataFrame({'sku': sku[s], '장비_SKU': equip_sku[e],
+                              '장비명': models[rng.integers(0, len(models), len(s))],
+                              '제품명': [f"제품{i % 5000}" for i in s]})
+    s, _ = sample(n_sku * 2)
+    mapping = pd.DataFrame({'SKU': sku[s], '장비명': models[rng.integers(0, len(models), len(s))],
+                            '장비대분류명': categories[rng.integers(0, len(categories), len(s))]})
+    s, _ = sample(n_hospitals * 10)
+    sales = pd.DataFrame({'제품_SKU': sku[s], '제품_이름': [f"제품{i % 5000}" for i in s],
+                          '매입가 (vat.포함)': rng.integers(1, 100, len(s)) * 1000})
+    status = pd.DataFrame({'장비_SKU': equip_sku[rng.integers(0, len(equip_sku), n_hospitals)]})
+
+    # 매핑 테이블에 완전 중복 행 추가
+    matching = pd.concat([matching, matching.sample(frac=0.3, random_state=0)], ignore_index=True)
+    equipment = pd.concat([equipment, equipment.sample(frac=0.3, random_state=0)], ignore_index=True)
+    return {'sku_equipment_matching': matching, 'equipment_list': equipment, 'product_equipment_mapping': mapping,
+            'sales_transaction_data': sales, 'client_equipment_status': status}
+
+
+def sort_frame(table):
+    df = table.to_pandas()
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hospitals', type=int, default=100000)
+    parser.add_argument('--skus', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # 실제 요양기호처럼 긴 암호화 문자열 키
+    ykiho = np.array([f"JDQ4MTYx{i:08d}" + 'M' * 40 for i in range(args.hospitals)])
+    details = make_sources(ykiho, rng)
+    others = make_sku_tables(args.skus, args.hospitals, rng)
+    others['client_basic_info'] = pd.DataFrame({'ykiho': ykiho})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        detail_dir, raw_dir = os.path.join(tmp, 'detail'), os.path.join(tmp, 'raw')
+        os.makedirs(detail_dir)
+        os.makedirs(raw_dir)
+        files = {}
+        for name, df in details.items():
+            files['hospital_detail_' + name] = os.path.join(detail_dir, f"{name}.parquet")
+            df.to_parquet(files['hospital_detail_' + name], index=False)
+        for name, df in others.items():
+            files[name] = os.path.join(raw_dir, f"{name}.parquet")
+            df.to_parquet(files[name], index=False)
+
+        # 기존: 원천 파일 뷰에 문자열 키 쿼리 실행
+        con = duckdb.connect()
+        for name, path in files.items():
+            con.execute(f"CREATE VIEW \"{name}\" AS SELECT * FROM read_parquet('{path}')")
+
+        warehouse = Warehouse(source_dirs=[raw_dir], detail_dir=detail_dir)
+        print(f"병원 {args.hospitals:,}곳, SKU {args.skus:,}개")
+        for mart in MARTS:
+            with open(os.path.join(SQL_DIR, mart), encoding='utf-8') as f:
+                sql = f.read()
+
+            t_before = t_load = t_query = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                before = fetch_arrow(con.execute(translate_mysql(BASELINE_SQL[mart])))
+                t_before = min(t_before, time.perf_counter() - start)
+
+                start = time.perf_counter()
+                warehouse.sources.clear()  # 매번 다시 적재
+                warehouse.load(warehouse.resolve_sources(sql))
+                t_load = min(t_load, time.perf_counter() - start)
+
+                start = time.perf_counter()
+                after = fetch_arrow(warehouse.con.execute(translate_mysql(sql)))
+                t_query = min(t_query, time.perf_counter() - start)
+
+            pd.testing.assert_frame_equal(sort_frame(before), sort_frame(after), check_dtype=False)
+            print(f" - {mart:<26} 기존 {t_before:6.2f}s | 적재 {t_load:6.2f}s + 쿼리 {t_query:6.2f}s "
+                  f"| 쿼리 x{t_before / t_query:.1f} ({after.num_rows:,}행)")
+        warehouse.close()
+        con.close()
+
+
+if __name__ == '__main__':
+    main()
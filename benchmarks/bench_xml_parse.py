@@ -0,0 +1,95 @@
+"""
+응답 파싱 벤치마크: 기존 방식(ET.fromstring + dict 리스트 누적 + DataFrame)
+vs 스트리밍 파싱(iterparse) + 청크 단위 컬럼형 저장
+
+전체 item 수(1k/10k/100k)를 응답 1건당 100개씩 나눠 파싱하고 CSV로 저장합니다.
+각 방식은 별도 프로세스에서 실행하여 파싱 시간과 최대 메모리(RSS) 증가량을 측정합니다.
+
+실행: python benchmarks/bench_xml_parse.py --sizes 1000 10000 100000
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+ITEMS_PER_RESPONSE = 100
+
+
+def peak_rss_mb():
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 1024 ** 2
+    except ImportError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_responses(n_items):
+    """응답을 하나씩 생성 (응답 본문 자체는 메모리 측정에 포함되지 않도록)"""
+    from mock_api_server import build_items_xml
+    for i in range(max(1, n_items // ITEMS_PER_RESPONSE)):
+        yield build_items_xml(ITEMS_PER_RESPONSE, f"YK{i:06d}")
+
+
+def run_baseline(n_items, out_path):
+    import xml.etree.ElementTree as ET
+    import pandas as pd
+
+    base = peak_rss_mb()
+    start = time.perf_counter()
+    results = []
+    for body in make_responses(n_items):
+        root = ET.fromstring(body.decode('utf-8'))
+        for item in root.findall('.//item'):
+            results.append({child.tag: child.text for child in item})
+    pd.DataFrame(results).to_csv(out_path, index=False, encoding='utf-8-sig')
+    return time.perf_counter() - start, peak_rss_mb() - base
+
+
+def run_streaming(n_items, out_path):
+    from common.xml_stream import ResponseStream
+    from common.columnar_writer import ChunkedColumnarWriter
+
+    base = peak_rss_mb()
+    start = time.perf_counter()
+    with ChunkedColumnarWriter(out_path, types={'ddt': int}, chunk_rows=10000) as writer:
+        for body in make_responses(n_items):
+            writer.write_rows(ResponseStream(body, converters={'ddt': int}))
+    return time.perf_counter() - start, peak_rss_mb() - base
+
+
+def _child(method, n_items, out_path, queue):
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    queue.put(globals()[method](n_items, out_path))
+
+
+def measure(method, n_items, out_path):
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(method, n_items, out_path, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'items':>8} | {'기존(s)':>8} {'기존 RSS(MB)':>12} | {'스트리밍(s)':>10} {'스트리밍 RSS(MB)':>15}")
+        for n in args.sizes:
+            t_base, m_base = measure('run_baseline', n, os.path.join(tmp, 'base.csv'))
+            t_stream, m_stream = measure('run_streaming', n, os.path.join(tmp, 'stream.csv'))
+            print(f"{n:>8} | {t_base:>8.2f} {m_base:>12.1f} | {t_stream:>10.2f} {m_stream:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
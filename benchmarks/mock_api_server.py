@@ -0,0 +1,89 @@
+"""
+공공데이터포털 API를 흉내내는 로컬 목(mock) 서버 (벤치마크 전용)
+
+모든 경로에 대해 지정한 지연시간 후 <item>이 n개 들어있는 XML을 응답합니다.
+responder를 주면 경로/쿼리에 따라 응답 본문을 만듭니다 (synthetic_data.MockPortal: 병원 목록, 상세정보, UDI).
+HTTP/1.1 keep-alive를 지원하므로 커넥션 재사용 효과도 측정할 수 있습니다.
+"""
+from xml.sax.saxutils import escape
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def build_response_xml(rows, total_count=None, page_no=1):
+    """행(dict) 목록 → 공공데이터포털 형식 응답 XML (bytes)"""
+    items = ''.join(
+        '<item>' + ''.join(f"<{tag}>{escape(str(value))}</{tag}>" for tag, value in row.items()) + '</item>'
+        for row in rows
+    )
+    return (
+        "<response><header><resultCode>00</resultCode><resultMsg>NORMAL SERVICE.</resultMsg></header>"
+        f"<body><items>{items}</items><numOfRows>{len(rows)}</numOfRows><pageNo>{page_no}</pageNo>"
+        f"<totalCount>{len(rows) if total_count is None else total_count}</totalCount></body></response>"
+    ).encode('utf-8')
+
+
+def build_items_xml(n_items, ykiho='MOCK'):
+    return build_response_xml([{'ykiho': ykiho, 'dgsbjtCd': f"{i:02d}", 'dgsbjtCdNm': f"과목{i}", 'ddt': i % 7}
+                               for i in range(n_items)])
+
+
+QUOTA_ERROR_XML = (
+    "<OpenAPI_ServiceResponse><cmmMsgHeader><errMsg>SERVICE ERROR</errMsg>"
+    "<returnAuthMsg>LIMITED_NUMBER_OF_SERVICE_REQUESTS_EXCEEDS_ERROR</returnAuthMsg>"
+    "<returnReasonCode>22</returnReasonCode></cmmMsgHeader></OpenAPI_ServiceResponse>"
+).encode('utf-8')
+
+
+def start_mock_server(latency=0.05, n_items=5, port=0, error_rate=0.0, quota_after=None, responder=None):
+    """
+    백그라운드 스레드에서 목 서버를 띄우고 (server, base_url)을 반환.
+    사용 후 server.shutdown()으로 종료합니다.
+
+    responder : (경로, {파라미터: 값}) → 응답 본문(bytes). 없으면 <item> n_items개
+
+    error_rate : 이 비율만큼 HTTP 500을 응답 (재시도 동작 확인용)
+    quota_after : 이 건수 이후로는 호출 한도 초과 오류 XML을 응답
+    """
+    state = {'requests': 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True  # 헤더와 본문이 나뉘어 전송될 때 생기는 지연 방지
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+            if responder is not None:
+                body = responder(parsed.path, query)
+            else:
+                body = build_items_xml(n_items, query.get('ykiho', 'MOCK'))
+            time.sleep(latency)  # 원격 API 응답 지연 재현
+
+            with lock:
+                state['requests'] += 1
+                n_requests = state['requests']
+
+            status = 200
+            if quota_after is not None and n_requests > quota_after:
+                body = QUOTA_ERROR_XML
+            elif random.random() < error_rate:
+                status, body = 500, b'Internal Server Error'
+
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/xml; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
@@ -0,0 +1,288 @@
+"""
+운영 규모 합성 데이터 생성기 (시드 고정)
+
+파이프라인 전체를 운영 데이터 규모로 실행해 보기 위한 입력을 저장소와 같은 폴더 구조로 만듭니다.
+- data/raw/boxhero.csv: BoxHero 재고 내보내기 (attributes JSON 포함)
+- data/raw/client_list.csv: 내부 거래처 목록 (공공데이터 병원명에서 접미사가 빠진 이름)
+- data/raw/target_barcodes.csv: UDI 조회 대상 바코드 (13/14자리 혼용, 중복/형식 오류 포함)
+- data/raw/<웨어하우스 원천>.parquet: 매출 거래, SKU/장비 매핑, 거래처 마스터
+- data/raw/Sales_Data.parquet: 매출 이력 (2023-01 ~ 2025-06, 웨어하우스 단계가 분석 마트로 게시하는 RFM 입력)
+- MockPortal: 병원 목록/상세정보/UDI API 응답 (mock_api_server.start_mock_server의 responder)
+
+같은 시드와 규모면 항상 같은 데이터가 만들어집니다. 큰 파일은 청크 단위로 써서 메모리를 일정하게 유지합니다.
+
+실행: python benchmarks/synthetic_data.py --scale 1m --out /tmp/synthetic
+"""
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from zlib import crc32
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from bench_warehouse_keys import make_sku_tables
+from mock_api_server import build_response_xml
+from common.storage import SCHEMAS, apply_schema
+
+# 규모별 데이터 크기 (sales/boxhero: 행 수, 나머지: 개수)
+Scale = namedtuple('Scale', ['sales', 'boxhero', 'hospitals', 'clients', 'barcodes', 'skus'])
+SCALES = {
+    '10k': Scale(10_000, 10_000, 500, 300, 500, 500),
+    '100k': Scale(100_000, 100_000, 2_000, 1_000, 2_000, 2_000),
+    '1m': Scale(1_000_000, 1_000_000, 10_000, 5_000, 10_000, 10_000),
+    '10m': Scale(10_000_000, 10_000_000, 50_000, 20_000, 50_000, 20_000),
+}
+
+CHUNK_ROWS = 250_000
+SALES_START, SALES_END = pd.Timestamp('2023-01-01'), pd.Timestamp('2025-06-30')
+
+# 종별코드 (코드, 이름, 비율)
+CL_CODES = [('01', '상급종합병원', 0.01), ('11', '종합병원', 0.05), ('21', '병원', 0.12),
+            ('28', '요양병원', 0.1), ('29', '정신병원', 0.02), ('31', '의원', 0.7)]
+REGIONS = [f"구역{i}구" for i in range(60)]
+SUFFIXES = ['의원', '병원', '내과의원', '정형외과의원', '요양병원']
+SUBJECTS = [('01', '내과'), ('04', '외과'), ('23', '가정의학과'), ('15', '비뇨의학과'), ('11', '소아청소년과'),
+            ('05', '정형외과'), ('12', '안과'), ('14', '피부과')]
+EQUIPMENT = [('A01', '인공신장기'), ('B01', 'CT'), ('B02', 'MRI'), ('C01', '초음파'), ('C02', 'X-Ray'), ('D01', '내시경')]
+MANUFACTURERS = ['MediCorp', 'BioLab', 'HealthOne', 'GeneTech', 'DiagPlus', 'KMed', 'SamHwa', 'Orion']
+STORAGE = ['Room Temp', '2-8°C', '-20°C']
+
+
+def hospital_table(n_hospitals, seed=0):
+    """공공데이터 병원 기본정보 (요양기호, 병원명, 지역, 종별)"""
+    rng = np.random.default_rng([seed, 1])
+    idx = np.arange(n_hospitals)
+    cl = rng.choice(len(CL_CODES), n_hospitals, p=[w for _, _, w in CL_CODES])
+    regions = np.array(REGIONS)[rng.integers(0, len(REGIONS), n_hospitals)]
+    return pd.DataFrame({
+        'ykiho': [f"JDQ4MTYx{i:08d}M" for i in idx],
+        'stem': [f"메디{i:05d}" for i in idx],
+        'yadmNm': [f"메디{i:05d}{SUFFIXES[i % len(SUFFIXES)]}" for i in idx],
+        'sidoCdNm': '서울',
+        'sgguCdNm': regions,
+        'addr': [f"서울특별시 {r} 테헤란로 {i % 500}" for i, r in zip(idx, regions)],
+        'clCd': np.array([c for c, _, _ in CL_CODES])[cl],
+        'clCdNm': np.array([name for _, name, _ in CL_CODES])[cl],
+    })
+
+
+def make_client_list(hospitals, n_clients, seed=0):
+    """내부 거래처 목록 (병원명 접미사 없음, 주소 표기 다름)"""
+    rng = np.random.default_rng([seed, 2])
+    picked = hospitals.iloc[np.sort(rng.choice(len(hospitals), min(n_clients, len(hospitals)), replace=False))]
+    return pd.DataFrame({'client_name': picked['stem'].to_numpy(),
+                         'address': ('서울시 ' + picked['sgguCdNm'] + ' 테헤란로 1').to_numpy()})
+
+
+def gtin_with_check_digit(body13):
+    """13자리 숫자 → GS1 체크 디지트를 붙인 14자리 GTIN"""
+    digits = np.array([[int(c) for c in b] for b in body13])
+    weights = np.where(np.arange(13) % 2 == 0, 3, 1)
+    check = (10 - (digits * weights).sum(axis=1) % 10) % 10
+    return [b + str(c) for b, c in zip(body13, check)]
+
+
+def make_barcodes(n_barcodes, seed=0):
+    """UDI 조회 대상 바코드. 14자리 GTIN의 13자리 표기, 같은 제품 중복, 형식 오류가 섞여 있음"""
+    rng = np.random.default_rng([seed, 3])
+    gtins = gtin_with_check_digit([f"0880{v:09d}" for v in rng.choice(10 ** 9, n_barcodes, replace=False)])
+    barcodes = np.array([g[1:] if i % 2 else g for i, g in enumerate(gtins)], dtype=object)  # 절반은 13자리
+    dup = rng.choice(n_barcodes, max(1, n_barcodes // 20))
+    invalid = [f"BAD-{i}" for i in range(max(1, n_barcodes // 200))]
+    return pd.DataFrame({'barcode': np.concatenate([barcodes, [gtins[i] for i in dup], invalid])})
+
+
+def _attributes_json(rng, n):
+    """BoxHero attributes 컬럼 (행마다 JSON 배열 문자열, 일부는 속성 없음)"""
+    manufacturer = np.array(MANUFACTURERS, dtype=object)[rng.integers(0, len(MANUFACTURERS), n)]
+    expiry = (pd.Timestamp('2025-07-01') + pd.to_timedelta(rng.integers(0, 900, n), unit='D')).strftime('%Y-%m-%d')
+    storage = np.array(STORAGE, dtype=object)[rng.integers(0, len(STORAGE), n)]
+    lot = pd.Series(rng.integers(0, 10 ** 6, n)).map('L{:06d}'.format).to_numpy(dtype=object)
+    values = ('[{"name": "Manufacturer", "value": "' + manufacturer + '"}, {"name": "Expiry", "value": "'
+              + np.asarray(expiry, dtype=object) + '"}, {"name": "Storage", "value": "' + storage
+              + '"}, {"name": "Lot", "value": "' + lot + '"}]')
+    values[rng.random(n) < 0.01] = ''
+    return values
+
+
+def write_boxhero(path, n_rows, seed=0, chunk_rows=CHUNK_ROWS):
+    """BoxHero 내보내기 CSV (name, quantity, attributes). 행 수를 반환"""
+    rng = np.random.default_rng([seed, 4])
+    products = np.array([f"시약{i:05d}" for i in range(max(n_rows // 20, 10))], dtype=object)
+    for start in range(0, n_rows, chunk_rows):
+        n = min(chunk_rows, n_rows - start)
+        pd.DataFrame({
+            'name': products[rng.integers(0, len(products), n)],
+            'quantity': rng.integers(0, 500, n),
+            'attributes': _attributes_json(rng, n),
+        }).to_csv(path, mode='w' if start == 0 else 'a', header=(start == 0), index=False, encoding='utf-8')
+    return n_rows
+
+
+def write_sales(sales_path, transaction_path, hospitals, skus, n_rows, seed=0, chunk_rows=CHUNK_ROWS):
+    """
+    매출 이력. 같은 거래를 두 형태로 저장합니다.
+    - Sales_Data (매출 이력, RFM 입력): ykiho, hospital_name, sales_date, order_id, product_name, amount, sku
+    - sales_transaction_data (웨어하우스 원천): sku, 제품_이름, 매입가 (vat.포함), sales_date
+    행 수를 반환합니다.
+    """
+    rng = np.random.default_rng([seed, 5])
+    weights = rng.pareto(1.5, len(hospitals)) + 1  # 소수 거래처에 매출 집중
+    weights /= weights.sum()
+    ykiho, names = hospitals['ykiho'].to_numpy(dtype=object), hospitals['yadmNm'].to_numpy(dtype=object)
+    product_names = np.array([f"제품{i % 5000}" for i in range(len(skus))], dtype=object)
+    price = rng.integers(1, 100, len(skus)) * 1000
+    span = (SALES_END - SALES_START).days + 1
+
+    writers = {}
+    try:
+        for start in range(0, n_rows, chunk_rows):
+            n = min(chunk_rows, n_rows - start)
+            client = rng.choice(len(hospitals), n, p=weights)
+            sku = rng.integers(0, len(skus), n)
+            dates = SALES_START + pd.to_timedelta(np.sort(rng.integers(0, span, n)), unit='D')
+            quantity = rng.integers(1, 20, n)
+            frames = {
+                sales_path: apply_schema(pd.DataFrame({
+                    'ykiho': ykiho[client], 'hospital_name': names[client], 'sales_date': dates,
+                    'order_id': [f"O{i:09d}" for i in range(start, start + n)], 'product_name': product_names[sku],
+                    'amount': price[sku] * quantity, 'sku': skus[sku],
+                }), SCHEMAS['Sales_Data']),
+                transaction_path: pd.DataFrame({'sku': skus[sku], '제품_이름': product_names[sku],
+                                                '매입가 (vat.포함)': price[sku], 'sales_date': dates}),
+            }
+            for path, df in frames.items():
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if path not in writers:
+                    writers[path] = pq.ParquetWriter(path, table.schema)
+                writers[path].write_table(table.cast(writers[path].schema))
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return n_rows
+
+
+def generate(root, scale, seed=0, log=print):
+    """root/data 아래에 합성 입력 전체를 생성. {데이터: 행 수}와 MockPortal을 반환"""
+    raw_dir = os.path.join(root, 'data', 'raw')
+    os.makedirs(raw_dir, exist_ok=True)
+    sizes = {}
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        sizes[name] = fn()
+        log(f" - {name:<24} {sizes[name]:>12,}행 ({time.perf_counter() - start:.1f}s)")
+
+    hospitals = hospital_table(scale.hospitals, seed)
+    timed('client_list', lambda: _write_csv(make_client_list(hospitals, scale.clients, seed),
+                                            os.path.join(raw_dir, 'client_list.csv')))
+    timed('target_barcodes', lambda: _write_csv(make_barcodes(scale.barcodes, seed),
+                                                os.path.join(raw_dir, 'target_barcodes.csv')))
+    timed('boxhero', lambda: write_boxhero(os.path.join(raw_dir, 'boxhero.csv'), scale.boxhero, seed))
+
+    others = make_sku_tables(scale.skus, scale.hospitals, np.random.default_rng([seed, 7]))
+    others['client_basic_info'] = hospitals[['ykiho']]
+    for name in ('sku_equipment_matching', 'equipment_list', 'product_equipment_mapping', 'client_basic_info'):
+        timed(name, lambda name=name: _write_parquet(others[name], os.path.join(raw_dir, f"{name}.parquet")))
+    skus = np.unique(others['sku_equipment_matching']['sku'].to_numpy()).astype(object)
+    timed('Sales_Data', lambda: write_sales(
+        os.path.join(raw_dir, 'Sales_Data.parquet'), os.path.join(raw_dir, 'sales_transaction_data.parquet'),
+        hospitals, skus, scale.sales, seed))
+    return sizes, MockPortal(hospitals, seed)
+
+
+def _write_csv(df, path):
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+    return len(df)
+
+
+def _write_parquet(df, path):
+    df.to_parquet(path, index=False)
+    return len(df)
+
+
+class MockPortal:
+    """
+    공공데이터포털 API 응답 생성기 (start_mock_server의 responder)
+    - .../getHospBasisList: clCd별 병원 목록 (pageNo/numOfRows 페이지, totalCount)
+    - .../getUdiInfo: udi_di_code별 제품 정보 (약 20%는 데이터 없음)
+    - 그 외 오퍼레이션: ykiho별 상세정보 (진료과목, 장비, 간호등급, 시설)
+    응답 내용은 요청 값의 해시로 정해지므로 요청 순서/동시성과 관계없이 같습니다.
+    """
+
+    def __init__(self, hospitals, seed=0):
+        self.hospitals, self.seed = hospitals, seed
+        columns = ['ykiho', 'yadmNm', 'sidoCdNm', 'sgguCdNm', 'addr', 'clCd', 'clCdNm']
+        self.by_class = {cl: df[columns].to_dict('records') for cl, df in hospitals.groupby('clCd')}
+        self.cl_codes = sorted(self.by_class)
+        self.detail = {
+            'getMdlrtSbjectInfoList': self._subjects,
+            'getHospEquipInfoList': self._equipment,
+            'getNursigGradeInfoList': self._nursing,
+            'getFcltyInfoList': self._facility,
+        }
+
+    def __call__(self, path, query):
+        operation = path.rstrip('/').rsplit('/', 1)[-1]
+        if operation == 'getHospBasisList':
+            rows = self.by_class.get(query.get('clCd'), [])
+            page_no, num_rows = int(query.get('pageNo', 1)), int(query.get('numOfRows', 10))
+            return build_response_xml(rows[(page_no - 1) * num_rows:page_no * num_rows], len(rows), page_no)
+        if operation == 'getUdiInfo':
+            return build_response_xml(self._udi(query.get('udi_di_code', '')))
+        make_rows = self.detail.get(operation)
+        return build_response_xml(make_rows(self._rng(query.get('ykiho', ''))) if make_rows else [])
+
+    def _rng(self, key):
+        return np.random.default_rng([self.seed, crc32(key.encode())])
+
+    @staticmethod
+    def _subjects(rng):
+        picked = rng.choice(len(SUBJECTS), rng.integers(1, 6), replace=False)
+        return [{'dgsbjtCd': SUBJECTS[i][0], 'dgsbjtCdNm': SUBJECTS[i][1], 'ddt': int(rng.integers(1, 10)),
+                 'mdeptSdrCnt': int(rng.integers(0, 5)), 'dgsbjtPrSdrCnt': int(rng.integers(0, 5)),
+                 'cdiagDrCnt': int(rng.integers(0, 2))} for i in picked]
+
+    @staticmethod
+    def _equipment(rng):
+        picked = rng.choice(len(EQUIPMENT), rng.integers(0, 5), replace=False)
+        return [{'oftCd': EQUIPMENT[i][0], 'oftCdNm': EQUIPMENT[i][1], 'oftCnt': int(rng.integers(1, 5))}
+                for i in picked]
+
+    @staticmethod
+    def _nursing(rng):
+        return [{'typeCd': '1', 'gradeNm': '일반병동', 'grade': str(rng.integers(1, 8))}]
+
+    @staticmethod
+    def _facility(rng):
+        return [{'stdSickbdCnt': int(rng.integers(0, 300)), 'hghrSickbdCnt': int(rng.integers(0, 20)),
+                 'isnrSbdCnt': int(rng.integers(0, 10)), 'ptrmCnt': int(rng.integers(0, 5))}]
+
+    def _udi(self, code):
+        rng = self._rng(code)
+        if rng.random() < 0.2:
+            return []
+        return [{'mnfcoNm': MANUFACTURERS[rng.integers(0, len(MANUFACTURERS))], 'prductNm': f"진단시약 {code[-5:]}",
+                 'mdlNm': f"M-{code[-4:]}", 'strgMthd': STORAGE[rng.integers(0, len(STORAGE))]}]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=list(SCALES), default='10k')
+    parser.add_argument('--out', required=True, help='생성할 폴더 (아래에 data/raw, data/processed 생성)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"합성 데이터 생성 ({args.scale}: {SCALES[args.scale]}) → {args.out}")
+    generate(args.out, SCALES[args.scale], args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""
+파이프라인 단계(01~05)에서 공통으로 사용하는 모듈 모음
+
+번호가 붙은 각 폴더의 스크립트는 패키지로 import 할 수 없으므로,
+재사용 가능한 로직은 이 패키지에 두고 스크립트에서 불러와 사용합니다.
+"""
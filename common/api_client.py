@@ -0,0 +1,239 @@
+"""
+공공데이터포털 공통 API 클라이언트
+
+- 커넥션 풀 세션 재사용
+- 지수 백오프 + 지터 재시도 (네트워크 오류, 5xx, 일시적 서비스 오류 코드)
+- 공공데이터포털 XML 오류 응답(resultCode / returnReasonCode) 인식
+  (호출 한도 초과 LIMITED_NUMBER_OF_SERVICE_REQUESTS_EXCEEDS_ERROR 포함)
+- 연속 실패 시 요청을 차단하는 서킷 브레이커
+- 엔드포인트별 응답시간/오류 통계
+
+오류는 예외(ApiError)로 올라오므로 '데이터 없음'(정상 응답, item 0건)과 구분됩니다.
+"""
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from common.fetch_engine import create_session
+from common.metrics import latency_histogram
+from common.xml_stream import NORMAL_RESULT_CODES
+
+# 오류 코드 판별은 응답 앞부분의 헤더만 확인 (본문 전체를 파싱하지 않음)
+_HEADER_BYTES = 2048
+_RESULT_CODE = re.compile(rb'<resultCode>\s*([^<\s]*)\s*</resultCode>')
+_RESULT_MSG = re.compile(rb'<resultMsg>([^<]*)</resultMsg>')
+_REASON_CODE = re.compile(rb'<returnReasonCode>\s*([^<\s]*)\s*</returnReasonCode>')
+_AUTH_MSG = re.compile(rb'<returnAuthMsg>([^<]*)</returnAuthMsg>')
+
+RETRYABLE_CODES = {'01', '02', '04', '05', '99'}  # 어플리케이션/DB/HTTP/타임아웃/기타 오류
+QUOTA_CODES = {'22'}  # LIMITED_NUMBER_OF_SERVICE_REQUESTS_EXCEEDS_ERROR
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class ApiError(Exception):
+    """API 호출 실패 (재시도 후에도 실패했거나 재시도할 수 없는 오류)"""
+
+    def __init__(self, endpoint, message, code=None, retryable=False):
+        super().__init__(f"[{endpoint}] {message}" + (f" (code={code})" if code else ""))
+        self.endpoint = endpoint
+        self.code = code
+        self.retryable = retryable
+
+
+class QuotaExceededError(ApiError):
+    """일일 호출 한도 초과. 재시도해도 소용없으므로 즉시 서킷을 엽니다."""
+
+
+class CircuitOpenError(ApiError):
+    """서킷 브레이커가 열려 있어 요청하지 않음"""
+
+
+def check_envelope(body):
+    """
+    응답 헤더의 오류 코드 확인. 정상이면 None, 오류면 (code, message)를 반환.
+    HTTP 200이어도 본문이 오류 응답일 수 있습니다.
+    """
+    head = body[:_HEADER_BYTES]
+    match = _REASON_CODE.search(head)  # 게이트웨이 오류 (인증키, 호출 한도 등)
+    if match:
+        msg = _AUTH_MSG.search(head)
+        return match.group(1).decode(), (msg.group(1).decode() if msg else '')
+
+    match = _RESULT_CODE.search(head)
+    if match and match.group(1).decode() not in NORMAL_RESULT_CODES:
+        msg = _RESULT_MSG.search(head)
+        return match.group(1).decode(), (msg.group(1).decode() if msg else '')
+    return None
+
+
+class CircuitBreaker:
+    """
+    failure_threshold번 연속 실패하면 reset_timeout초 동안 요청을 차단(open)하고,
+    이후 한 번 시험 요청(half-open)을 허용하여 성공하면 다시 닫습니다.
+    """
+
+    def __init__(self, failure_threshold=10, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout and not self._trial_in_flight:
+                self._trial_in_flight = True  # half-open
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self, force_open=False):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if force_open or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+
+class EndpointMetrics:
+    """엔드포인트별 호출 수, 응답시간, 오류 유형 집계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(list)
+        self._errors = defaultdict(lambda: defaultdict(int))
+        self._retries = defaultdict(int)
+
+    def record(self, endpoint, latency, error=None):
+        with self._lock:
+            self._latencies[endpoint].append(latency)
+            if error is not None:
+                self._errors[endpoint][error] += 1
+
+    def record_retry(self, endpoint):
+        with self._lock:
+            self._retries[endpoint] += 1
+
+    def summary(self):
+        """{endpoint: {calls, errors, retries, p50_ms, p95_ms, max_ms, error_types, latency_histogram}}"""
+        with self._lock:
+            result = {}
+            for endpoint, latencies in self._latencies.items():
+                arr = np.asarray(latencies) * 1000
+                errors = dict(self._errors[endpoint])
+                result[endpoint] = {
+                    'calls': len(arr),
+                    'errors': sum(errors.values()),
+                    'retries': self._retries[endpoint],
+                    'p50_ms': round(float(np.percentile(arr, 50)), 1),
+                    'p95_ms': round(float(np.percentile(arr, 95)), 1),
+                    'max_ms': round(float(arr.max()), 1),
+                    'error_types': errors,
+                    'latency_histogram': latency_histogram(latencies),
+                }
+            return result
+
+    def print_summary(self):
+        print("\n[API 호출 통계]")
+        for endpoint, s in self.summary().items():
+            print(f" - {endpoint}: 호출 {s['calls']}건, 오류 {s['errors']}건, 재시도 {s['retries']}건, "
+                  f"p50 {s['p50_ms']}ms, p95 {s['p95_ms']}ms" + (f", 오류 유형 {s['error_types']}" if s['errors'] else ""))
+
+
+class ApiClient:
+    """
+    Parameters
+    ----------
+    pool_size : 커넥션 풀 크기 (동시 요청 수와 맞춤)
+    adapter_cls : TLSAdapter 등 커스텀 어댑터
+    retries : 재시도 횟수 (최초 요청 제외)
+    base_delay, max_delay : 백오프 대기 시간 (1, 2, 4, ...초, 지터 포함)
+    """
+
+    def __init__(self, pool_size=10, adapter_cls=HTTPAdapter, timeout=10, retries=3,
+                 base_delay=1.0, max_delay=30.0, failure_threshold=10, reset_timeout=60.0):
+        self.session = create_session(pool_size=pool_size, adapter_cls=adapter_cls)
+        self.timeout = timeout
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.metrics = EndpointMetrics()
+        self._breaker_args = (failure_threshold, reset_timeout)
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint):
+        """엔드포인트별 서킷 브레이커 (호출 한도는 오퍼레이션마다 따로 적용되므로)"""
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(*self._breaker_args)
+            return self._breakers[endpoint]
+
+    def get(self, url, params, limiter=None):
+        """
+        정상 응답 본문(bytes)을 반환. 실패 시 ApiError를 올립니다.
+        limiter(TokenBucket)를 넘기면 재시도를 포함한 모든 요청에 적용됩니다.
+        """
+        endpoint = url.rstrip('/').rsplit('/', 1)[-1]
+        breaker = self.breaker(endpoint)
+
+        for attempt in range(self.retries + 1):
+            if not breaker.allow():
+                raise CircuitOpenError(endpoint, "연속 실패로 요청이 차단되었습니다.")
+
+            if limiter is not None:
+                limiter.acquire()
+
+            start = time.perf_counter()
+            try:
+                resp = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                error = ApiError(endpoint, f"네트워크 오류: {e}", retryable=True)
+                self.metrics.record(endpoint, time.perf_counter() - start, type(e).__name__)
+            else:
+                latency = time.perf_counter() - start
+                error = self._check_response(endpoint, resp)
+                self.metrics.record(endpoint, latency, None if error is None else (error.code or 'http'))
+                if error is None:
+                    breaker.record_success()
+                    return resp.content
+
+            breaker.record_failure(force_open=isinstance(error, QuotaExceededError))
+            if not error.retryable or attempt == self.retries:
+                raise error
+
+            self.metrics.record_retry(endpoint)
+            delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+            time.sleep(delay + random.uniform(0, delay / 2))
+
+    @staticmethod
+    def _check_response(endpoint, resp):
+        if resp.status_code != 200:
+            return ApiError(endpoint, f"HTTP {resp.status_code}", code=str(resp.status_code),
+                            retryable=resp.status_code in RETRYABLE_STATUS)
+
+        envelope = check_envelope(resp.content)
+        if envelope is None:
+            return None
+        code, msg = envelope
+        if code in QUOTA_CODES or 'LIMITED_NUMBER_OF_SERVICE_REQUESTS' in msg:
+            return QuotaExceededError(endpoint, f"호출 한도 초과: {msg}", code=code)
+        return ApiError(endpoint, f"API 오류 응답: {msg}", code=code, retryable=code in RETRYABLE_CODES)
@@ -0,0 +1,123 @@
+"""
+BoxHero attributes(JSON) 컬럼 일괄 전개
+
+[{'name': 'Color', 'value': 'Red'}, ...] 형태의 문자열을 행마다 json.loads → pd.Series로
+만드는 대신, 여러 행을 하나의 JSON 배열로 묶어 한 번에 파싱하고
+(행, 속성명, 값) long 형식으로 펼친 뒤 한 번에 wide 형식으로 바꿉니다.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _DecodeError = orjson.JSONDecodeError
+except ImportError:  # orjson 미설치 시 표준 json 사용
+    _loads = json.loads
+    _DecodeError = json.JSONDecodeError
+
+# 한 번에 묶어서 파싱할 행 수 (잘못된 행이 있으면 이 단위로 행별 파싱으로 전환)
+BATCH_ROWS = 100000
+
+
+def expand_attrs(row):
+    """
+    [{'name': 'Color', 'value': 'Red'}, ...] 형태의 문자열을
+    {'Color': 'Red'} 딕셔너리로 변환 (행 단위 처리용)
+    """
+    if pd.isna(row) or row == '':
+        return {}
+
+    try:
+        # 문자열이면 JSON 로드, 리스트면 그대로 사용
+        data = json.loads(row) if isinstance(row, str) else row
+
+        if isinstance(data, list):
+            result = {}
+            for item in data:
+                # name과 value 키가 있는지 확인
+                if 'name' in item and 'value' in item:
+                    result[item['name']] = item['value']
+            return result
+        return {}
+
+    except (json.JSONDecodeError, TypeError):
+        return {}
+
+
+def _parse_rows(texts):
+    """행별 파싱. 잘못된 행은 None"""
+    parsed = []
+    for text in texts:
+        try:
+            parsed.append(_loads(text))
+        except (_DecodeError, ValueError):
+            parsed.append(None)
+    return parsed
+
+
+def _parse_batch(texts):
+    """
+    문자열 목록을 한 번에 파싱. 실패하면 행별로 파싱하여 잘못된 행만 빈 값으로 처리.
+    '[..],[..]'처럼 한 칸이 여러 값으로 읽히면 묶어도 파싱은 되지만 뒤 행이 밀리므로,
+    배열 모양이 아닌 칸이 있거나 파싱 결과 개수가 행 수와 다르면 행별 파싱으로 전환합니다.
+    """
+    if not all(text.lstrip().startswith('[') and text.rstrip().endswith(']') for text in texts):
+        return _parse_rows(texts)
+    try:
+        parsed = _loads('[' + ','.join(texts) + ']')
+    except (_DecodeError, ValueError):
+        return _parse_rows(texts)
+    return parsed if len(parsed) == len(texts) else _parse_rows(texts)
+
+
+def expand_attributes(series, batch_rows=BATCH_ROWS):
+    """
+    attributes 컬럼을 속성별 컬럼으로 전개한 DataFrame 반환 (index는 원본과 동일).
+    컬럼 순서는 처음 등장한 순서이며, 같은 행에 같은 속성이 여러 번 있으면 마지막 값을 사용합니다.
+    """
+    values = series.to_numpy(dtype=object)
+    is_text = np.array([isinstance(v, str) and v != '' for v in values], dtype=bool)
+    text_pos = np.flatnonzero(is_text)
+
+    row_idx, names, attr_values = [], [], []
+
+    def collect(pos, data):
+        if isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict) and 'name' in item and 'value' in item:
+                    row_idx.append(pos)
+                    names.append(item['name'])
+                    attr_values.append(item['value'])
+
+    for start in range(0, len(text_pos), batch_rows):
+        chunk = text_pos[start:start + batch_rows]
+        for pos, data in zip(chunk, _parse_batch(values[chunk].tolist())):
+            collect(pos, data)
+
+    # 문자열이 아닌 값(이미 리스트인 경우 등)은 기존 방식으로 처리
+    for pos in np.flatnonzero(~is_text):
+        for name, value in expand_attrs(values[pos]).items():
+            row_idx.append(pos)
+            names.append(name)
+            attr_values.append(value)
+
+    if not names:
+        return pd.DataFrame(index=series.index)
+
+    # long → wide: 속성명을 정수 코드로 바꿔 2차원 배열에 한 번에 배치
+    codes, columns = pd.factorize(pd.Series(names, dtype=object), sort=False)
+    row_idx = np.asarray(row_idx)
+    flat = row_idx * len(columns) + codes
+
+    # 중복 (행, 속성)은 마지막 값 유지
+    _, last = np.unique(flat[::-1], return_index=True)
+    keep = len(flat) - 1 - last
+
+    grid = np.full(len(values) * len(columns), np.nan, dtype=object)
+    grid[flat[keep]] = np.asarray(attr_values, dtype=object)[keep]
+    wide = pd.DataFrame(grid.reshape(len(values), len(columns)), index=series.index, columns=list(columns))
+    return wide.infer_objects()
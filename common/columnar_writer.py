@@ -0,0 +1,158 @@
+"""
+청크 단위 컬럼형 저장기
+
+행을 컬럼별 리스트에 모았다가 chunk_rows마다 파일에 기록하고 버퍼를 비웁니다.
+수집 건수와 관계없이 메모리에는 한 청크만 유지됩니다.
+확장자가 .parquet이면 Parquet(pyarrow 필요), 그 외에는 CSV(utf-8-sig)로 저장합니다.
+
+공공데이터 API는 값이 없는 태그를 생략하므로 이미 기록한 뒤에 새 컬럼이 나올 수 있습니다.
+이때는 기록한 내용을 청크 단위로 다시 읽어 새 컬럼(이전 행은 결측)을 붙인 임시 파일로 옮겨 쓰고
+이어서 기록합니다. (close() 시 원래 경로로 교체)
+"""
+import os
+
+import pandas as pd
+
+ARROW_TYPES = {int: 'int64', float: 'float64'}
+
+
+class ChunkedColumnarWriter:
+    """
+    Parameters
+    ----------
+    path : 저장 경로 (.parquet 또는 .csv)
+    types : {컬럼명: int/float} 지정하지 않은 컬럼은 문자열로 저장
+    chunk_rows : 버퍼를 파일로 내보낼 행 수
+
+    컬럼 구성은 지금까지 등장한 모든 태그의 합집합 (등장 순서)
+    """
+
+    def __init__(self, path, types=None, chunk_rows=50000):
+        self.path = path
+        self.types = types or {}
+        self.chunk_rows = chunk_rows
+        self.fmt = 'parquet' if path.endswith('.parquet') else 'csv'
+        self.rows_written = 0
+        self.added_columns = []  # 기록을 시작한 뒤 추가된 컬럼
+
+        self._buffer = {}
+        self._n_buffered = 0
+        self._handle = None
+        self._written = []  # 파일에 기록된 컬럼
+        self._file_path = path  # 현재 기록 중인 파일 (컬럼 추가 후에는 임시 파일)
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def write_row(self, row):
+        for col in row:
+            if col not in self._buffer:
+                self._buffer[col] = [None] * self._n_buffered
+
+        for col, values in self._buffer.items():
+            values.append(row.get(col))
+        self._n_buffered += 1
+
+        if self._n_buffered >= self.chunk_rows:
+            self.flush()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write_row(row)
+
+    def flush(self):
+        if self._n_buffered == 0:
+            return
+
+        if self._handle is not None and len(self._buffer) > len(self._written):
+            self._add_columns()
+
+        if self.fmt == 'parquet':
+            self._flush_parquet()
+        else:
+            self._flush_csv()
+
+        self.rows_written += self._n_buffered
+        self._written = list(self._buffer)
+        self._buffer = {col: [] for col in self._buffer}
+        self._n_buffered = 0
+
+    def _arrow_type(self, col):
+        import pyarrow as pa
+
+        return getattr(pa, ARROW_TYPES[self.types[col]])() if col in self.types else pa.string()
+
+    def _flush_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrays = [pa.array(values, type=self._arrow_type(col)) for col, values in self._buffer.items()]
+        table = pa.Table.from_arrays(arrays, names=list(self._buffer))
+        if self._handle is None:
+            self._handle = pq.ParquetWriter(self._file_path, table.schema)
+        self._handle.write_table(table)
+
+    def _flush_csv(self):
+        df = pd.DataFrame(self._buffer)
+        for col, converter in self.types.items():
+            if col in df.columns:
+                df[col] = df[col].astype('Int64' if converter is int else 'float64')
+
+        write_header = self._handle is None
+        if write_header:
+            self._handle = open(self._file_path, 'w', encoding='utf-8-sig', newline='')
+        df.to_csv(self._handle, index=False, header=write_header)
+
+    def _add_columns(self):
+        """
+        기록 후 새 컬럼이 등장한 경우: 기록한 행을 청크 단위로 임시 파일에 옮겨 쓰면서 새 컬럼(결측)을 붙이고
+        이후 청크는 임시 파일에 이어서 기록합니다.
+        """
+        new_columns = [col for col in self._buffer if col not in self._written]
+        self.added_columns.extend(new_columns)
+        self._handle.close()
+        src = self._file_path
+        root, ext = os.path.splitext(self.path)
+        dst = f"{root}.{os.getpid()}.cols{len(self.added_columns)}.tmp{ext}"
+
+        if self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            source = pq.ParquetFile(src)
+            schema = source.schema_arrow
+            for col in new_columns:
+                schema = schema.append(pa.field(col, self._arrow_type(col)))
+            self._handle = pq.ParquetWriter(dst, schema)
+            for i in range(source.metadata.num_row_groups):
+                table = source.read_row_group(i)
+                for col in new_columns:
+                    table = table.append_column(col, pa.nulls(table.num_rows, self._arrow_type(col)))
+                self._handle.write_table(table)
+        else:
+            # 기록한 값을 그대로 옮기도록 문자열로 읽고 결측 변환을 하지 않음
+            self._handle = open(dst, 'w', encoding='utf-8-sig', newline='')
+            first = True
+            for chunk in pd.read_csv(src, dtype=str, encoding='utf-8-sig', na_filter=False, chunksize=self.chunk_rows):
+                chunk = chunk.reindex(columns=list(self._buffer), fill_value='')
+                chunk.to_csv(self._handle, index=False, header=first)
+                first = False
+
+        if src != self.path:
+            os.remove(src)
+        self._file_path = dst
+        print(f"ℹ️ {os.path.basename(self.path)}: 기록 후 등장한 컬럼 추가 {new_columns}")
+
+    def close(self):
+        self.flush()
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self._file_path != self.path:
+            os.replace(self._file_path, self.path)
+            self._file_path = self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
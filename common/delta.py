@@ -0,0 +1,93 @@
+"""
+증분 갱신 유틸리티
+
+이전 스냅샷과 새 수집 결과를 행 단위 해시로 비교하여
+신규/변경/삭제된 키만 골라내고, 상세 테이블을 키 단위로 병합합니다.
+변경 내역은 상세 수집이 반영할 때까지 누적되며, 상세 수집은 반영하지 못한(실패한) 키만 남깁니다.
+"""
+import os
+
+import pandas as pd
+
+CHANGE_NEW = 'new'
+CHANGE_CHANGED = 'changed'
+CHANGE_REMOVED = 'removed'
+
+
+def content_hash(df, key, columns=None):
+    """key별 내용 해시 (columns 미지정 시 key를 제외한 전체 컬럼)"""
+    if columns is None:
+        columns = [c for c in df.columns if c != key]
+    values = df[columns].fillna('').astype(str)
+    return pd.Series(pd.util.hash_pandas_object(values, index=False).values, index=df[key].values)
+
+
+def diff_snapshots(prev_df, curr_df, key, columns=None):
+    """
+    이전/현재 스냅샷 비교 결과를 [key, 'change'] DataFrame으로 반환.
+    change는 'new', 'changed', 'removed' 중 하나이며 변동 없는 키는 포함하지 않습니다.
+    """
+    if prev_df is None or prev_df.empty:
+        return pd.DataFrame({key: curr_df[key].unique(), 'change': CHANGE_NEW})
+
+    if columns is None:
+        columns = [c for c in curr_df.columns if c != key and c in prev_df.columns]
+
+    prev_hash = content_hash(prev_df.drop_duplicates(key), key, columns)
+    curr_hash = content_hash(curr_df.drop_duplicates(key), key, columns)
+
+    new_keys = curr_hash.index.difference(prev_hash.index)
+    removed_keys = prev_hash.index.difference(curr_hash.index)
+    common = curr_hash.index.intersection(prev_hash.index)
+    changed_keys = common[curr_hash[common].values != prev_hash[common].values]
+
+    return pd.concat([
+        pd.DataFrame({key: new_keys, 'change': CHANGE_NEW}),
+        pd.DataFrame({key: changed_keys, 'change': CHANGE_CHANGED}),
+        pd.DataFrame({key: removed_keys, 'change': CHANGE_REMOVED}),
+    ], ignore_index=True)
+
+
+def combine_deltas(pending_df, new_df, key):
+    """
+    아직 상세 수집에 반영되지 않은 변경 내역(pending_df)에 새 변경 내역을 누적.
+    같은 키는 새 내역을 따르되, 이전 내역이 있는 키가 다시 'new'로 나오면(삭제 후 재등장) 'changed'로 기록합니다.
+    """
+    if pending_df is None or pending_df.empty:
+        return new_df.reset_index(drop=True)
+
+    kept = pending_df[~pending_df[key].isin(set(new_df[key]))]
+    new_df = new_df.copy()
+    reappeared = new_df[key].isin(set(pending_df[key])) & (new_df['change'] == CHANGE_NEW)
+    new_df.loc[reappeared, 'change'] = CHANGE_CHANGED
+    return pd.concat([kept[[key, 'change']], new_df], ignore_index=True)
+
+
+def merge_by_key(existing_df, new_df, key, replaced_keys):
+    """
+    기존 테이블에서 replaced_keys(재수집/삭제 대상)의 행을 지우고 new_df를 덧붙입니다.
+    변동이 없는 병원의 행은 그대로 유지됩니다.
+    """
+    if existing_df is None or existing_df.empty:
+        return new_df.reset_index(drop=True)
+
+    kept = existing_df[~existing_df[key].isin(set(replaced_keys))]
+    return pd.concat([kept, new_df], ignore_index=True)
+
+
+def read_snapshot(path, dtype=None):
+    """이전 스냅샷 로드 (.csv / .parquet, 없으면 None)"""
+    if not os.path.exists(path):
+        return None
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path)
+        return df.astype(dtype) if dtype is not None else df
+    return pd.read_csv(path, dtype=dtype)
+
+
+def write_snapshot(df, path):
+    """스냅샷 저장 (확장자에 따라 .csv / .parquet)"""
+    if path.endswith('.parquet'):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, encoding='utf-8-sig')
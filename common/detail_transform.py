@@ -0,0 +1,141 @@
+"""
+병원 상세정보 변환 (수집 결과 hospital_detail_*.csv/parquet → 테이블별 컬럼형 파일)
+
+파일마다 별도 프로세스에서 batch_rows 행씩 읽어 타입을 지정하고 컬럼명을 바꾼 뒤 같은 파일에 이어서 기록합니다.
+파일 크기와 관계없이 작업자마다 한 배치만 메모리에 있고, 엑셀 시트 행 수 한도와도 무관합니다.
+
+컬럼 타입
+- DETAIL_SCHEMA + 테이블별 DETAIL_TABLE_SCHEMAS에 있는 컬럼은 지정한 타입 (의사수, 장비대수 등은 Int64)
+- 나머지는 첫 배치에서 추론: 값이 모두 정수면 Int64, 숫자면 float64, 그 외는 문자열
+  (코드 컬럼 '...Cd'와 0으로 시작하는 값은 숫자처럼 보여도 문자열)
+- 뒤 배치에서 추론과 맞지 않는 값이 나오면 그 컬럼을 문자열로 정하고 처음부터 다시 변환 (값을 잃지 않음)
+
+상세정보 응답에는 병원명이 없으므로 names(ykiho → 병원명)를 주면 yadmNm 컬럼을 붙여 기록합니다.
+"""
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from common.storage import (DETAIL_SCHEMA, DETAIL_TABLE_SCHEMAS, is_text, iter_batches, read_table, to_numeric,
+                            write_batches)
+
+DETAIL_FILE_PREFIX = 'hospital_detail_'
+
+# 배치당 행 수 (작업자 메모리 상한을 정함)
+DETAIL_BATCH_ROWS = 200000
+
+_LEADING_ZERO = re.compile(r'^[+-]?0\d')
+_NUMBER = re.compile(r'^\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*$')
+
+
+class SchemaConflict(ValueError):
+    """추론한 숫자 컬럼에 숫자가 아닌 값이 나온 경우"""
+
+    def __init__(self, column):
+        super().__init__(f"숫자로 추론한 컬럼에 숫자가 아닌 값이 있습니다: {column}")
+        self.column = column
+
+
+def table_name(path):
+    """hospital_detail_equip_info.csv → equip_info"""
+    return os.path.splitext(os.path.basename(path))[0][len(DETAIL_FILE_PREFIX):]
+
+
+def detail_schema(name):
+    """테이블에 적용할 고정 스키마 (공통 + 테이블별)"""
+    return {**DETAIL_SCHEMA, **DETAIL_TABLE_SCHEMAS.get(name, {})}
+
+
+def _numeric(s):
+    """문자열 컬럼 → (숫자 Series, 모든 값이 숫자인지, 0으로 시작하는 값이 있는지)"""
+    num = to_numeric(s)
+    return num, not (num.isna() & s.notna()).any(), s.str.match(_LEADING_ZERO).fillna(False).any()
+
+
+def infer_numeric(df, fixed):
+    """fixed에 없는 문자열 컬럼 중 숫자로 저장할 컬럼 {컬럼: 'Int64' | 'float64'}"""
+    inferred = {}
+    for col in df.columns:
+        if col in fixed or col.endswith('Cd') or not is_text(df[col]):
+            continue
+        if not df[col].dropna().str.match(_NUMBER).all():  # 글자가 섞인 컬럼은 숫자 변환을 시도하지 않음
+            continue
+        num, all_numeric, leading_zero = _numeric(df[col])
+        if num.notna().any() and all_numeric and not leading_zero:
+            inferred[col] = 'Int64' if (num.dropna() % 1 == 0).all() else 'float64'
+    return inferred
+
+
+def _convert_inferred(df, inferred):
+    """추론한 숫자 컬럼 변환. 같은 타입으로 저장할 수 없는 값이 있으면 SchemaConflict"""
+    for col, dtype in inferred.items():
+        if col not in df.columns:
+            continue
+        num, all_numeric, leading_zero = _numeric(df[col])
+        if not all_numeric or leading_zero or (dtype == 'Int64' and not (num.dropna() % 1 == 0).all()):
+            raise SchemaConflict(col)
+        df[col] = num.astype(dtype)
+    return df
+
+
+def _with_names(df, names):
+    if names is not None and 'yadmNm' not in df.columns:
+        df['yadmNm'] = df['ykiho'].map(names)
+    return df
+
+
+def _typed_batches(path, schema, col_map, batch_rows, as_string, inferred, names=None):
+    """타입 지정 + 병원명 추가 + 컬럼명 변경한 배치. 첫 배치에서 inferred(dict)를 채웁니다."""
+    i = -1
+    for i, df in enumerate(iter_batches(path, batch_rows=batch_rows, schema=schema)):
+        if i == 0:
+            inferred.update(infer_numeric(df, {**schema, **dict.fromkeys(as_string)}))
+        yield _with_names(_convert_inferred(df, inferred), names).rename(columns=col_map)
+    if i < 0:  # 행이 없는 파일 (행 그룹이 없는 parquet 등): 컬럼만 있는 빈 테이블
+        yield _with_names(read_table(path, schema=schema), names).rename(columns=col_map)
+
+
+def convert_detail_file(path, out_path, col_map=None, batch_rows=DETAIL_BATCH_ROWS, names=None):
+    """
+    상세정보 파일 하나를 변환하여 out_path에 저장. names(ykiho → 병원명 Series)를 주면 yadmNm 컬럼 추가.
+    {'table', 'rows', 'seconds', 'retried': 문자열로 저장한 추론 실패 컬럼}을 반환
+    """
+    start = time.perf_counter()
+    name = table_name(path)
+    schema, col_map = detail_schema(name), col_map or {}
+    as_string = []
+    while True:
+        inferred = {}
+        try:
+            rows = write_batches(_typed_batches(path, schema, col_map, batch_rows, as_string, inferred, names),
+                                 out_path)
+            break
+        except SchemaConflict as e:
+            as_string.append(e.column)
+    return {'table': name, 'rows': rows, 'seconds': round(time.perf_counter() - start, 3),
+            'retried': [col_map.get(col, col) for col in as_string]}
+
+
+def _convert_task(task):
+    """작업자에서 파일 하나 변환. 실패해도 다른 파일은 계속 (결과에 error 기록)"""
+    path, out_path, col_map, batch_rows, names = task
+    try:
+        return convert_detail_file(path, out_path, col_map, batch_rows, names)
+    except Exception as e:
+        return {'table': table_name(path), 'rows': 0, 'error': f"{type(e).__name__}: {e}"}
+
+
+def convert_detail_files(tasks, jobs=None):
+    """
+    [(입력 경로, 출력 경로, col_map, batch_rows, names)] 변환. jobs개 프로세스에서 파일 단위로 동시에 실행하며
+    jobs=1이거나 파일이 하나면 현재 프로세스에서 실행합니다. 완료 순서대로 결과(dict)를 내보냅니다.
+    """
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+    if jobs <= 1:
+        yield from map(_convert_task, tasks)
+        return
+    # 큰 파일부터 배정하여 마지막에 큰 파일 하나만 남아 기다리는 시간을 줄임
+    tasks = sorted(tasks, key=lambda task: os.path.getsize(task[0]), reverse=True)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(_convert_task, tasks)
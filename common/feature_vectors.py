@@ -0,0 +1,95 @@
+"""
+병원별 진료과목 / 장비 / 간호등급 희소 벡터
+
+hospital_feature_counts 마트(ykiho, feature, code, code_name, value의 long 형식)를
+병원 × 코드 CSR 행렬로 바꿔 유사 병원 검색, 군집, 통계 검정에서 바로 사용합니다.
+GROUP_CONCAT 문자열("내과(5), 정형외과(3)")을 다시 파싱할 필요가 없습니다.
+
+코드 → 열 번호는 행렬을 만들 때 정렬된 코드 순서로 부여하므로
+마트를 증분 갱신해도 저장된 데이터가 바뀌지 않습니다.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from common.storage import ANALYSIS_MART_DIR, find_table, read_table
+
+FEATURE_TABLE = 'hospital_feature_counts'
+FEATURES = ('specialty', 'equipment', 'nursing_grade')
+
+# matrix: CSR (병원 × 코드), ykiho: 행 라벨, codes: 열 라벨 DataFrame(code, code_name)
+FeatureMatrix = namedtuple('FeatureMatrix', ['feature', 'matrix', 'ykiho', 'codes'])
+
+
+def load_feature_counts(features=None, directory=ANALYSIS_MART_DIR):
+    """long 형식 마트 로드 (features 지정 시 해당 항목만). 없으면 FileNotFoundError"""
+    path = find_table(directory, FEATURE_TABLE)
+    if path is None:
+        raise FileNotFoundError(f"병원 특성 마트가 없습니다: {directory}/{FEATURE_TABLE} "
+                                f"(03_SQL_Warehouse/04_Run_Warehouse.py 실행 필요)")
+    counts = read_table(path)
+    if features is not None:
+        counts = counts[counts['feature'].isin([features] if isinstance(features, str) else features)]
+    return counts.reset_index(drop=True)
+
+
+def to_matrix(counts, feature, ykiho=None, dtype=np.int64):
+    """
+    long 형식 → FeatureMatrix.
+    ykiho(순서 있는 목록)를 넘기면 그 순서로 행을 맞추고, 마트에 없는 병원은 0 벡터가 됩니다.
+    목록에 없는 병원의 행은 버립니다.
+    """
+    rows = counts[counts['feature'] == feature]
+
+    codes = (rows[['code', 'code_name']].drop_duplicates('code')
+             .sort_values('code', kind='stable').reset_index(drop=True))
+    col_idx = pd.Index(codes['code']).get_indexer(rows['code'])
+
+    if ykiho is None:
+        ykiho = np.sort(rows['ykiho'].unique())
+    ykiho = np.asarray(ykiho, dtype=object)
+    row_idx = pd.Index(ykiho).get_indexer(rows['ykiho'])
+
+    keep = row_idx >= 0
+    # 같은 (병원, 코드)가 여러 행이면 합산 (coo → csr 변환 시 중복 합산)
+    matrix = sparse.coo_matrix(
+        (rows['value'].to_numpy(dtype=dtype)[keep], (row_idx[keep], col_idx[keep])),
+        shape=(len(ykiho), len(codes))).tocsr()
+    return FeatureMatrix(feature, matrix, ykiho, codes)
+
+
+def load_feature_matrix(feature, ykiho=None, directory=ANALYSIS_MART_DIR):
+    """마트에서 항목 하나를 읽어 FeatureMatrix로 반환"""
+    return to_matrix(load_feature_counts(feature, directory), feature, ykiho)
+
+
+def to_frame(fm, label='code_name'):
+    """FeatureMatrix → 희소 DataFrame (index=ykiho, 열=코드명). GUI/통계 검정용"""
+    labels = fm.codes[label].fillna(fm.codes['code']).astype(str)
+    # 코드명이 겹치면 코드를 붙여 구분
+    dup = labels.duplicated(keep=False)
+    labels = labels.where(~dup, labels + '(' + fm.codes['code'].astype(str) + ')')
+    return pd.DataFrame.sparse.from_spmatrix(
+        fm.matrix, index=pd.Index(fm.ykiho, name='ykiho'), columns=[f"{fm.feature}_{c}" for c in labels])
+
+
+def similar_hospitals(fm, ykiho, top_n=10):
+    """코사인 유사도 기준으로 ykiho와 가장 비슷한 병원 top_n (자기 자신 제외)"""
+    pos = pd.Index(fm.ykiho).get_indexer([ykiho])[0]
+    if pos < 0:
+        raise KeyError(f"특성 행렬에 없는 요양기호입니다: {ykiho}")
+
+    matrix = fm.matrix.astype(np.float64)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    scores = np.asarray(matrix @ matrix[pos].T.toarray()).ravel() / (norms * norms[pos])
+    scores[pos] = -np.inf
+
+    top_n = min(top_n, len(scores) - 1)
+    if top_n <= 0:
+        return pd.DataFrame({'ykiho': pd.Series(dtype=object), 'similarity': pd.Series(dtype=float)})
+    top = np.argpartition(-scores, top_n - 1)[:top_n]
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return pd.DataFrame({'ykiho': fm.ykiho[top], 'similarity': scores[top]})
@@ -0,0 +1,33 @@
+"""
+GTIN(UDI-DI) 바코드 정규화
+
+같은 제품이 재고 파일에는 13자리(8801...)로, 다른 곳에는 앞에 0이 붙은
+14자리(08801...)로 기록되는 경우가 있어 14자리 형식으로 통일합니다.
+"""
+import re
+
+_NON_DIGIT = re.compile(r'\D')
+
+
+def canonical_gtin(code):
+    """
+    바코드를 14자리 GTIN 문자열로 변환. GTIN으로 볼 수 없으면 None
+    예) 8801974365460 → '08801974365460', '0 8801974 365460' → '08801974365460'
+    """
+    if code is None:
+        return None
+    if isinstance(code, float):
+        if code != code:  # NaN
+            return None
+        code = int(code)
+    digits = _NON_DIGIT.sub('', str(code))
+    if len(digits) not in (8, 12, 13, 14):
+        return None
+    return digits.zfill(14)
+
+
+def is_valid_check_digit(gtin):
+    """GS1 체크 디지트 검증 (14자리 GTIN)"""
+    digits = [int(c) for c in gtin]
+    total = sum(d * (3 if i % 2 == 0 else 1) for i, d in enumerate(digits[:-1]))
+    return (10 - total % 10) % 10 == digits[-1]
@@ -0,0 +1,194 @@
+"""
+거래처명 매칭 인덱스 (SQLite)
+
+정규화된 병원명/거래처명과 매칭 결과를 저장해 두고, 다음 실행에서는
+새로 추가되었거나 이름·지역 후보가 바뀐 거래처만 다시 점수를 계산합니다.
+담당자가 확인한 수동 매칭은 고정(pin)되어 재계산 대상에서 제외됩니다.
+"""
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+
+import pandas as pd
+from rapidfuzz import fuzz
+
+from common.name_matcher import client_regions, hospital_regions, match_names
+
+# 정규화 규칙을 바꾸면 버전을 올려서 기존 인덱스 전체를 재계산
+NORMALIZATION_VERSION = 1
+
+LEGAL_PREFIXES = ('의료법인', '재단법인', '사단법인', '학교법인', '사회복지법인', '의료재단',
+                  '(의)', '(재)', '(사)', '(학)')
+# 긴 접미사부터 검사 ('요양병원'이 '병원'보다 먼저)
+FACILITY_SUFFIXES = ('요양병원', '한방병원', '치과병원', '치과의원', '한의원', '병원', '의원')
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'processed',
+                                  'match_index.sqlite')
+
+
+def normalize_name(name):
+    """
+    매칭용 이름 정규화
+    - NFKC: 전각 문자, 호환용 자모(ㄱ, ㅏ) 및 분리된 자모 시퀀스를 완성형으로 정리
+    - 법인 표기(의료법인, (재) 등) 제거, 공백/특수문자 제거
+    - 종별 접미사(병원, 의원 등) 제거
+    """
+    if not isinstance(name, str):
+        return ''
+    s = unicodedata.normalize('NFKC', name)
+    for prefix in LEGAL_PREFIXES:
+        s = s.replace(prefix, '')
+    s = _NON_WORD.sub('', s).lower()
+    for suffix in FACILITY_SUFFIXES:
+        if s.endswith(suffix) and len(s) > len(suffix):
+            s = s[:-len(suffix)]
+            break
+    return s
+
+
+class MatchIndex:
+    """
+    Tables
+    ------
+    hospital_names : ykiho별 정규화된 병원명과 지역 (변경 감지용)
+    client_matches : 거래처별 상위 후보 (internal_name, rank)
+    pinned_matches : 수동 확정 매칭 (internal_name → ykiho)
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS hospital_names (
+                ykiho TEXT PRIMARY KEY, yadm_nm TEXT, name_norm TEXT, region TEXT, norm_version INTEGER);
+            CREATE TABLE IF NOT EXISTS client_matches (
+                internal_name TEXT, rank INTEGER, name_norm TEXT, region TEXT, norm_version INTEGER,
+                ykiho TEXT, public_name TEXT, score INTEGER, updated_at REAL,
+                PRIMARY KEY (internal_name, rank));
+            CREATE TABLE IF NOT EXISTS pinned_matches (
+                internal_name TEXT PRIMARY KEY, ykiho TEXT NOT NULL, pinned_at REAL);
+        """)
+
+    def pin(self, pins):
+        """수동 확정 매칭 등록. pins: {internal_name: ykiho}"""
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO pinned_matches (internal_name, ykiho, pinned_at) VALUES (?, ?, ?)",
+            [(name, ykiho, now) for name, ykiho in pins.items()],
+        )
+        self._conn.commit()
+
+    def sync_pins(self, pins):
+        """
+        수동 매칭 파일 내용으로 고정 매칭을 맞춤 (pins에 없는 고정은 해제).
+        해제된 거래처는 고정 전의 후보가 남아 있을 수 있으므로 후보를 지워 다음 update에서 다시 계산합니다.
+        """
+        unpinned = [(name,) for name in self._read('pinned_matches')['internal_name'] if name not in pins]
+        self._conn.executemany("DELETE FROM pinned_matches WHERE internal_name = ?", unpinned)
+        self._conn.executemany("DELETE FROM client_matches WHERE internal_name = ?", unpinned)
+        self.pin(pins)
+        return len(unpinned)
+
+    def _read(self, table):
+        return pd.read_sql(f"SELECT * FROM {table}", self._conn)
+
+    def _changed_regions(self, df_hosp):
+        """이전 실행 대비 병원이 추가/삭제/이름 변경된 지역 집합"""
+        prev = self._read('hospital_names')
+        merged = prev.merge(df_hosp, on='ykiho', how='outer', suffixes=('_prev', ''), indicator=True)
+        changed = (
+            (merged['_merge'] != 'both')
+            | (merged['name_norm_prev'] != merged['name_norm'])
+            | (merged['region_prev'].fillna('') != merged['region'].fillna(''))
+            | (merged['norm_version_prev'] != NORMALIZATION_VERSION)
+        )
+        rows = merged[changed]
+        regions = set(rows['region'].dropna()) | set(rows['region_prev'].dropna())
+        return regions, bool(changed.any())
+
+    def update(self, df_clients, df_hospitals, top_k=5, scorer=fuzz.token_sort_ratio):
+        """
+        인덱스를 갱신하고 현재 거래처의 매칭 결과를 반환.
+
+        Returns
+        -------
+        (DataFrame[internal_name, rank, public_name, score, ykiho, pinned], 재계산한 거래처 수)
+        """
+        df_hosp = pd.DataFrame({
+            'ykiho': df_hospitals['ykiho'].values,
+            'yadm_nm': df_hospitals['yadmNm'].values,
+            'name_norm': df_hospitals['yadmNm'].map(normalize_name).values,
+            'region': hospital_regions(df_hospitals).values,
+        }).drop_duplicates('ykiho')
+        df_hosp['norm_version'] = NORMALIZATION_VERSION
+        changed_regions, any_changed = self._changed_regions(df_hosp)
+
+        clients = pd.DataFrame({
+            'internal_name': df_clients['client_name'].astype(str).values,
+            'address': df_clients['address'].values if 'address' in df_clients else None,
+        }).drop_duplicates('internal_name')
+        clients['name_norm'] = clients['internal_name'].map(normalize_name)
+        clients['region'] = client_regions(clients).where(lambda r: r.isin(set(df_hosp['region'].dropna())))
+
+        # 재계산 대상: 신규/이름 규칙 변경/주소 지역 변경/후보 지역 변동 거래처 (고정 매칭 제외)
+        prev = self._read('client_matches').query('rank == 1').set_index('internal_name')
+        pinned = self._read('pinned_matches').set_index('internal_name')['ykiho']
+        known = clients['internal_name'].map(prev['name_norm'])
+        stale = (
+            known.isna()
+            | (known != clients['name_norm'])
+            | (clients['internal_name'].map(prev['norm_version']) != NORMALIZATION_VERSION)
+            | (clients['region'].fillna('') != clients['internal_name'].map(prev['region']).fillna(''))
+            | clients['region'].isin(changed_regions)
+            | (clients['region'].isna() & any_changed)
+        ) & ~clients['internal_name'].isin(pinned.index)
+        targets = clients[stale]
+
+        if not targets.empty:
+            # 병원 지역은 이미 계산한 region을 sgguCdNm으로 넘겨 지역 블록 매칭에 사용
+            df_match = match_names(targets, df_hosp.rename(columns={'yadm_nm': 'yadmNm', 'region': 'sgguCdNm'}),
+                                   top_k=top_k, scorer=scorer, client_name_col='internal_name',
+                                   client_match_col='name_norm', hospital_match_col='name_norm')
+            df_match = df_match.merge(targets[['internal_name', 'name_norm']], on='internal_name')
+            df_match['norm_version'] = NORMALIZATION_VERSION
+            df_match['updated_at'] = time.time()
+
+            self._conn.executemany("DELETE FROM client_matches WHERE internal_name = ?",
+                                   [(name,) for name in targets['internal_name']])
+            df_match[['internal_name', 'rank', 'name_norm', 'region', 'norm_version', 'ykiho',
+                      'public_name', 'score', 'updated_at']].to_sql('client_matches', self._conn,
+                                                                    if_exists='append', index=False)
+
+        # 현재 병원 목록을 다음 실행의 비교 기준으로 저장
+        self._conn.execute("DELETE FROM hospital_names")
+        df_hosp.to_sql('hospital_names', self._conn, if_exists='append', index=False)
+        self._conn.commit()
+
+        return self._result(clients, df_hosp, pinned), len(targets)
+
+    def _result(self, clients, df_hosp, pinned):
+        matches = self._read('client_matches')
+        matches = matches[matches['internal_name'].isin(clients['internal_name'])
+                          & ~matches['internal_name'].isin(pinned.index)]
+        matches = matches[['internal_name', 'rank', 'public_name', 'score', 'ykiho']].assign(pinned=False)
+
+        pins = pinned[pinned.index.isin(clients['internal_name'])]
+        names = df_hosp.set_index('ykiho')['yadm_nm']
+        df_pins = pd.DataFrame({
+            'internal_name': pins.index, 'rank': 1, 'public_name': pins.map(names).values,
+            'score': 100, 'ykiho': pins.values, 'pinned': True,
+        })
+
+        # 거래처 파일 순서대로 정렬
+        frames = [df for df in (matches, df_pins) if not df.empty] or [matches]
+        result = pd.concat(frames, ignore_index=True)
+        result['_order'] = result['internal_name'].map({name: i for i, name in enumerate(clients['internal_name'])})
+        return result.sort_values(['_order', 'rank'], ignore_index=True).drop(columns='_order')
+
+    def close(self):
+        self._conn.close()
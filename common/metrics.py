@@ -0,0 +1,242 @@
+"""
+단계별 실행 계측 → JSON 실행 리포트
+
+단계(스크립트)마다 작업 구간의 시간, 입력/출력 행 수, 구간 전후의 현재 메모리(RSS),
+단계 전체의 최대 메모리(peak RSS)와 API 호출 통계(응답시간 분포, 오류 유형별 건수)를 기록하고 프로세스 종료 시 한 파일로 저장합니다.
+
+    from common.metrics import count, stage_report, step
+
+    with step('expand_attributes', rows_in=len(df)) as s:
+        df_attrs = expand_attributes(df['attributes'])
+        s['rows_out'] = len(df_attrs)
+    stage_report().attach_api(client.metrics)  # ApiClient의 엔드포인트별 통계 포함
+
+리포트: RUN_REPORT_DIR/<run_id>/<단계>.json
+run_pipeline.py가 실행한 단계는 같은 run_id(METRICS_RUN_ID)로 모이고 run.json으로 합쳐지며,
+직전 실행보다 크게 느려지거나 메모리가 늘어난 단계를 알려줍니다. (RUN_REPORTS=0 이면 저장하지 않음)
+"""
+import atexit
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+
+from common.storage import PROCESSED_DIR
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RUN_REPORT_DIR = os.getenv('RUN_REPORT_DIR') or os.path.join(PROCESSED_DIR, 'run_reports')
+
+# API 응답시간 분포 구간 (ms, 이하)
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# 직전 실행 대비 이 배수 이상이고 차이가 최소값 이상이면 회귀로 표시
+REGRESSION_RATIO = 1.5
+REGRESSION_MIN_SECONDS = 1.0
+REGRESSION_MIN_MB = 50.0
+
+# 스크립트 시작 시점 대용 (스크립트는 common 모듈을 맨 위에서 import)
+_IMPORTED_AT = (time.time(), time.perf_counter())
+
+
+def peak_rss_mb():
+    """프로세스 시작 이후 최대 RSS (MB). resource 모듈이 없으면 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024, 1)  # macOS: bytes, Linux: KB
+
+
+def current_rss_mb():
+    """지금 시점의 RSS (MB). /proc/self/statm이 없으면 (Linux 외) None"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(resident_pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20, 1)
+
+
+def latency_histogram(latencies, buckets=LATENCY_BUCKETS_MS):
+    """응답시간(초) 목록 → {'le_10ms': 건수, ..., 'gt_10000ms': 건수}"""
+    ms = np.asarray(latencies, dtype=float) * 1000
+    counts = np.bincount(np.searchsorted(buckets, ms, side='left'), minlength=len(buckets) + 1)
+    labels = [f"le_{b}ms" for b in buckets] + [f"gt_{buckets[-1]}ms"]
+    return dict(zip(labels, counts.tolist()))
+
+
+def new_run_id():
+    return time.strftime('%Y%m%d-%H%M%S') + f"-{os.getpid()}"
+
+
+class StageReport:
+    """한 단계(프로세스)의 계측 결과"""
+
+    def __init__(self, stage, run_id=None, directory=RUN_REPORT_DIR, started=None):
+        self.stage = stage
+        self.run_id = run_id or new_run_id()
+        self.directory = directory
+        self.started_at, self._start = started or (time.time(), time.perf_counter())
+        self.steps = []
+        self.counters = defaultdict(int)
+        self.error = None
+        self._api = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name, rows_in=None):
+        """
+        작업 구간 계측. yield한 dict에 rows_out 등 값을 채우면 함께 기록됩니다.
+        메모리는 구간이 끝난 시점의 현재 RSS(rss_mb)와 구간 전후 차이(rss_delta_mb)입니다.
+        프로세스 최대 RSS는 구간별로 나눌 수 없으므로 단계 전체(peak_rss_mb)에만 기록합니다.
+        """
+        record = {'name': name, 'rows_in': rows_in, 'rows_out': None}
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 3)
+            rss_after = current_rss_mb()
+            record['rss_mb'] = rss_after
+            record['rss_delta_mb'] = None if rss_before is None or rss_after is None else round(rss_after - rss_before, 1)
+            with self._lock:
+                self.steps.append(record)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def attach_api(self, endpoint_metrics):
+        """ApiClient.metrics (EndpointMetrics)를 리포트에 포함 (저장 시점의 통계)"""
+        self._api.append(endpoint_metrics)
+
+    def to_dict(self):
+        api = {}
+        for metrics in self._api:
+            api.update(metrics.summary())
+        return {
+            'stage': self.stage, 'run_id': self.run_id,
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            'seconds': round(time.perf_counter() - self._start, 3), 'peak_rss_mb': peak_rss_mb(),
+            'status': 'failed' if self.error else 'ok', 'error': self.error,
+            'steps': self.steps, 'counters': dict(self.counters), 'api': api,
+        }
+
+    def write(self):
+        return write_json(self.to_dict(), os.path.join(self.directory, self.run_id, f"{self.stage}.json"))
+
+
+def write_json(data, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1, default=str)
+    os.replace(tmp_path, path)
+    return path
+
+
+# 프로세스 전역 리포트 (처음 사용할 때 생성, 종료 시 저장)
+_report = None
+
+
+def stage_report():
+    """현재 프로세스의 리포트. 단계 이름은 METRICS_STAGE 또는 스크립트 파일명"""
+    global _report
+    if _report is None:
+        stage = os.getenv('METRICS_STAGE') or os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0]
+        _report = StageReport(stage, os.getenv('METRICS_RUN_ID'), started=_IMPORTED_AT)
+        atexit.register(_write_at_exit)
+
+        previous_hook = sys.excepthook
+
+        def excepthook(exc_type, exc, tb):
+            _report.error = f"{exc_type.__name__}: {exc}"
+            previous_hook(exc_type, exc, tb)
+
+        sys.excepthook = excepthook
+    return _report
+
+
+def step(name, rows_in=None):
+    return stage_report().step(name, rows_in)
+
+
+def count(name, n=1):
+    stage_report().count(name, n)
+
+
+def _write_at_exit():
+    if os.getenv('RUN_REPORTS', '1') == '0':
+        return
+    try:
+        print(f"📊 실행 리포트: {_report.write()}")
+    except OSError as e:
+        print(f"⚠️ 실행 리포트 저장 실패: {e}")
+
+
+def read_run(run_id, directory=RUN_REPORT_DIR):
+    """run_id 폴더의 단계별 리포트 {단계: dict}"""
+    reports = {}
+    for path in sorted(glob.glob(os.path.join(directory, run_id, '*.json'))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name != 'run':
+            with open(path, encoding='utf-8') as f:
+                reports[name] = json.load(f)
+    return reports
+
+
+def previous_run(run_id, directory=RUN_REPORT_DIR):
+    """run_id 이전에 저장된 가장 최근 파이프라인 실행 요약(run.json). 없으면 None"""
+    runs = sorted(os.path.basename(os.path.dirname(p)) for p in glob.glob(os.path.join(directory, '*', 'run.json')))
+    earlier = [r for r in runs if r < run_id]
+    if not earlier:
+        return None
+    with open(os.path.join(directory, earlier[-1], 'run.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def find_regressions(previous, current, ratio=REGRESSION_RATIO):
+    """두 실행 요약에서 모두 실행된 단계의 시간/메모리 회귀 목록 [(단계, 항목, 이전, 현재)]"""
+    if not previous:
+        return []
+    found = []
+    for name, stage in current['stages'].items():
+        before = previous['stages'].get(name)
+        if not before or stage['status'] != 'ran' or before['status'] != 'ran':
+            continue
+        for key, min_diff in (('seconds', REGRESSION_MIN_SECONDS), ('peak_rss_mb', REGRESSION_MIN_MB)):
+            a, b = before.get(key), stage.get(key)
+            if a is not None and b is not None and b >= a * ratio and b - a >= min_diff:
+                found.append((name, key, a, b))
+    return found
+
+
+def write_run_report(run_id, results, wall_seconds, directory=RUN_REPORT_DIR):
+    """
+    파이프라인 실행 요약 저장. results는 {단계: (상태, 사유, 소요 초)}, wall_seconds는 전체 경과 시간.
+    단계 리포트(있으면)를 합치고 직전 실행 대비 회귀를 함께 기록합니다. (경로, 요약)을 반환
+    """
+    reports = read_run(run_id, directory)
+    stages = {}
+    for name, (status, reason, seconds) in results.items():
+        report = reports.get(name, {})
+        stages[name] = {'status': status, 'reason': reason, 'seconds': round(seconds, 3),
+                        'peak_rss_mb': report.get('peak_rss_mb'), 'report': report or None}
+    summary = {'run_id': run_id, 'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'seconds': round(wall_seconds, 3), 'stages': stages}
+    summary['regressions'] = [dict(zip(('stage', 'metric', 'previous', 'current'), r))
+                              for r in find_regressions(previous_run(run_id, directory), summary)]
+    return write_json(summary, os.path.join(directory, run_id, 'run.json')), summary
@@ -0,0 +1,130 @@
+"""
+내부 거래처명 ↔ 공공데이터 병원명 일괄 매칭
+
+주소에서 시군구를 추출해 같은 지역의 병원끼리만 비교(blocking)하고,
+블록마다 rapidfuzz.process.cdist로 점수 행렬을 한 번에 계산하여
+거래처별 상위 k개 후보를 반환합니다.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+# 지역을 찾지 못한 거래처는 전체 병원과 비교하며, 메모리 사용량을 고려해 나눠서 계산
+FALLBACK_CHUNK_SIZE = 1000
+
+_SIGUNGU = re.compile(r'^\S+[시군구]$')
+
+
+def parse_region(address):
+    """
+    주소에서 시군구명을 추출하여 심평원 sgguCdNm 표기와 맞춥니다.
+    예) '서울시 강남구 테헤란로 0' → '강남구'
+        '경기도 성남시 분당구 ...' → '성남분당구'
+    """
+    if not isinstance(address, str):
+        return None
+
+    tokens = address.split()[1:4]  # 첫 토큰은 시/도
+    if not tokens or not _SIGUNGU.match(tokens[0]):
+        return None
+
+    # 구가 있는 시: '성남시 분당구' → '성남분당구'
+    if tokens[0].endswith('시') and len(tokens) > 1 and tokens[1].endswith('구'):
+        return tokens[0][:-1] + tokens[1]
+    return tokens[0]
+
+
+def _top_k(scores, k):
+    """점수 행렬에서 행별 상위 k개의 (열 인덱스, 점수)를 점수 내림차순으로 반환"""
+    k = min(k, scores.shape[1])
+    neg = -scores.astype(np.int16)  # uint8 점수를 그대로 부호 반전하면 값이 넘침
+    idx = np.argpartition(neg, k - 1, axis=1)[:, :k]
+    top = np.take_along_axis(scores, idx, axis=1)
+    order = np.argsort(np.take_along_axis(neg, idx, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(top, order, axis=1)
+
+
+def _match_block(queries, choices, k, scorer, workers):
+    scores = process.cdist(queries, choices, scorer=scorer, dtype=np.uint8, workers=workers)
+    return _top_k(scores, k)
+
+
+def hospital_regions(df_hospitals):
+    """병원별 시군구 (sgguCdNm 우선, 없으면 주소에서 추출)"""
+    if 'sgguCdNm' in df_hospitals:
+        region = df_hospitals['sgguCdNm']
+    else:
+        region = pd.Series(None, index=df_hospitals.index, dtype=object)
+    if 'addr' in df_hospitals:
+        region = region.fillna(df_hospitals['addr'].map(parse_region))
+    return region
+
+
+def client_regions(df_clients, client_addr_col='address'):
+    """거래처별 시군구 (주소가 없으면 None)"""
+    if client_addr_col in df_clients:
+        return df_clients[client_addr_col].map(parse_region)
+    return pd.Series(None, index=df_clients.index, dtype=object)
+
+
+def match_names(df_clients, df_hospitals, top_k=5, scorer=fuzz.token_sort_ratio, workers=-1,
+                client_name_col='client_name', client_addr_col='address',
+                client_match_col=None, hospital_match_col='yadmNm'):
+    """
+    거래처별 상위 top_k 병원 후보를 long 형식 DataFrame으로 반환.
+    client_match_col / hospital_match_col을 지정하면 해당 컬럼(예: 정규화된 이름)으로
+    점수를 계산하고, 결과에는 원래 이름을 표시합니다.
+
+    Returns
+    -------
+    DataFrame[internal_name, rank, public_name, score, ykiho, region]
+    """
+    hospitals = df_hospitals.reset_index(drop=True)
+    hosp_region = hospital_regions(hospitals)
+    hosp_names = hospitals['yadmNm'].fillna('').to_numpy(dtype=object)
+    hosp_keys = hospitals[hospital_match_col].fillna('').to_numpy(dtype=object)
+
+    clients = df_clients.reset_index(drop=True)
+    client_names = clients[client_name_col].fillna('').astype(str)
+    client_keys = clients[client_match_col or client_name_col].fillna('').astype(str).to_numpy()
+    client_region = client_regions(clients, client_addr_col)
+
+    # 병원이 존재하지 않는 지역은 전체 비교 대상으로 처리
+    region_groups = hospitals.groupby(hosp_region).indices
+    client_region = client_region.where(client_region.isin(list(region_groups)), None)
+
+    frames = []
+
+    def collect(client_idx, region, cand_idx, top_idx, top_scores):
+        n = top_idx.shape[1]
+        picked = cand_idx[top_idx].ravel()
+        frames.append(pd.DataFrame({
+            '_row': np.repeat(client_idx, n),
+            'internal_name': np.repeat(client_names.to_numpy()[client_idx], n),
+            'rank': np.tile(np.arange(1, n + 1), len(client_idx)),
+            'public_name': hosp_names[picked],
+            'score': top_scores.ravel(),
+            'ykiho': hospitals['ykiho'].to_numpy()[picked],
+            'region': region,
+        }))
+
+    # 1) 지역 블록 단위 매칭
+    for region, client_idx in clients.groupby(client_region).indices.items():
+        cand_idx = region_groups[region]
+        top_idx, top_scores = _match_block(client_keys[client_idx], hosp_keys[cand_idx], top_k, scorer, workers)
+        collect(client_idx, region, cand_idx, top_idx, top_scores)
+
+    # 2) 지역을 알 수 없는 거래처는 전체 병원과 비교
+    unknown_idx = np.flatnonzero(client_region.isna().to_numpy())
+    all_idx = np.arange(len(hospitals))
+    for start in range(0, len(unknown_idx), FALLBACK_CHUNK_SIZE):
+        client_idx = unknown_idx[start:start + FALLBACK_CHUNK_SIZE]
+        top_idx, top_scores = _match_block(client_keys[client_idx], hosp_keys, top_k, scorer, workers)
+        collect(client_idx, None, all_idx, top_idx, top_scores)
+
+    if not frames:
+        return pd.DataFrame(columns=['internal_name', 'rank', 'public_name', 'score', 'ykiho', 'region'])
+    result = pd.concat(frames, ignore_index=True).sort_values(['_row', 'rank'], ignore_index=True)
+    return result.drop(columns='_row')
@@ -0,0 +1,42 @@
+"""
+페이지 단위 목록 API 전체 수집기
+
+첫 페이지 응답의 totalCount로 전체 페이지 수를 계산한 뒤
+나머지 페이지를 동시에 요청합니다. 실패한 페이지는 백오프 재시도하고,
+그래도 실패하면 중단하지 않고 목록으로 돌려주어 누락 여부를 알 수 있게 합니다.
+"""
+import math
+
+from common.fetch_engine import iter_concurrent, retry_with_backoff
+
+
+def fetch_all_pages(fetch_page, num_rows, max_workers=4, retries=3, base_delay=1.0):
+    """
+    Parameters
+    ----------
+    fetch_page : page_no -> (rows, total_count). 실패 시 예외를 올려야 재시도됩니다.
+    num_rows : 페이지당 행 수 (요청 파라미터와 같아야 페이지 수가 맞습니다)
+
+    Returns
+    -------
+    (rows, total_count, failed_pages) : rows는 페이지 순서대로 정렬됩니다.
+    """
+    first_rows, total_count = retry_with_backoff(lambda: fetch_page(1), retries, base_delay)
+    n_pages = max(1, math.ceil(total_count / num_rows))
+
+    def worker(page_no):
+        try:
+            return retry_with_backoff(lambda: fetch_page(page_no)[0], retries, base_delay)
+        except Exception as e:
+            return e
+
+    pages = {1: first_rows}
+    failed_pages = []
+    for page_no, result in iter_concurrent(worker, range(2, n_pages + 1), max_workers):
+        if isinstance(result, Exception):
+            failed_pages.append(page_no)
+        else:
+            pages[page_no] = result
+
+    rows = [row for page_no in sorted(pages) for row in pages[page_no]]
+    return rows, total_count, sorted(failed_pages)
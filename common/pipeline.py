@@ -0,0 +1,305 @@
+"""
+번호 스크립트 파이프라인 실행기 (의존성 DAG + 내용 해시 기반 건너뛰기 + 병렬 실행)
+
+단계(Stage)마다 스크립트와 입력/출력 파일 패턴(저장소 루트 기준 glob)을 선언하면
+어떤 단계의 입력 패턴이 다른 단계의 출력 패턴과 겹칠 때 그 단계에 의존하는 것으로 보고 DAG를 만듭니다.
+
+단계는 다음 중 하나일 때만 다시 실행합니다 (나머지는 건너뜀).
+- 처음 실행하거나 직전 실행이 실패한 경우
+- 입력 파일 내용 또는 코드(스크립트, 스크립트가 import하는 common 모듈, 함께 선언한 SQL 등)의 해시가 바뀐 경우
+- 선언한 출력이 없어진 경우
+- 외부 API처럼 파일로 알 수 없는 입력이 있는 단계에서 ttl_hours가 지난 경우
+
+각 스크립트는 기존처럼 자기 폴더를 작업 폴더로 하는 별도 프로세스에서 실행되므로
+'../data/raw' 같은 상대 경로를 그대로 사용합니다. 그래프 창(plt.show)은 띄우지 않습니다(MPLBACKEND=Agg).
+실행한 단계의 계측 결과(common.metrics)는 같은 run_id로 모아 run_reports/<run_id>/run.json에 저장하고,
+profile로 지정한 단계는 cProfile(또는 pyinstrument)로 실행하여 같은 폴더에 프로파일을 남깁니다.
+"""
+import ast
+import fnmatch
+import glob
+import hashlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from common.metrics import RUN_REPORT_DIR, new_run_id
+from common.storage import PROCESSED_DIR, file_digest
+
+ROOT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+PIPELINE_STATE_DIR = os.path.join(PROCESSED_DIR, 'pipeline_state')
+
+# script: 저장소 루트 기준 경로, inputs/outputs/code: 저장소 루트 기준 glob 패턴
+# code: import로 알 수 없는 코드(SQL 등). 스크립트가 import하는 common 모듈은 자동으로 포함 (imported_modules)
+# ttl_hours: 입력이 같아도 이 시간이 지나면 다시 실행 (외부 API 수집 단계). None이면 입력이 바뀔 때만
+Stage = namedtuple('Stage', ['name', 'script', 'inputs', 'outputs', 'code', 'ttl_hours', 'env'],
+                   defaults=((), (), (), None, None))
+
+# 실행 결과 상태
+RAN, SKIPPED, PLANNED, FAILED, BLOCKED = 'ran', 'skipped', 'planned', 'failed', 'blocked'
+
+PROFILERS = ('cprofile', 'pyinstrument')
+
+
+def _patterns_overlap(a, b):
+    """glob 패턴 두 개가 같은 파일을 가리킬 수 있는지 (한쪽을 다른 쪽 패턴에 대입)"""
+    return fnmatch.fnmatchcase(a, b) or fnmatch.fnmatchcase(b, a)
+
+
+def build_dag(stages):
+    """{단계명: 선행 단계명 set}. 입력 패턴이 다른 단계의 출력 패턴과 겹치면 의존. 순환이면 ValueError"""
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"단계 이름이 중복되었습니다: {names}")
+    deps = {
+        stage.name: {other.name for other in stages if other is not stage and any(
+            _patterns_overlap(i, o) for i in stage.inputs for o in other.outputs)}
+        for stage in stages
+    }
+    topological_order(deps)
+    return deps
+
+
+def topological_order(deps):
+    """선행 단계가 먼저 오도록 정렬한 단계명 목록"""
+    order, done, visiting = [], set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"단계 의존성에 순환이 있습니다: {name}")
+        visiting.add(name)
+        for dep in sorted(deps[name]):
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+        order.append(name)
+
+    for name in deps:
+        visit(name)
+    return order
+
+
+def upstream(deps, targets):
+    """targets와 그 선행 단계 전체"""
+    selected, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in deps:
+            raise KeyError(f"없는 단계입니다: {name}")
+        if name not in selected:
+            selected.add(name)
+            todo.extend(deps[name])
+    return selected
+
+
+def _expand(patterns):
+    """패턴에 해당하는 파일 (저장소 루트 기준 상대 경로, 정렬). 임시 파일(.tmp) 제외"""
+    files = set()
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(ROOT_DIR, pattern)):
+            if os.path.isfile(path) and '.tmp' not in os.path.basename(path):
+                files.add(os.path.relpath(path, ROOT_DIR).replace(os.sep, '/'))
+    return sorted(files)
+
+
+def imported_modules(script, package='common'):
+    """
+    스크립트가 직접/간접으로 import하는 package 모듈 파일 (저장소 루트 기준 상대 경로, 정렬).
+    모듈 안의 import도 따라가므로 단계마다 common 모듈을 나열하지 않아도 수정 시 다시 실행됩니다.
+    """
+    found, todo = set(), [script]
+    while todo:
+        try:
+            with open(os.path.join(ROOT_DIR, todo.pop()), encoding='utf-8') as f:
+                tree = ast.parse(f.read())
+        except (OSError, SyntaxError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module:
+                names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            elif isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            else:
+                continue
+            for name in names:
+                rel = name.replace('.', '/') + '.py'
+                if name.split('.')[0] == package and rel not in found and os.path.isfile(os.path.join(ROOT_DIR, rel)):
+                    found.add(rel)
+                    todo.append(rel)
+    return sorted(found)
+
+
+def fingerprint(patterns, state_dir=PIPELINE_STATE_DIR):
+    """패턴에 해당하는 파일들의 (경로, 내용 해시)를 합친 해시. 파일이 없으면 빈 목록의 해시"""
+    digest = hashlib.blake2b(digest_size=16)
+    for rel in _expand(patterns):
+        digest.update(f"{rel}\0{file_digest(os.path.join(ROOT_DIR, rel), state_dir)}\n".encode())
+    return digest.hexdigest()
+
+
+def stage_fingerprint(stage, state_dir=PIPELINE_STATE_DIR):
+    """단계 실행 여부를 판단하는 해시 (입력, 코드, 환경 변수)"""
+    env = json.dumps(sorted((stage.env or {}).items()))
+    return {'inputs': fingerprint(stage.inputs, state_dir),
+            'code': fingerprint((stage.script, *imported_modules(stage.script), *stage.code), state_dir) + env}
+
+
+def load_state(state_dir=PIPELINE_STATE_DIR):
+    try:
+        with open(os.path.join(state_dir, 'stages.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, state_dir=PIPELINE_STATE_DIR):
+    os.makedirs(state_dir, exist_ok=True)
+    path = os.path.join(state_dir, 'stages.json')
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    os.replace(path + '.tmp', path)
+
+
+def stale_reason(stage, previous, current, now=None):
+    """다시 실행해야 하는 이유 (최신이면 None)"""
+    if not previous:
+        return '처음 실행'
+    if previous.get('status') != RAN:
+        return '직전 실행 실패'
+    if previous.get('code') != current['code']:
+        return '코드 변경'
+    if previous.get('inputs') != current['inputs']:
+        return '입력 변경'
+    if stage.outputs and not _expand(stage.outputs):
+        return '출력 없음'
+    if stage.ttl_hours is not None and (now or time.time()) - previous.get('finished', 0) > stage.ttl_hours * 3600:
+        return f"{stage.ttl_hours:g}시간 경과"
+    return None
+
+
+def profiler_command(profiler, output_base):
+    """프로파일러 실행 인자. pyinstrument가 없으면 cProfile로 대신합니다. (인자 목록, 결과 파일)"""
+    if profiler == 'pyinstrument' and importlib.util.find_spec('pyinstrument') is None:
+        print("⚠️ pyinstrument가 설치되어 있지 않아 cProfile로 프로파일링합니다.")
+        profiler = 'cprofile'
+    if profiler == 'pyinstrument':
+        return ['-m', 'pyinstrument', '-r', 'html', '-o', output_base + '.html'], output_base + '.html'
+    return ['-m', 'cProfile', '-o', output_base + '.prof'], output_base + '.prof'
+
+
+def run_stage(stage, log_dir, run_id=None, profiler=None, report_dir=RUN_REPORT_DIR):
+    """
+    스크립트를 자기 폴더에서 별도 프로세스로 실행. (성공 여부, 소요 초, 로그 경로)
+    profiler('cprofile'/'pyinstrument')를 주면 report_dir/<run_id>/<단계>.prof(.html)에 프로파일 저장
+    """
+    script = os.path.join(ROOT_DIR, stage.script)
+    log_path = os.path.join(log_dir, f"{stage.name}.log")
+    env = {**os.environ, 'MPLBACKEND': 'Agg', 'PYTHONUNBUFFERED': '1', 'PYTHONIOENCODING': 'utf-8',
+           'METRICS_STAGE': stage.name, **({'METRICS_RUN_ID': run_id} if run_id else {}), **(stage.env or {})}
+    command = [sys.executable, script]
+    if profiler:
+        os.makedirs(os.path.join(report_dir, run_id), exist_ok=True)
+        args, profile_path = profiler_command(profiler, os.path.join(report_dir, run_id, stage.name))
+        command = [sys.executable, *args, script]
+        print(f"🔬 {stage.name}: 프로파일 → {profile_path}")
+    start = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log:
+        result = subprocess.run(command, cwd=os.path.dirname(script), env=env,
+                                stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+    return result.returncode == 0, time.perf_counter() - start, log_path
+
+
+def run_pipeline(stages, targets=None, jobs=4, force=False, dry_run=False, state_dir=PIPELINE_STATE_DIR,
+                 run_id=None, profile=(), profiler='cprofile', report_dir=RUN_REPORT_DIR):
+    """
+    DAG 순서대로 오래된 단계만 실행 (선행 단계가 끝난 단계부터 최대 jobs개 동시 실행).
+    targets를 주면 그 단계와 선행 단계만 대상. 선행 단계가 실패하면 뒤 단계는 실행하지 않습니다(BLOCKED).
+    run_id: 단계별 계측 리포트를 모을 실행 ID (없으면 새로 생성), profile: 프로파일러로 실행할 단계명
+    {단계명: (상태, 사유, 소요 초)}를 반환합니다.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    deps = build_dag(stages)
+    selected = upstream(deps, targets) if targets else set(by_name)
+    order = [name for name in topological_order(deps) if name in selected]
+    unknown = set(profile) - set(by_name)
+    if unknown:
+        raise KeyError(f"없는 단계입니다: {', '.join(sorted(unknown))}")
+    run_id = run_id or new_run_id()
+    log_dir = os.path.join(state_dir, 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+
+    state = load_state(state_dir)
+    results = {}
+
+    def ready(name):
+        return all(dep in results for dep in deps[name] if dep in selected)
+
+    def decide(name):
+        """실행할지 판단. 실행하지 않으면 결과를 바로 기록하고 None, 실행하면 (사유, 해시)"""
+        if any(results[dep][0] in (FAILED, BLOCKED) for dep in deps[name] if dep in selected):
+            results[name] = (BLOCKED, '선행 단계 실패', 0.0)
+            return None
+        current = stage_fingerprint(by_name[name], state_dir)
+        reason = '강제 실행' if force else stale_reason(by_name[name], state.get(name), current)
+        if reason is None and dry_run and any(results[dep][0] == PLANNED for dep in deps[name] if dep in selected):
+            reason = '선행 단계 실행'  # 실제 실행이면 선행 단계의 출력이 바뀔 수 있음
+        if reason is None:
+            results[name] = (SKIPPED, '최신', 0.0)
+            return None
+        if dry_run:
+            results[name] = (PLANNED, reason, 0.0)
+            return None
+        return reason, current
+
+    pending = list(order)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            # 건너뛴 단계 덕분에 바로 준비되는 단계까지 한 번에 배정
+            progressed = True
+            while progressed and len(running) < max(1, jobs):
+                progressed = False
+                for name in [n for n in pending if ready(n)]:
+                    if len(running) >= max(1, jobs):
+                        break
+                    pending.remove(name)
+                    progressed = True
+                    decision = decide(name)
+                    if decision is None:
+                        status, reason, _ = results[name]
+                        print(f"{'📝' if status == PLANNED else '⏭️ '} {name}: {reason}")
+                        continue
+                    print(f"▶️  {name}: {decision[0]} ({by_name[name].script})")
+                    running[pool.submit(run_stage, by_name[name], log_dir, run_id,
+                                        profiler if name in profile else None, report_dir)] = (name, decision)
+
+            if not running:
+                if pending:
+                    raise RuntimeError(f"실행할 수 없는 단계가 남았습니다: {pending}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, (reason, current) = running.pop(future)
+                try:
+                    ok, seconds, log_path = future.result()
+                except Exception as e:  # 실행 자체가 안 된 경우 (스크립트 없음 등)
+                    ok, seconds, log_path = False, 0.0, str(e)
+                if ok:
+                    # 실행 후 입력 해시를 다시 계산 (스크립트가 자기 입력을 갱신하는 경우 다음 실행에서 재실행 방지)
+                    current = stage_fingerprint(by_name[name], state_dir)
+                    print(f"✅ {name}: {seconds:.1f}s")
+                else:
+                    print(f"❌ {name}: 실패 ({seconds:.1f}s) → 로그: {log_path}")
+                results[name] = (RAN if ok else FAILED, reason, seconds)
+                state[name] = {**current, 'status': RAN if ok else FAILED, 'finished': time.time(),
+                               'seconds': round(seconds, 3)}
+                save_state(state, state_dir)
+    return results
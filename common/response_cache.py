@@ -0,0 +1,105 @@
+"""
+API 응답 디스크 캐시 (SQLite)
+
+(엔드포인트, 인증키를 제외한 파라미터)를 키로 응답 본문을 저장합니다.
+응답을 받는 즉시 기록되므로 수집 도중 중단되어도 재실행 시
+캐시에 없는(또는 만료된) 요청만 다시 호출하면 됩니다.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'cache', 'api_cache.sqlite')
+
+# 캐시 키에서 제외할 파라미터 (인증키는 바뀌어도 같은 요청)
+EXCLUDED_PARAMS = {'servicekey'}
+
+
+def make_cache_key(endpoint, params):
+    """엔드포인트 + 정렬된 파라미터(인증키 제외)로 캐시 키 생성"""
+    filtered = {str(k): str(v) for k, v in params.items() if str(k).lower() not in EXCLUDED_PARAMS}
+    return endpoint + '?' + json.dumps(filtered, sort_keys=True, ensure_ascii=False)
+
+
+class ResponseCache:
+    """
+    TTL 기반 응답 캐시. 여러 스레드에서 공유해도 안전합니다.
+
+    Parameters
+    ----------
+    path : SQLite 파일 경로
+    ttl_seconds : 저장 후 유효 기간(초). 지나면 만료로 간주하여 다시 호출합니다.
+    negative_ttl_seconds : '데이터 없음' 응답(negative=True로 저장)의 유효 기간.
+        미지정 시 ttl_seconds와 같습니다.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=7 * 24 * 3600, negative_ttl_seconds=None):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = ttl_seconds if negative_ttl_seconds is None else negative_ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " cache_key TEXT PRIMARY KEY,"
+            " endpoint TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " negative INTEGER NOT NULL DEFAULT 0)"
+        )
+        # 이전 버전에서 만든 캐시 파일 호환
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        if 'negative' not in columns:
+            self._conn.execute("ALTER TABLE responses ADD COLUMN negative INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    def get(self, endpoint, params):
+        """유효한 캐시 본문(bytes)을 반환. 없거나 만료되었으면 None"""
+        key = make_cache_key(endpoint, params)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, fetched_at, negative FROM responses WHERE cache_key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        ttl = self.negative_ttl_seconds if row[2] else self.ttl_seconds
+        if time.time() - row[1] > ttl:
+            return None
+        return row[0]
+
+    def set(self, endpoint, params, body, negative=False):
+        """
+        응답 본문 저장 (즉시 커밋하여 체크포인트 역할).
+        조회 결과가 없는 응답은 negative=True로 저장하면 더 짧은 기간 후 재조회합니다.
+        """
+        key = make_cache_key(endpoint, params)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (cache_key, endpoint, body, fetched_at, negative)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint, body, time.time(), int(negative)),
+            )
+            self._conn.commit()
+
+    def purge_expired(self, endpoint):
+        """
+        해당 엔드포인트의 만료 항목 삭제 후 삭제 건수 반환.
+        스크립트마다 TTL이 다르므로 다른 엔드포인트의 항목은 건드리지 않습니다.
+        """
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM responses WHERE endpoint = ?"
+                " AND fetched_at < CASE negative WHEN 1 THEN ? ELSE ? END",
+                (endpoint, time.time() - self.negative_ttl_seconds, time.time() - self.ttl_seconds),
+            )
+            self._conn.commit()
+        return cur.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
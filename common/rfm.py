@@ -0,0 +1,161 @@
+"""
+RFM(Recency / Frequency / Monetary) 계산 엔진
+
+- R/F/M: 날짜를 한 번만 변환한 뒤 groupby의 기본 집계(max, count, sum)로 계산
+- 점수: 분위수 경계 + np.searchsorted. 값이 몰려 경계가 겹쳐도(pd.qcut의 duplicate edges 오류)
+  같은 값은 같은 점수를 받고, 경계가 겹치지 않으면 pd.qcut과 결과가 같습니다.
+- 세분화: (등급명, 조건식) 규칙 목록을 np.select로 한 번에 적용
+- 대용량 이력: 파일을 배치 단위로 읽어 거래처별 누적값(마지막 주문일, 건수, 합계)만 유지
+  (RfmAccumulator). 메모리는 이력 길이가 아닌 거래처 수에 비례하고,
+  점수는 거래처별 값 전체로 계산하므로 분위수도 메모리 내 계산과 같습니다.
+"""
+import numpy as np
+import pandas as pd
+
+from common.storage import BATCH_ROWS, iter_batches
+
+N_QUANTILES = 5
+
+# (등급명, 조건식) 위에서부터 먼저 만족하는 등급. 조건식은 DataFrame.eval 문법
+SEGMENT_RULES = [
+    ('VIP (최우수)', 'RFM_Score >= 13'),
+    ('Loyal (우수)', 'RFM_Score >= 9'),
+    ('Potential (잠재)', 'RFM_Score >= 5'),
+]
+DEFAULT_SEGMENT = 'Risk (이탈위험)'
+
+
+def _aggregate(sales, key, date_col, order_col, amount_col):
+    """주문 행 → 거래처별 마지막 주문일, 주문 건수, 금액 합계"""
+    if not pd.api.types.is_datetime64_any_dtype(sales[date_col]):
+        sales = sales.assign(**{date_col: pd.to_datetime(sales[date_col], errors='coerce')})
+
+    return sales.groupby(key, sort=True).agg(
+        last_date=(date_col, 'max'), Frequency=(order_col, 'count'), Monetary=(amount_col, 'sum'))
+
+
+def _finish(agg, reference_date):
+    """마지막 주문일 → Recency(일)"""
+    rfm = agg.copy()
+    reference_date = (rfm['last_date'].max() + pd.Timedelta(days=1) if reference_date is None
+                      else pd.Timestamp(reference_date))
+    rfm.insert(0, 'Recency', (reference_date - rfm.pop('last_date')).dt.days)
+    return rfm
+
+
+def compute_rfm(sales, reference_date=None, key='ykiho', date_col='sales_date',
+                order_col='order_id', amount_col='amount'):
+    """
+    주문 행 → 거래처별 Recency(일), Frequency(주문 건수), Monetary(금액 합계).
+    reference_date 미지정 시 마지막 주문일 다음 날을 기준으로 합니다.
+    """
+    return _finish(_aggregate(sales, key, date_col, order_col, amount_col), reference_date)
+
+
+class RfmAccumulator:
+    """
+    배치별 부분 집계를 거래처별로 누적 (마지막 주문일은 max, 건수/합계는 sum으로 병합).
+    부분 집계가 누적 결과만큼 쌓이면 한 번에 병합하여 배치마다 전체를 다시 묶지 않습니다.
+    배치를 모두 넣은 뒤 result()로 compute_rfm과 같은 결과를 얻습니다.
+    key에 컬럼 목록을 주면 (기간, 거래처)처럼 여러 키 단위로 누적합니다.
+    """
+
+    MERGE = {'last_date': 'max', 'Frequency': 'sum', 'Monetary': 'sum'}
+
+    def __init__(self, key='ykiho', date_col='sales_date', order_col='order_id', amount_col='amount'):
+        self.columns = (key, date_col, order_col, amount_col)
+        self.n_rows = 0
+        self._state = None
+        self._pending = []
+        self._pending_rows = 0
+
+    def update(self, batch):
+        partial = _aggregate(batch, *self.columns)
+        self.n_rows += len(batch)
+        self._pending.append(partial)
+        self._pending_rows += len(partial)
+        if self._pending_rows >= max(len(batch), 0 if self._state is None else len(self._state)):
+            self._merge()
+
+    def _merge(self):
+        parts = ([] if self._state is None else [self._state]) + self._pending
+        if len(parts) > 1:
+            merged = pd.concat(parts)
+            self._state = merged.groupby(level=list(range(merged.index.nlevels)), sort=False).agg(self.MERGE)
+        elif parts:
+            self._state = parts[0]
+        self._pending, self._pending_rows = [], 0
+
+    def state(self):
+        """현재까지의 거래처별 누적값 (last_date, Frequency, Monetary). 없으면 None"""
+        self._merge()
+        return self._state
+
+    def result(self, reference_date=None):
+        self._merge()
+        if self._state is None:
+            raise ValueError("누적된 매출 데이터가 없습니다.")
+        return _finish(self._state.sort_index(), reference_date)
+
+
+def compute_rfm_chunked(path, reference_date=None, batch_rows=BATCH_ROWS, key='ykiho', date_col='sales_date',
+                        order_col='order_id', amount_col='amount', schema=None):
+    """CSV/Parquet/Feather 매출 파일을 batch_rows 행씩 읽어 compute_rfm과 같은 결과 반환"""
+    acc = RfmAccumulator(key, date_col, order_col, amount_col)
+    for batch in iter_batches(path, [key, date_col, order_col, amount_col], batch_rows, schema):
+        acc.update(batch)
+    return acc.result(reference_date)
+
+
+def quantile_score(values, q=N_QUANTILES, ascending=True):
+    """
+    분위수 점수 1..q. ascending=False이면 값이 작을수록 높은 점수(Recency).
+    구간은 pd.qcut과 같이 오른쪽 닫힘((a, b])이며 결측은 0점입니다.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    scores = np.zeros(len(values), dtype=np.int8)
+    if not valid.any():
+        return scores
+
+    edges = np.quantile(values[valid], np.linspace(0, 1, q + 1)[1:-1])
+    scores[valid] = np.searchsorted(edges, values[valid], side='left') + 1
+    if not ascending:
+        scores[valid] = q + 1 - scores[valid]
+    return scores
+
+
+def score_rfm(rfm, q=N_QUANTILES):
+    """R/F/M 점수와 합계(RFM_Score) 컬럼 추가"""
+    rfm = rfm.copy()
+    rfm['R_Score'] = quantile_score(rfm['Recency'], q, ascending=False)
+    rfm['F_Score'] = quantile_score(rfm['Frequency'], q)
+    rfm['M_Score'] = quantile_score(rfm['Monetary'], q)
+    rfm['RFM_Score'] = (rfm['R_Score'].astype(np.int16) + rfm['F_Score'] + rfm['M_Score']).astype(np.int16)
+    return rfm
+
+
+def segment(rfm, rules=SEGMENT_RULES, default=DEFAULT_SEGMENT):
+    """규칙 목록으로 등급 부여 (순서 있는 category)"""
+    labels = [label for label, _ in rules] + [default]
+    conditions = [rfm.eval(expr).to_numpy(dtype=bool) for _, expr in rules]
+    codes = np.select(conditions, np.arange(len(rules)), default=len(rules))
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+
+def finalize(rfm, q=N_QUANTILES, rules=SEGMENT_RULES, default=DEFAULT_SEGMENT):
+    """R/F/M → 점수 + Segment"""
+    rfm = score_rfm(rfm, q)
+    rfm['Segment'] = segment(rfm, rules, default)
+    return rfm
+
+
+def run_rfm(sales, reference_date=None, q=N_QUANTILES, rules=SEGMENT_RULES, default=DEFAULT_SEGMENT, **columns):
+    """주문 행 → R/F/M, 점수, Segment까지 계산한 거래처별 DataFrame"""
+    return finalize(compute_rfm(sales, reference_date, **columns), q, rules, default)
+
+
+def run_rfm_chunked(path, reference_date=None, batch_rows=BATCH_ROWS, q=N_QUANTILES, rules=SEGMENT_RULES,
+                    default=DEFAULT_SEGMENT, **columns):
+    """매출 파일 → run_rfm과 같은 결과 (배치 단위로 읽어 메모리 사용량 제한)"""
+    return finalize(compute_rfm_chunked(path, reference_date, batch_rows, **columns), q, rules, default)
@@ -0,0 +1,200 @@
+"""
+월별 RFM 스냅샷 저장소와 등급 이동 행렬
+
+스냅샷 = 기간 말일 기준의 거래처별 누적값(last_date, Frequency, Monetary) + 점수/등급.
+새 기간은 직전 스냅샷의 누적값에 그 기간의 거래만 더해서 계산하므로(RfmAccumulator.fold)
+36개월 이력을 만드는 비용이 전체 이력을 한 번 집계하는 비용과 비슷합니다.
+
+만든 스냅샷은 다시 계산하지 않습니다. 지난 기간의 거래가 뒤늦게 들어왔거나
+등급 기준을 바꿨다면 full=True로 처음부터 다시 만듭니다. 판매일이 없는 거래는 제외됩니다.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from common.rfm import DEFAULT_SEGMENT, N_QUANTILES, SEGMENT_RULES, RfmAccumulator, finalize
+from common.storage import (BATCH_ROWS, PROCESSED_DIR, find_table, iter_batches, list_tables, read_table,
+                            table_path, write_table)
+
+RFM_SNAPSHOT_DIR = os.path.join(PROCESSED_DIR, 'rfm_snapshots')
+PERIOD_FREQ = 'M'
+STATE_COLUMNS = ['last_date', 'Frequency', 'Monetary']
+
+# 이전 스냅샷에 없던 거래처의 이전 등급
+NEW_SEGMENT = 'New (신규)'
+
+
+def period_end(period):
+    """기간 말일 (Recency 기준일)"""
+    return period.end_time.normalize()
+
+
+def list_snapshots(directory=RFM_SNAPSHOT_DIR):
+    """저장된 스냅샷 기간 목록 (오래된 순)"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(pd.Period(name, freq=PERIOD_FREQ) for name in list_tables(directory))
+
+
+def read_snapshot(period, directory=RFM_SNAPSHOT_DIR, columns=None):
+    """스냅샷 하나 로드 (index=ykiho)"""
+    path = find_table(directory, str(period))
+    if path is None:
+        raise FileNotFoundError(f"RFM 스냅샷이 없습니다: {os.path.join(directory, str(period))}")
+    return read_table(path, columns=['ykiho'] + columns if columns else None).set_index('ykiho')
+
+
+def _iter_source(source, columns, batch_rows, schema):
+    """DataFrame 또는 파일 경로를 배치 단위로"""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), batch_rows):
+            yield source.iloc[start:start + batch_rows]
+    else:
+        yield from iter_batches(source, columns, batch_rows, schema)
+
+
+def build_snapshots(source, directory=RFM_SNAPSHOT_DIR, until=None, full=False, batch_rows=BATCH_ROWS,
+                    q=N_QUANTILES, rules=SEGMENT_RULES, default=DEFAULT_SEGMENT, key='ykiho',
+                    date_col='sales_date', order_col='order_id', amount_col='amount', schema=None):
+    """
+    매출(DataFrame 또는 CSV/Parquet/Feather 경로)로 월별 스냅샷 생성/갱신.
+    마지막 스냅샷 이후의 거래만 (기간, 거래처)별로 한 번에 집계한 뒤 기간 순서대로 누적합니다.
+    until(기간)을 지정하면 거래가 없는 달도 그때까지 스냅샷을 만듭니다 (Recency만 증가).
+    새로 저장한 기간 목록을 반환합니다.
+    """
+    existing = list_snapshots(directory)
+    last = None if full or not existing else existing[-1]
+    prev = read_snapshot(last, directory, STATE_COLUMNS) if last is not None else None
+    cutoff = period_end(last) + pd.Timedelta(days=1) if last is not None else None
+
+    # 1. (기간, 거래처)별 부분 집계 (한 번 읽기). 메모리는 거래처 수 × 기간 수에 비례
+    acc = RfmAccumulator(['_period', key], date_col, order_col, amount_col)
+    n_skipped = 0
+    for batch in _iter_source(source, [key, date_col, order_col, amount_col], batch_rows, schema):
+        dates = batch[date_col]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors='coerce')
+            batch = batch.assign(**{date_col: dates})
+        if cutoff is not None:
+            is_new = (dates >= cutoff).to_numpy()
+            n_skipped += int((~is_new & dates.notna().to_numpy()).sum())
+            batch, dates = batch[is_new], dates[is_new]
+        if len(batch):
+            acc.update(batch.assign(_period=dates.dt.to_period(PERIOD_FREQ)))
+
+    if n_skipped:
+        print(f"마지막 스냅샷({last}) 이후 거래만 반영합니다. (이전 거래 {n_skipped:,}건 건너뜀)")
+
+    monthly = acc.state()
+    if monthly is not None:
+        monthly = monthly.sort_index(level=0, sort_remaining=False)
+        periods = monthly.index.get_level_values(0)
+    first = last + 1 if last is not None else (periods.min() if monthly is not None else None)
+    final = periods.max() if monthly is not None else None
+    if until is not None:
+        until = pd.Period(until, freq=PERIOD_FREQ)
+        final = until if final is None else max(final, until)
+    if first is None or final is None or final < first:
+        return []
+
+    # 2. 거래처를 정수 코드로 바꾼 배열에 기간별 집계를 순서대로 더하며 저장
+    prev_keys = prev.index.to_numpy(dtype=object) if prev is not None else np.array([], dtype=object)
+    month_keys = monthly.index.get_level_values(1).to_numpy(dtype=object) if monthly is not None \
+        else np.array([], dtype=object)
+    codes, keys = pd.factorize(np.concatenate([prev_keys, month_keys]), sort=True)
+    prev_codes, month_codes = codes[:len(prev_keys)], codes[len(prev_keys):]
+
+    last_date = np.full(len(keys), np.datetime64('NaT'), dtype='datetime64[ns]')
+    frequency = np.zeros(len(keys), dtype=np.int64)
+    monetary = np.zeros(len(keys), dtype=np.float64 if monthly is None else monthly['Monetary'].dtype)
+    seen = np.zeros(len(keys), dtype=bool)
+    if prev is not None:
+        last_date[prev_codes] = prev['last_date'].to_numpy(dtype='datetime64[ns]')
+        frequency[prev_codes] = prev['Frequency'].to_numpy()
+        monetary[prev_codes] = prev['Monetary'].to_numpy()
+        seen[prev_codes] = True
+
+    if monthly is not None:
+        month_last = monthly['last_date'].to_numpy(dtype='datetime64[ns]')
+        month_freq = monthly['Frequency'].to_numpy()
+        month_money = monthly['Monetary'].to_numpy()
+        bounds = {period: (periods.searchsorted(period, 'left'), periods.searchsorted(period, 'right'))
+                  for period in periods.unique()}
+
+    written = []
+    for period in pd.period_range(first, final, freq=PERIOD_FREQ):
+        if monthly is not None and period in bounds:
+            lo, hi = bounds[period]
+            c = month_codes[lo:hi]  # 기간 안에서 거래처는 중복 없음
+            last_date[c] = np.fmax(last_date[c], month_last[lo:hi])
+            frequency[c] += month_freq[lo:hi]
+            monetary[c] += month_money[lo:hi]
+            seen[c] = True
+        if not seen.any():  # 첫 거래 이전
+            continue
+
+        end = np.datetime64(period_end(period), 'ns')
+        rfm = pd.DataFrame({
+            'last_date': last_date[seen],  # 다음 기간 누적용
+            'Recency': ((end - last_date[seen]) // np.timedelta64(1, 'D')),
+            'Frequency': frequency[seen], 'Monetary': monetary[seen],
+        }, index=pd.Index(keys[seen], name=key))
+        rfm = finalize(rfm, q, rules, default)
+        write_table(rfm.reset_index(), table_path(str(period), directory))
+        written.append(period)
+
+    if full:  # 다시 만든 범위 밖의 이전 스냅샷 정리
+        for period in existing:
+            if period not in written:
+                os.remove(find_table(directory, str(period)))
+    return written
+
+
+def transition_matrix(prev, curr, normalize=False):
+    """
+    두 스냅샷 사이의 등급 이동 거래처 수 (행: 이전 등급, 열: 현재 등급).
+    이전 스냅샷에 없던 거래처는 NEW_SEGMENT 행으로 집계합니다. normalize=True이면 행 비율.
+    """
+    segments = curr['Segment']
+    if isinstance(segments.dtype, pd.CategoricalDtype):
+        labels = list(segments.cat.categories)
+    else:
+        labels = [label for label, _ in SEGMENT_RULES] + [DEFAULT_SEGMENT]
+    rows = [NEW_SEGMENT] + labels
+
+    prev_codes = pd.Categorical(prev['Segment'].reindex(segments.index), categories=labels).codes + 1
+    curr_codes = pd.Categorical(segments, categories=labels).codes
+    counts = np.bincount(prev_codes.astype(np.int64) * len(labels) + curr_codes,
+                         minlength=len(rows) * len(labels)).reshape(len(rows), len(labels))
+
+    matrix = pd.DataFrame(counts, index=pd.Index(rows, name='이전 등급'), columns=pd.Index(labels, name='현재 등급'))
+    if normalize:
+        matrix = matrix.div(matrix.sum(axis=1).replace(0, np.nan), axis=0).fillna(0.0)
+    return matrix
+
+
+def segment_moves(prev, curr, to_segment=DEFAULT_SEGMENT):
+    """이번 스냅샷에서 to_segment로 새로 들어온 거래처 (이전 등급, 현재 R/F/M 포함)"""
+    before = prev['Segment'].reindex(curr.index).astype(object)
+    moved = (curr['Segment'] == to_segment).to_numpy() & (before != to_segment).to_numpy()
+    result = curr.loc[moved, ['Recency', 'Frequency', 'Monetary', 'RFM_Score', 'Segment']].copy()
+    result.insert(0, 'prev_segment', before[moved].fillna(NEW_SEGMENT))
+    return result
+
+
+TRAJECTORY_COLUMNS = ('Recency', 'Frequency', 'Monetary', 'RFM_Score', 'Segment')
+
+
+def load_trajectories(directory=RFM_SNAPSHOT_DIR, ykiho=None, columns=TRAJECTORY_COLUMNS):
+    """스냅샷 전체를 (period, ykiho) long 형식으로. ykiho 목록을 주면 해당 거래처만"""
+    frames = []
+    for period in list_snapshots(directory):
+        snap = read_snapshot(period, directory, list(columns))
+        if ykiho is not None:
+            snap = snap[snap.index.isin(ykiho)]
+        frames.append(snap.assign(period=period).reset_index())
+    if not frames:
+        return pd.DataFrame(columns=['period', 'ykiho', *columns])
+    result = pd.concat(frames, ignore_index=True)
+    return result[['period', 'ykiho', *columns]]
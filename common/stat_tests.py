@@ -0,0 +1,405 @@
+"""
+통계 검정 일괄 실행 (Statistical_Analysis_GUI 배치 모드)
+
+대상 컬럼(예: 등급) 하나에 대해 나머지 변수를 모두 검정합니다.
+- 대상 범주형: 범주형 변수는 카이제곱(Cramér's V), 수치형 변수는 ANOVA(η²)
+- 대상 수치형: 수치형 변수는 Pearson 상관(r), 범주형 변수는 ANOVA(η²)
+
+통계량은 아래의 행렬 계산으로 한 번에 구하고, 그래프 저장만 프로세스 풀에서 나눠 실행합니다
+(데이터는 작업자마다 한 번만 전달). 다중 검정을 보정(Benjamini-Hochberg 또는 Bonferroni)한 뒤 p값 순으로 정렬합니다.
+그래프는 각 작업자가 Agg 백엔드로 파일에 저장하므로 plt.show()에서 멈추지 않습니다.
+
+검정 통계량은 쌍마다 scipy를 부르지 않고 행렬 단위로 계산합니다.
+- Pearson: 결측을 쌍별로 제외한 합계를 행렬곱으로 구해 상관행렬과 p값을 한 번에
+- 카이제곱/Cramér's V: 범주형 컬럼을 정수 코드로 바꾼 뒤 np.bincount로 교차표
+- ANOVA: 그룹 원-핫(희소) 행렬곱으로 그룹별 합/제곱합을 여러 컬럼에 대해 한 번에
+"""
+import os
+import platform
+import re
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.stats import chi2 as chi2_dist
+from scipy.stats import f as f_dist
+from scipy.stats import t as t_dist
+
+# 수준이 이보다 많은 범주형 변수(요양기호, 병원명 등)는 검정하지 않음
+MAX_LEVELS = 50
+ALPHA = 0.05
+
+RESULT_COLUMNS = ['feature', 'test', 'n', 'statistic', 'dof', 'p_value', 'effect_name', 'effect_size',
+                  'p_adjusted', 'significant', 'plot', 'note']
+
+# 작업자 프로세스 전역 (initializer로 한 번만 설정)
+_df = None
+_plot_dir = None
+
+
+def is_categorical(s):
+    """문자열/category/bool 컬럼 (숫자, 날짜가 아닌 컬럼)"""
+    if isinstance(s.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(s):
+        return True
+    return not (pd.api.types.is_numeric_dtype(s) or pd.api.types.is_datetime64_any_dtype(s))
+
+
+def strength_label(r):
+    """상관계수 크기 해석"""
+    r = abs(r)
+    if r > 0.7:
+        return "매우 강한"
+    if r > 0.5:
+        return "강한"
+    if r > 0.3:
+        return "뚜렷한"
+    return "약한"
+
+
+def numeric_columns(df):
+    """수치형 컬럼 (bool 제외)"""
+    return [c for c in df.columns if not is_categorical(df[c]) and not pd.api.types.is_datetime64_any_dtype(df[c])]
+
+
+def categorical_columns(df, max_levels=None):
+    """범주형 컬럼 (max_levels를 주면 수준 수가 그 이하인 컬럼만)"""
+    return [c for c in df.columns if is_categorical(df[c]) and (max_levels is None or df[c].nunique() <= max_levels)]
+
+
+def encode(s):
+    """범주형 컬럼을 정수 코드로. (codes(결측=-1), 수준 Index)"""
+    try:
+        codes, levels = pd.factorize(s, sort=True)
+    except TypeError:  # 문자/숫자가 섞여 정렬할 수 없는 컬럼
+        codes, levels = pd.factorize(s)
+    return codes.astype(np.int64), pd.Index(levels)
+
+
+def _contingency(cx, nx, cy, ny):
+    """정수 코드 두 개의 교차표 (np.bincount). 빈 행/열은 pd.crosstab처럼 제외"""
+    valid = (cx >= 0) & (cy >= 0)
+    table = np.bincount(cx[valid] * ny + cy[valid], minlength=nx * ny).reshape(nx, ny)
+    rows, cols = np.flatnonzero(table.sum(axis=1)), np.flatnonzero(table.sum(axis=0))
+    return table[np.ix_(rows, cols)], rows, cols
+
+
+def _chi2_stats(table):
+    """교차표의 카이제곱 (scipy chi2_contingency와 같이 자유도 1이면 Yates 보정) + Cramér's V"""
+    observed = table.astype(float)
+    n = observed.sum()
+    expected = np.outer(observed.sum(axis=1), observed.sum(axis=0)) / n
+    dof = (observed.shape[0] - 1) * (observed.shape[1] - 1)
+    if dof == 1:
+        diff = expected - observed
+        observed = observed + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+    chi2 = ((observed - expected) ** 2 / expected).sum()
+    v = np.sqrt(chi2 / (n * (min(table.shape) - 1)))
+    return chi2, chi2_dist.sf(chi2, dof), dof, v
+
+
+def _pearson_core(x, y, min_periods=3):
+    """
+    x (n, a), y (n, b) 열 쌍별 Pearson 상관. 결측은 쌍마다 제외합니다.
+    각 열을 평균으로 중심화한 뒤 (개수, 합, 제곱합, 곱의 합)을 행렬곱으로 구합니다. (r, p, n) 각 (a, b)
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    mx, my = ~np.isnan(x), ~np.isnan(y)
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # 전부 결측인 열
+        xc = np.where(mx, x - np.nanmean(x, axis=0), 0.0)
+        yc = np.where(my, y - np.nanmean(y, axis=0), 0.0)
+        if mx.all() and my.all():
+            n = np.full((x.shape[1], y.shape[1]), float(len(x)))
+            cov = xc.T @ yc
+            var_x = np.broadcast_to((xc ** 2).sum(axis=0)[:, None], n.shape)
+            var_y = np.broadcast_to((yc ** 2).sum(axis=0)[None, :], n.shape)
+        else:
+            fx, fy = mx.astype(float), my.astype(float)
+            n = fx.T @ fy
+            sx, sy = xc.T @ fy, fx.T @ yc
+            cov = xc.T @ yc - sx * sy / n
+            var_x = (xc ** 2).T @ fy - sx ** 2 / n
+            var_y = fx.T @ (yc ** 2) - sy ** 2 / n
+        r = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+        r[(n < min_periods) | (var_x <= 0) | (var_y <= 0)] = np.nan
+        dof = n - 2
+        t = r * np.sqrt(dof / ((1 - r) * (1 + r)))
+        p = 2 * t_dist.sf(np.abs(t), dof)
+    p[np.abs(r) == 1] = 0.0
+    return r, p, n.astype(np.int64)
+
+
+def _anova_core(codes, n_groups, values):
+    """
+    그룹 코드 (n,)로 values (n, k) 각 열을 일원 분산분석. 그룹별 개수/합/제곱합은 희소 행렬곱으로.
+    (F, p, η², 유효 행 수, 그룹 수) 각 (k,)
+    """
+    values = np.asarray(values, dtype=float).reshape(len(codes), -1)
+    rows = np.flatnonzero(codes >= 0)
+    onehot = sparse.csr_matrix((np.ones(len(rows)), (codes[rows], rows)), shape=(n_groups, len(codes)))
+    mask = ~np.isnan(values)
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        centered = np.where(mask, values - np.nanmean(values, axis=0), 0.0)
+        count = onehot @ mask.astype(float)
+        total = onehot @ centered
+        sq = onehot @ (centered ** 2)
+        n = count.sum(axis=0)
+        k = (count > 0).sum(axis=0)
+        mean_sq = np.where(count > 0, total ** 2 / count, 0.0).sum(axis=0)
+        ss_between = mean_sq - total.sum(axis=0) ** 2 / n
+        ss_within = sq.sum(axis=0) - mean_sq
+        f_stat = (ss_between / (k - 1)) / (ss_within / (n - k))
+        p = f_dist.sf(f_stat, k - 1, n - k)
+        eta2 = ss_between / (ss_between + ss_within)
+    return f_stat, p, eta2, n.astype(np.int64), k
+
+
+def chi2_table(x, y):
+    """교차표 DataFrame (pd.crosstab과 같은 결과, bincount로 계산)"""
+    (cx, lx), (cy, ly) = encode(x), encode(y)
+    table, rows, cols = _contingency(cx, len(lx), cy, len(ly))
+    return pd.DataFrame(table, index=pd.Index(lx[rows], name=x.name), columns=pd.Index(ly[cols], name=y.name))
+
+
+def chi2_result(x, y):
+    """카이제곱 독립성 검정 + Cramér's V. (결과 dict, 교차표)"""
+    table = chi2_table(x, y)
+    n = int(table.to_numpy().sum())
+    if min(table.shape) < 2:
+        return {'test': 'chi2', 'n': n, 'note': '수준이 2개 미만'}, table
+    chi2, p, dof, v = _chi2_stats(table.to_numpy())
+    return {'test': 'chi2', 'n': n, 'statistic': chi2, 'dof': dof, 'p_value': p,
+            'effect_name': "Cramér's V", 'effect_size': v}, table
+
+
+def _anova_record(f_stat, p, eta2, n, k):
+    if k < 2:
+        return {'test': 'anova', 'n': int(n), 'note': '비교할 그룹이 2개 미만'}
+    return {'test': 'anova', 'n': int(n), 'statistic': f_stat, 'dof': int(k) - 1, 'p_value': p,
+            'effect_name': 'eta²', 'effect_size': eta2}
+
+
+def anova_result(groups_col, values_col):
+    """일원 분산분석 + η² (그룹 간 제곱합 / 전체 제곱합)"""
+    codes, levels = encode(groups_col)
+    stats = _anova_core(codes, len(levels), pd.to_numeric(values_col).to_numpy(dtype=float, na_value=np.nan))
+    return _anova_record(*(s[0] for s in stats))
+
+
+def _pearson_record(r, p, n):
+    if np.isnan(r):
+        return {'test': 'pearson', 'n': int(n), 'note': '유효한 값이 부족'}
+    return {'test': 'pearson', 'n': int(n), 'statistic': r, 'dof': int(n) - 2, 'p_value': p,
+            'effect_name': 'r', 'effect_size': r}
+
+
+def pearson_result(x, y):
+    """Pearson 상관 (결측 행 제외)"""
+    x, y = (pd.Series(v).to_numpy(dtype=float, na_value=np.nan)[:, None] for v in (x, y))
+    r, p, n = _pearson_core(x, y)
+    return _pearson_record(r[0, 0], p[0, 0], n[0, 0])
+
+
+def corr_matrix(df, columns=None, min_periods=3):
+    """수치형 컬럼 전체의 쌍별 Pearson 상관행렬. (r, p, n) DataFrame"""
+    columns = numeric_columns(df) if columns is None else list(columns)
+    values = df[columns].to_numpy(dtype=float, na_value=np.nan)
+    r, p, n = _pearson_core(values, values, min_periods)
+    np.fill_diagonal(p, 0.0)
+    return tuple(pd.DataFrame(m, index=columns, columns=columns) for m in (r, p, n))
+
+
+def chi2_matrix(df, columns=None, max_levels=MAX_LEVELS):
+    """범주형 컬럼 전체의 쌍별 카이제곱. (χ², p, Cramér's V) DataFrame (대각선 NaN)"""
+    columns = categorical_columns(df, max_levels) if columns is None else list(columns)
+    encoded = [encode(df[c]) for c in columns]
+    k = len(columns)
+    stat, p, v = (np.full((k, k), np.nan) for _ in range(3))
+    for i in range(k):
+        ci, li = encoded[i]
+        for j in range(i + 1, k):
+            cj, lj = encoded[j]
+            table = _contingency(ci, len(li), cj, len(lj))[0]
+            if min(table.shape) >= 2:
+                stat[i, j], p[i, j], _, v[i, j] = _chi2_stats(table)
+                stat[j, i], p[j, i], v[j, i] = stat[i, j], p[i, j], v[i, j]
+    return tuple(pd.DataFrame(m, index=columns, columns=columns) for m in (stat, p, v))
+
+
+def top_pairs(p, effect, n=20, method='fdr_bh', alpha=ALPHA):
+    """쌍별 행렬(p값, 효과크기)의 위쪽 삼각형을 보정 p값 순 목록으로"""
+    upper = np.triu(np.ones(p.shape, dtype=bool), k=1)
+    rows, cols = np.nonzero(upper & p.notna().to_numpy())
+    pairs = pd.DataFrame({'feature_1': p.index[rows], 'feature_2': p.columns[cols],
+                          'p_value': p.to_numpy()[rows, cols], 'effect_size': effect.to_numpy()[rows, cols]})
+    pairs['p_adjusted'] = adjust_pvalues(pairs['p_value'], method)
+    pairs['significant'] = pairs['p_adjusted'] < alpha
+    pairs = pairs.sort_values(['p_adjusted', 'p_value'], kind='stable', ignore_index=True)
+    return pairs if n is None else pairs.head(n)
+
+
+def adjust_pvalues(p_values, method='fdr_bh'):
+    """다중 검정 보정 (fdr_bh | bonferroni). NaN은 그대로 두고 나머지 개수로 보정"""
+    p = np.asarray(p_values, dtype=float)
+    adjusted = np.full(len(p), np.nan)
+    valid = np.flatnonzero(~np.isnan(p))
+    m = len(valid)
+    if m == 0:
+        return adjusted
+    if method == 'bonferroni':
+        adjusted[valid] = np.minimum(p[valid] * m, 1.0)
+    elif method == 'fdr_bh':
+        order = valid[np.argsort(p[valid], kind='stable')]
+        scaled = p[order] * m / np.arange(1, m + 1)
+        adjusted[order] = np.minimum(np.minimum.accumulate(scaled[::-1])[::-1], 1.0)
+    else:
+        raise ValueError(f"지원하지 않는 보정 방법입니다: {method}")
+    return adjusted
+
+
+def plan_tests(df, target, max_levels=MAX_LEVELS):
+    """대상 컬럼에 대해 실행할 (변수, 검정) 목록과 건너뛴 변수 [(변수, 사유)]"""
+    target_is_cat = is_categorical(df[target])
+    tasks, skipped = [], []
+    for col in df.columns:
+        if col == target:
+            continue
+        s = df[col]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            skipped.append((col, '날짜형'))
+        elif is_categorical(s):
+            n_levels = s.nunique()
+            if n_levels > max_levels:
+                skipped.append((col, f"수준 {n_levels}개 (>{max_levels})"))
+            else:
+                tasks.append((col, 'chi2' if target_is_cat else 'anova'))
+        else:
+            tasks.append((col, 'anova' if target_is_cat else 'pearson'))
+    return tasks, skipped
+
+
+def _safe_name(text):
+    return re.sub(r'[^\w.-]+', '_', str(text)).strip('_')[:80]
+
+
+def _init_worker(df, plot_dir):
+    global _df, _plot_dir
+    _df, _plot_dir = df, plot_dir
+    if plot_dir:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        if platform.system() == 'Windows':
+            plt.rc('font', family='Malgun Gothic')
+        elif platform.system() == 'Darwin':
+            plt.rc('font', family='AppleGothic')
+        else:
+            plt.rc('font', family='NanumGothic')
+        plt.rcParams['axes.unicode_minus'] = False
+
+
+def _plot(kind, feature, target):
+    """검정 종류별 그래프를 파일로 저장하고 경로 반환"""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    try:
+        if kind == 'chi2':
+            sns.heatmap(chi2_table(_df[feature], _df[target]), annot=True, fmt='d', cmap='YlGnBu', ax=ax)
+            ax.set_title(f'Chi-Square Heatmap: {feature} vs {target}')
+        elif kind == 'anova':
+            group_col, value_col = (target, feature) if is_categorical(_df[target]) else (feature, target)
+            sns.boxplot(x=group_col, y=value_col, data=_df, ax=ax)
+            ax.set_title(f'ANOVA Boxplot: {value_col} by {group_col}')
+        else:
+            sns.regplot(x=feature, y=target, data=_df[[feature, target]].dropna(), ax=ax)
+            ax.set_title(f'Correlation: {feature} vs {target}')
+        path = os.path.join(_plot_dir, f"{kind}_{_safe_name(feature)}.png")
+        fig.savefig(path, dpi=100, bbox_inches='tight')
+        return path
+    finally:
+        plt.close(fig)
+
+
+def _plot_task(task):
+    """작업자에서 그래프 하나 저장. (경로, 오류 메시지)"""
+    try:
+        return _plot(*task), None
+    except Exception as e:  # 그래프 하나의 실패가 전체 배치를 멈추지 않도록
+        return None, f"그래프 실패: {e}"
+
+
+def screen(df, target, tasks):
+    """
+    target과 각 변수의 검정 통계량 (행렬 단위 계산).
+    대상이 범주형이면 수치형 변수 전체를 ANOVA 한 번으로, 대상이 수치형이면 Pearson 한 번으로 계산합니다.
+    """
+    by_kind = {}
+    for feature, kind in tasks:
+        by_kind.setdefault(kind, []).append(feature)
+    y = df[target]
+    results = {}
+
+    if is_categorical(y):
+        cy, ly = encode(y)
+        for feature in by_kind.get('chi2', []):
+            cx, lx = encode(df[feature])
+            table = _contingency(cx, len(lx), cy, len(ly))[0]
+            if min(table.shape) < 2:
+                results[feature] = {'test': 'chi2', 'n': int(table.sum()), 'note': '수준이 2개 미만'}
+            else:
+                chi2, p, dof, v = _chi2_stats(table)
+                results[feature] = {'test': 'chi2', 'n': int(table.sum()), 'statistic': chi2, 'dof': dof,
+                                    'p_value': p, 'effect_name': "Cramér's V", 'effect_size': v}
+        features = by_kind.get('anova', [])
+        if features:
+            stats = _anova_core(cy, len(ly), df[features].to_numpy(dtype=float, na_value=np.nan))
+            for i, feature in enumerate(features):
+                results[feature] = _anova_record(*(s[i] for s in stats))
+    else:
+        values = y.to_numpy(dtype=float, na_value=np.nan)
+        for feature in by_kind.get('anova', []):
+            cx, lx = encode(df[feature])
+            results[feature] = _anova_record(*(s[0] for s in _anova_core(cx, len(lx), values)))
+        features = by_kind.get('pearson', [])
+        if features:
+            r, p, n = _pearson_core(df[features].to_numpy(dtype=float, na_value=np.nan), values[:, None])
+            for i, feature in enumerate(features):
+                results[feature] = _pearson_record(r[i, 0], p[i, 0], n[i, 0])
+
+    return [dict(results[feature], feature=feature) for feature, _ in tasks]
+
+
+def run_batch(df, target, plot_dir=None, jobs=None, method='fdr_bh', alpha=ALPHA, max_levels=MAX_LEVELS):
+    """
+    target에 대해 모든 변수를 검정한 결과표 (보정 p값 순 정렬).
+    plot_dir을 주면 검정별 그래프를 프로세스 풀에서 파일로 저장합니다. jobs=1이면 현재 프로세스에서 실행.
+    """
+    if target not in df.columns:
+        raise KeyError(f"대상 컬럼이 없습니다: {target}")
+    tasks, skipped = plan_tests(df, target, max_levels)
+    results = screen(df, target, tasks)
+
+    if plot_dir:
+        os.makedirs(plot_dir, exist_ok=True)
+        todo = [r for r in results if 'p_value' in r]
+        work = [(r['test'], r['feature'], target) for r in todo]
+        if jobs == 1 or len(work) <= 1:
+            _init_worker(df, plot_dir)
+            plots = [_plot_task(task) for task in work]
+        else:
+            jobs = jobs or min(len(work), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(df, plot_dir)) as pool:
+                plots = list(pool.map(_plot_task, work, chunksize=max(1, len(work) // (jobs * 4))))
+        for record, (path, error) in zip(todo, plots):
+            record['plot'], record['note'] = path, error
+
+    results += [{'feature': col, 'test': 'skip', 'note': reason} for col, reason in skipped]
+    table = pd.DataFrame(results).reindex(columns=RESULT_COLUMNS)
+    table['p_adjusted'] = adjust_pvalues(table['p_value'], method)
+    table['significant'] = table['p_adjusted'] < alpha
+    return table.sort_values(['p_adjusted', 'p_value'], na_position='last', kind='stable').reset_index(drop=True)
@@ -0,0 +1,473 @@
+"""
+data/raw, data/processed 산출물 저장소 (Parquet / Feather)
+
+단계 사이의 데이터는 컬럼형 포맷(Parquet 기본, Feather 선택)으로 주고받고
+타입 스키마를 함께 적용하여 매번 dtype=str로 읽고 변환하는 과정을 없앱니다.
+엑셀은 사람이 보는 보고용 내보내기(export)로만 사용합니다.
+"""
+import glob
+import hashlib
+import json
+import os
+import zipfile
+from collections.abc import Mapping
+from xml.etree import ElementTree
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data'))
+RAW_DIR = os.path.join(DATA_DIR, 'raw')
+PROCESSED_DIR = os.path.join(DATA_DIR, 'processed')
+
+# 기본 저장 포맷 (parquet | feather)
+STORAGE_FORMAT = os.getenv('STORAGE_FORMAT', 'parquet')
+COLUMNAR_EXTENSIONS = ('.parquet', '.feather')
+
+# 분석 마트: 시트 하나가 테이블 파일 하나 (analysis_mart/Sales_Data.parquet ...)
+ANALYSIS_MART_DIR = os.path.join(PROCESSED_DIR, 'analysis_mart')
+LEGACY_MART_XLSX = os.path.join(PROCESSED_DIR, 'analysis_mart.xlsx')
+
+# 엑셀 마트를 시트별로 변환해 둔 캐시 (배포 EXE의 번들 폴더는 실행마다 새로 풀리므로 사용자 폴더에 둠)
+MART_CACHE_DIR = os.getenv('MART_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'health_data_mart')
+
+# 배치 단위로 읽을 때 기본 행 수
+BATCH_ROWS = 1000000
+
+# 엑셀 시트 이름 길이 제한, 시트당 최대 행 수 (머리글 제외)
+EXCEL_SHEET_NAME_LIMIT = 31
+EXCEL_ROW_LIMIT = 1048575
+
+# 테이블별 컬럼 타입
+# 'str'은 문자열 유지(결측은 그대로), 'category'는 반복되는 범주값, 나머지는 pandas dtype
+SCHEMAS = {
+    'Sales_Data': {
+        'ykiho': 'str', 'hospital_name': 'str', 'sales_date': 'datetime64[ns]', 'order_id': 'str',
+        'product_name': 'category', 'amount': 'int64', 'sku': 'str',
+    },
+    'Client_Info': {
+        'ykiho': 'str', 'hospital_name': 'str', 'doctors_by_subject': 'str', 'has_dialysis': 'category',
+        'total_equip_cnt': 'Int64', 'nursing_grade_info': 'category',
+    },
+    'Equipment_Info': {
+        'ykiho': 'str', 'model_name': 'str', 'category': 'category', 'install_date': 'datetime64[ns]',
+    },
+}
+
+# 상세정보(hospital_detail_*) 공통 컬럼. 스키마에 없는 컬럼은 문자열로 유지
+DETAIL_SCHEMA = {
+    'ykiho': 'str', 'clCd': 'str', 'dgsbjtCd': 'str',
+    'ddt': 'Int64', 'mdeptSdrCnt': 'Int64', 'dgsbjtPrSdrCnt': 'Int64', 'cdiagDrCnt': 'Int64', 'oftCnt': 'Int64',
+}
+
+# 상세정보 테이블별 추가 컬럼 타입 (DETAIL_SCHEMA와 함께 적용, 숫자처럼 보여도 코드/등급인 컬럼)
+DETAIL_TABLE_SCHEMAS = {
+    'equip_info': {'oftCd': 'str'},
+    'nursing_info': {'grade': 'str', 'typeCd': 'str'},
+}
+
+
+def is_text(s):
+    """
+    문자열 컬럼 여부. pandas 3은 dtype=str 컬럼이 StringDtype이지만
+    pandas 2.x는 object이므로 object 컬럼은 값이 모두 문자열(결측 제외)인지 확인합니다.
+    """
+    if isinstance(s.dtype, pd.StringDtype):
+        return True
+    return pd.api.types.is_object_dtype(s.dtype) and pd.api.types.infer_dtype(s, skipna=True) in ('string', 'empty')
+
+
+def to_numeric(s):
+    """
+    숫자 변환 (변환 불가 값은 결측). 문자열 컬럼은 Arrow 형변환(정수 → 실수 순)을 먼저 시도하며
+    pd.to_numeric보다 수십 배 빠릅니다. 변환할 수 없는 값이 있으면 pd.to_numeric으로 처리합니다.
+    """
+    if is_text(s):
+        arr = pa.array(s, from_pandas=True)
+        for target, dtype in ((pa.int64(), pd.Int64Dtype()), (pa.float64(), None)):
+            try:
+                num = pc.cast(arr, target)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                continue
+            return num.to_pandas(types_mapper={target: dtype}.get).set_axis(s.index).rename(s.name)
+    return pd.to_numeric(s, errors='coerce')
+
+
+def apply_schema(df, schema):
+    """스키마에 정의된 컬럼만 타입 변환 (없는 컬럼은 무시, 변환 불가 값은 결측 처리)"""
+    if not schema:
+        return df
+    df = df.copy()
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        s = df[col]
+        if dtype == 'str':
+            if not is_text(s):  # 이미 문자열 컬럼이면 그대로
+                df[col] = s.astype(str).where(s.notna())
+        elif dtype == 'category':
+            df[col] = s.astype('category')
+        elif dtype.startswith('datetime64'):
+            df[col] = pd.to_datetime(s, errors='coerce').astype(dtype)
+        elif dtype in ('int64', 'Int64', 'float64'):
+            num = to_numeric(s)
+            # 결측이 있으면 int64로 바꿀 수 없으므로 nullable 정수로
+            df[col] = num.astype('Int64' if dtype == 'int64' and num.isna().any() else dtype)
+        else:
+            df[col] = s.astype(dtype)
+    return df
+
+
+def table_path(name, directory=PROCESSED_DIR, fmt=STORAGE_FORMAT):
+    return os.path.join(directory, f"{name}.{fmt}")
+
+
+def write_table(df, path, schema=None):
+    """확장자(.parquet / .feather / .csv)에 따라 저장. 임시 파일에 쓴 뒤 교체합니다."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    df = apply_schema(df, schema).reset_index(drop=True)
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.{os.getpid()}.tmp{ext}"  # 같은 파일을 여러 프로세스가 쓰더라도 임시 파일은 각자
+
+    if ext == '.parquet':
+        df.to_parquet(tmp_path, index=False)
+    elif ext == '.feather':
+        df.to_feather(tmp_path)
+    elif ext == '.csv':
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    else:
+        raise ValueError(f"지원하지 않는 저장 형식입니다: {path}")
+    os.replace(tmp_path, path)
+
+
+def write_batches(batches, path, schema=None):
+    """
+    DataFrame 배치를 차례로 한 파일(.parquet / .feather / .csv)에 기록 (전체를 메모리에 모으지 않음).
+    컬럼 타입은 첫 배치를 따릅니다. 임시 파일에 쓴 뒤 교체하며, 기록한 행 수를 반환합니다.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    root, ext = os.path.splitext(path)
+    if ext not in ('.parquet', '.feather', '.csv'):
+        raise ValueError(f"지원하지 않는 저장 형식입니다: {path}")
+    tmp_path = f"{root}.{os.getpid()}.tmp{ext}"
+
+    writer, arrow_schema, n_batches, n_rows = None, None, 0, 0
+    try:
+        for df in batches:
+            df = apply_schema(df, schema).reset_index(drop=True)
+            if ext == '.csv':
+                first = n_batches == 0
+                df.to_csv(tmp_path, mode='w' if first else 'a', header=first, index=False,
+                          encoding='utf-8-sig' if first else 'utf-8')
+            else:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    arrow_schema = table.schema
+                    writer = pq.ParquetWriter(tmp_path, arrow_schema) if ext == '.parquet' else pa.ipc.new_file(
+                        tmp_path, arrow_schema, options=pa.ipc.IpcWriteOptions(compression='lz4'))
+                writer.write_table(table.cast(arrow_schema))
+            n_batches += 1
+            n_rows += len(df)
+        if n_batches == 0:
+            raise ValueError(f"기록할 배치가 없습니다: {path}")
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if writer is not None:
+        writer.close()
+    os.replace(tmp_path, path)
+    return n_rows
+
+
+def read_table(path, columns=None, memory_map=False, schema=None):
+    """
+    테이블 로드. memory_map=True이면 파일을 메모리 매핑하여 읽습니다
+    (Feather는 압축하지 않은 경우 복사 없이 바로 사용 가능).
+    CSV는 문자열로 읽은 뒤 스키마를 적용합니다.
+    """
+    ext = os.path.splitext(path)[1]
+    if ext == '.parquet':
+        df = pq.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+    elif ext == '.feather':
+        df = feather.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+    elif ext == '.csv':
+        df = pd.read_csv(path, dtype=str, usecols=columns)
+    else:
+        raise ValueError(f"지원하지 않는 저장 형식입니다: {path}")
+    return apply_schema(df, schema)
+
+
+def _slice_batches(table, batch_rows, schema):
+    for offset in range(0, table.num_rows, batch_rows):
+        yield apply_schema(table.slice(offset, batch_rows).to_pandas(), schema)
+
+
+def iter_batches(path, columns=None, batch_rows=BATCH_ROWS, schema=None):
+    """
+    테이블을 batch_rows 행씩 DataFrame으로 읽기 (파일 전체를 메모리에 올리지 않음).
+    Parquet은 행 그룹, Feather는 레코드 배치(메모리 매핑) 단위로 읽어 나누고 CSV는 chunksize로 읽습니다.
+    """
+    ext = os.path.splitext(path)[1]
+    if ext == '.parquet':
+        # ParquetFile.iter_batches는 읽은 버퍼를 끝까지 유지하므로 행 그룹 단위로 읽고 나눔
+        parquet = pq.ParquetFile(path)
+        for i in range(parquet.metadata.num_row_groups):
+            yield from _slice_batches(parquet.read_row_group(i, columns=columns), batch_rows, schema)
+    elif ext == '.feather':
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                yield from _slice_batches(batch.select(columns) if columns else batch, batch_rows, schema)
+    elif ext == '.csv':
+        for chunk in pd.read_csv(path, dtype=str, usecols=columns, chunksize=batch_rows):
+            yield apply_schema(chunk, schema)
+    else:
+        raise ValueError(f"지원하지 않는 저장 형식입니다: {path}")
+
+
+def read_head(path, n_rows, columns=None, schema=None):
+    """앞에서부터 n_rows행만 로드 (배치 단위로 읽다가 멈춤)"""
+    frames, remaining = [], n_rows
+    for batch in iter_batches(path, columns=columns, batch_rows=min(n_rows, BATCH_ROWS) or 1, schema=schema):
+        frames.append(batch.iloc[:remaining])
+        remaining -= len(frames[-1])
+        if remaining <= 0:
+            break
+    if not frames:
+        return read_table(path, columns=columns, schema=schema).iloc[:0]
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def find_table(directory, name):
+    """directory에서 name 테이블 파일 경로 (parquet → feather 순, 없으면 None)"""
+    for ext in COLUMNAR_EXTENSIONS:
+        path = os.path.join(directory, name + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def list_tables(directory):
+    """directory에 저장된 테이블 이름 목록"""
+    names = []
+    for ext in COLUMNAR_EXTENSIONS:
+        for path in sorted(glob.glob(os.path.join(directory, '*' + ext))):
+            name = os.path.basename(path)[:-len(ext)]
+            if not name.endswith('.tmp') and name not in names:
+                names.append(name)
+    return names
+
+
+def write_dataset(tables, directory, schemas=SCHEMAS, fmt=STORAGE_FORMAT):
+    """{테이블명: DataFrame}을 테이블별 파일로 저장"""
+    os.makedirs(directory, exist_ok=True)
+    for name, df in tables.items():
+        write_table(df, table_path(name, directory, fmt), schema=schemas.get(name))
+
+
+def read_dataset(directory, tables=None, memory_map=False, schemas=SCHEMAS):
+    """{테이블명: DataFrame} 로드 (tables 미지정 시 전체)"""
+    result = {}
+    for name in tables or list_tables(directory):
+        path = find_table(directory, name)
+        if path is None:
+            raise FileNotFoundError(f"테이블이 없습니다: {os.path.join(directory, name)}")
+        result[name] = read_table(path, memory_map=memory_map, schema=schemas.get(name))
+    return result
+
+
+def export_excel(tables, path, max_rows=EXCEL_ROW_LIMIT):
+    """
+    보고용 엑셀 내보내기 (분석 단계에서는 다시 읽지 않음).
+    시트마다 앞의 max_rows행(엑셀 한도 이내)까지만 기록하고, 잘린 시트의 {이름: 전체 행 수}를 반환합니다.
+    """
+    max_rows = min(max_rows, EXCEL_ROW_LIMIT)
+    truncated = {}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with pd.ExcelWriter(path, engine='xlsxwriter') as writer:
+        for name, df in tables.items():
+            if len(df) > max_rows:
+                truncated[name] = len(df)
+                df = df.iloc[:max_rows]
+            df.to_excel(writer, sheet_name=name[:EXCEL_SHEET_NAME_LIMIT], index=False)
+    return truncated
+
+
+def import_excel(xlsx_path, directory, schemas=SCHEMAS):
+    """기존 엑셀 산출물을 테이블 파일로 변환 (1회성). 변환한 테이블을 반환"""
+    tables = {name: apply_schema(df, schemas.get(name))
+              for name, df in pd.read_excel(xlsx_path, sheet_name=None).items()}
+    try:
+        write_dataset(tables, directory, schemas)
+    except OSError as e:  # 읽기 전용 위치(배포 번들 등)이면 변환 없이 사용
+        print(f"⚠️ 변환 결과 저장 실패 ({directory}): {e}")
+    return tables
+
+
+def load_analysis_mart(tables=None, directory=ANALYSIS_MART_DIR, legacy_xlsx=LEGACY_MART_XLSX, memory_map=False):
+    """
+    분석 마트 로드. 요청한 테이블이 없고 이전 엑셀 마트가 있으면 한 번 변환한 뒤 사용합니다.
+    테이블을 찾을 수 없으면 FileNotFoundError.
+    """
+    existing = list_tables(directory) if os.path.isdir(directory) else []
+    missing = [name for name in tables or [] if name not in existing]
+
+    if (missing or not existing) and legacy_xlsx and os.path.exists(legacy_xlsx):
+        print(f"⚠️ 엑셀 마트를 컬럼형 포맷으로 변환합니다: {legacy_xlsx} → {directory}")
+        converted = import_excel(legacy_xlsx, directory)
+        others = [name for name in existing if name not in converted and (not tables or name in tables)]
+        result = {**read_dataset(directory, others, memory_map=memory_map), **converted}
+        missing = [name for name in tables or [] if name not in result]
+        if not missing:
+            return {name: result[name] for name in tables} if tables else result
+
+    if missing or not existing:
+        raise FileNotFoundError(f"분석 마트가 없습니다: {os.path.join(directory, ', '.join(missing))}")
+    return read_dataset(directory, tables, memory_map=memory_map)
+
+
+def read_mart_table(name, columns=None, memory_map=False, directory=ANALYSIS_MART_DIR,
+                    legacy_xlsx=LEGACY_MART_XLSX):
+    """분석 마트의 테이블 하나만 로드 (필요한 컬럼만 읽기)"""
+    path = find_table(directory, name)
+    if path is None:
+        df = load_analysis_mart([name], directory, legacy_xlsx)[name]
+        return df[columns] if columns else df
+    return read_table(path, columns=columns, memory_map=memory_map, schema=SCHEMAS.get(name))
+
+
+def count_rows(path):
+    """테이블 행 수 (Parquet은 메타데이터만 읽음)"""
+    ext = os.path.splitext(path)[1]
+    if ext == '.parquet':
+        return pq.ParquetFile(path).metadata.num_rows
+    if ext == '.feather':
+        return feather.read_table(path, columns=[], memory_map=True).num_rows
+    return len(read_table(path))
+
+
+def excel_sheet_names(path):
+    """엑셀 시트 이름 목록 (xl/workbook.xml만 읽고 시트 내용은 파싱하지 않음)"""
+    with zipfile.ZipFile(path) as zf:
+        root = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+    return [el.get('name') for el in root.iter() if el.tag.endswith('}sheet')]
+
+
+def file_digest(path, cache_dir):
+    """
+    파일 내용 해시. (크기, 수정 시각)이 이전과 같으면 cache_dir/index.json에 기록한 값을 재사용하고
+    다르면 다시 계산합니다 (배포 번들처럼 수정 시각만 바뀐 같은 파일은 같은 해시).
+    """
+    stat = os.stat(path)
+    key, stamp = os.path.abspath(path), [stat.st_size, stat.st_mtime_ns]
+    index_path = os.path.join(cache_dir, 'index.json')
+    try:
+        with open(index_path, encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    if index.get(key, [None])[:2] == stamp:
+        return index[key][2]
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    index[key] = stamp + [digest.hexdigest()]
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        pass
+    return index[key][2]
+
+
+class LazyMart(Mapping):
+    """
+    분석 마트를 {테이블명: DataFrame}처럼 쓰되, 처음에는 테이블 이름만 읽고 각 테이블은 처음 사용할 때 로드합니다.
+    테이블 폴더에 없는 시트는 엑셀 마트에서 그 시트만 파싱하여 cache_dir/<파일 해시>/에 저장하고,
+    다음 실행부터는 엑셀을 열지 않고 캐시를 메모리 매핑으로 읽습니다.
+    """
+
+    def __init__(self, directory=ANALYSIS_MART_DIR, legacy_xlsx=LEGACY_MART_XLSX, cache_dir=MART_CACHE_DIR,
+                 memory_map=True, schemas=SCHEMAS):
+        self.directory, self.legacy_xlsx, self.memory_map, self.schemas = directory, legacy_xlsx, memory_map, schemas
+        self._tables = {}
+        self._paths = {name: find_table(directory, name) for name in list_tables(directory)} \
+            if os.path.isdir(directory) else {}
+        self._sheets = []
+        self.cache = None
+
+        if legacy_xlsx and os.path.exists(legacy_xlsx):
+            self.cache = os.path.join(cache_dir, file_digest(legacy_xlsx, cache_dir))
+            manifest = os.path.join(self.cache, 'sheets.json')
+            try:
+                with open(manifest, encoding='utf-8') as f:
+                    self._sheets = json.load(f)
+            except (OSError, ValueError):
+                self._sheets = excel_sheet_names(legacy_xlsx)
+                try:
+                    os.makedirs(self.cache, exist_ok=True)
+                    with open(manifest, 'w', encoding='utf-8') as f:
+                        json.dump(self._sheets, f, ensure_ascii=False)
+                except OSError as e:
+                    print(f"⚠️ 캐시 폴더를 사용할 수 없습니다 ({self.cache}): {e}")
+
+        self._names = list(self._paths) + [name for name in self._sheets if name not in self._paths]
+        if not self._names:
+            raise FileNotFoundError(f"분석 마트가 없습니다: {directory}")
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __getitem__(self, name):
+        if name not in self._tables:
+            if name not in self._names:
+                raise KeyError(name)
+            self._tables[name] = self._load(name)
+        return self._tables[name]
+
+    def _path(self, name):
+        """테이블 파일 경로 (테이블 폴더 → 엑셀 캐시 순, 아직 변환 전이면 None)"""
+        if name in self._paths:
+            return self._paths[name]
+        return find_table(self.cache, name) if self.cache else None
+
+    def _load(self, name):
+        path = self._path(name)
+        if path is not None:
+            return read_table(path, memory_map=self.memory_map, schema=self.schemas.get(name))
+
+        print(f"⏳ 엑셀 시트를 변환합니다 (최초 1회): {name}")
+        df = apply_schema(pd.read_excel(self.legacy_xlsx, sheet_name=name), self.schemas.get(name))
+        try:
+            write_table(df, table_path(name, self.cache, 'parquet'))
+        except OSError as e:  # 캐시를 쓸 수 없으면 이번 실행에서만 사용
+            print(f"⚠️ 캐시 저장 실패 ({self.cache}): {e}")
+        return df
+
+    def is_loaded(self, name):
+        return name in self._tables
+
+    def row_count(self, name):
+        """행 수 (로드하지 않고 파일 메타데이터로). 엑셀에서 아직 변환하지 않은 시트는 None"""
+        if name in self._tables:
+            return len(self._tables[name])
+        path = self._path(name)
+        return count_rows(path) if path is not None else None
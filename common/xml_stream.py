@@ -0,0 +1,84 @@
+"""
+API 응답 XML 스트리밍 파서
+
+응답 본문(bytes)을 iterparse로 읽으면서 <item> 단위로 행(dict)을 내보냅니다.
+전체 트리를 만들지 않고 처리한 원소는 즉시 비우므로 응답이 커도 메모리가 일정합니다.
+lxml이 설치되어 있으면 lxml을, 없으면 표준 라이브러리를 사용합니다.
+"""
+import io
+
+try:
+    from lxml import etree as _etree
+    HAS_LXML = True
+    ParseError = _etree.XMLSyntaxError
+except ImportError:  # lxml 미설치 시 표준 라이브러리 사용
+    import xml.etree.ElementTree as _etree
+    HAS_LXML = False
+    ParseError = _etree.ParseError
+
+NORMAL_RESULT_CODES = ('00', '0000', '03')  # 03: 조회 결과 없음 (정상 처리)
+
+
+def convert_value(value, converter):
+    """문자열 값을 converter(int, float 등)로 변환. 빈 값이나 변환 실패는 None"""
+    if value is None or converter is None:
+        return value
+    value = value.strip()
+    if value == '':
+        return None
+    try:
+        return converter(value)
+    except ValueError:
+        try:
+            return converter(float(value))  # '3.0' 같은 정수형 값
+        except ValueError:
+            return None
+
+
+class ResponseStream:
+    """
+    응답 본문을 순회하며 <item> 행을 반환하는 스트림.
+    순회가 끝나면 result_code, result_msg, total_count 헤더 값을 확인할 수 있습니다.
+
+    Parameters
+    ----------
+    body : 응답 본문 (bytes). 디코딩하지 않고 그대로 넘깁니다.
+    converters : {태그명: 변환함수} (예: {'ddt': int})
+    extra : 모든 행에 추가할 값 (예: {'ykiho': ykiho})
+    """
+
+    def __init__(self, body, item_tag='item', converters=None, extra=None):
+        self.body = body
+        self.item_tag = item_tag
+        self.converters = converters or {}
+        self.extra = extra or {}
+        self.result_code = None
+        self.result_msg = None
+        self.total_count = None
+
+    def __iter__(self):
+        for _, elem in _etree.iterparse(io.BytesIO(self.body), events=('end',)):
+            tag = elem.tag
+            if tag == self.item_tag:
+                row = {child.tag: child.text for child in elem}
+                for col, converter in self.converters.items():
+                    if col in row:
+                        row[col] = convert_value(row[col], converter)
+                row.update(self.extra)
+                yield row
+
+                # 처리한 원소 해제
+                elem.clear()
+                if HAS_LXML:
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
+            elif tag == 'resultCode':
+                self.result_code = (elem.text or '').strip()
+            elif tag == 'resultMsg':
+                self.result_msg = elem.text
+            elif tag == 'totalCount':
+                self.total_count = int(elem.text or 0)
+
+    def rows(self):
+        """전체 행을 리스트로 반환 (응답 1건 단위의 작은 결과용)"""
+        return list(self)
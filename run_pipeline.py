@@ -0,0 +1,121 @@
+"""
+전체 파이프라인 실행 (수집 → 전처리 → 웨어하우스 → 분석)
+
+입력이 바뀐 단계와 그 뒤 단계만 다시 실행하고, 서로 의존하지 않는 단계는 동시에 실행합니다.
+(예: UDI 바코드 수집, 병원 정보 수집, 재고 정제는 병렬)
+단계별 로그와 실행 상태: data/processed/pipeline_state/
+실행 리포트(단계별 시간, 행 수, 최대 메모리, API 통계): data/processed/run_reports/<run_id>/run.json
+
+실행 예:
+  python run_pipeline.py                 # 오래된 단계만 실행 (야간 갱신)
+  python run_pipeline.py --dry-run       # 실행할 단계와 이유만 출력
+  python run_pipeline.py rfm --force     # rfm과 선행 단계를 모두 다시 실행
+  python run_pipeline.py --list          # 단계와 의존 관계
+  python run_pipeline.py rfm --force --profile rfm   # rfm 단계를 cProfile로 실행
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from common.metrics import new_run_id, write_run_report
+from common.pipeline import (BLOCKED, FAILED, PLANNED, PROFILERS, RAN, Stage, build_dag, run_pipeline,
+                             topological_order)
+
+# 웨어하우스가 processed/ 또는 raw/ 에서 찾는 원천 테이블 (common.warehouse.find_source)
+WAREHOUSE_SOURCES = ('client_basic_info', 'sales_transaction_data', 'equipment_list', 'product_equipment_mapping',
+                     'sku_equipment_matching', 'inventory_cleaned')
+
+STAGES = [
+    # 1. 수집 (외부 API: 응답 캐시 TTL과 같은 주기로 다시 실행)
+    Stage('hospital_basic', '01_Data_Collection/01_Hospital_Basic_Info_Scraper.py',
+          inputs=('data/raw/client_list.csv', 'data/raw/manual_matches.csv'),
+          outputs=('data/raw/hospital_basic_info.csv', 'data/raw/hospital_basic_delta.csv',
+                   'data/processed/name_similarity_check.csv'),
+          ttl_hours=24),
+    Stage('hospital_detail', '01_Data_Collection/02_Hospital_Detail_Info_Scraper.py',
+          inputs=('data/raw/hospital_basic_info.csv', 'data/raw/hospital_basic_delta.csv'),
+          outputs=('data/raw/hospital_detail_*.*',),
+          ttl_hours=24 * 7),
+    Stage('udi_barcode', '01_Data_Collection/03_UDI_Barcode_Scraper.py',
+          inputs=('data/raw/target_barcodes.csv', 'data/raw/udi_retry_barcodes.csv'),
+          outputs=('data/raw/udi_collection_result.csv', 'data/raw/udi_barcode_map.csv'),
+          ttl_hours=24 * 30),
+
+    # 2. 전처리
+    Stage('inventory_cleaning', '02_Data_Preprocessing/01_Inventory_Cleaning.py',
+          inputs=('data/raw/boxhero.csv',),
+          outputs=('data/processed/inventory_cleaned.*',)),
+    Stage('detail_transform', '02_Data_Preprocessing/02_Detail_Info_Transform.py',
+          inputs=('data/raw/hospital_detail_*.*', 'data/raw/hospital_basic_info.csv'),
+          outputs=('data/processed/hospital_detail/*',)),
+
+    # 3. 웨어하우스 (SQL 파일도 코드로 취급)
+    Stage('warehouse', '03_SQL_Warehouse/04_Run_Warehouse.py',
+          inputs=('data/processed/hospital_detail/*', 'data/raw/Sales_Data.*',
+                  *(f"data/{folder}/{name}.*" for name in WAREHOUSE_SOURCES for folder in ('processed', 'raw'))),
+          outputs=('data/processed/analysis_mart/Sales_Data.*',
+                   'data/processed/analysis_mart/hospital_features.*', 'data/processed/analysis_mart/sales_mart.*',
+                   'data/processed/analysis_mart/equipment_status.*',
+                   'data/processed/analysis_mart/hospital_feature_counts.*'),
+          code=('03_SQL_Warehouse/*.sql',)),
+
+    # 4. 분석 (웨어하우스가 게시한 분석 마트의 Sales_Data, 없으면 이전 엑셀 마트)
+    Stage('rfm', '04_Analysis_Modeling/01_Client_Segmentation_RFM.py',
+          inputs=('data/processed/analysis_mart/Sales_Data.*', 'data/processed/analysis_mart.xlsx'),
+          outputs=('data/processed/client_rfm_result.parquet', 'data/processed/client_rfm_result.csv')),
+    Stage('rfm_snapshots', '04_Analysis_Modeling/02_RFM_Snapshots.py',
+          inputs=('data/processed/analysis_mart/Sales_Data.*', 'data/processed/analysis_mart.xlsx'),
+          outputs=('data/processed/rfm_snapshots/*',)),
+]
+
+STATUS_LABELS = {RAN: '실행', PLANNED: '예정', FAILED: '실패', BLOCKED: '중단'}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('targets', nargs='*', help='실행할 단계 (선행 단계 포함). 생략 시 전체')
+    parser.add_argument('--jobs', type=int, default=int(os.getenv('PIPELINE_JOBS', 3)), help='동시 실행 단계 수')
+    parser.add_argument('--force', action='store_true', help='최신이어도 다시 실행')
+    parser.add_argument('--dry-run', action='store_true', help='실행하지 않고 계획만 출력')
+    parser.add_argument('--list', action='store_true', help='단계와 의존 관계 출력')
+    parser.add_argument('--profile', nargs='+', default=[], metavar='STAGE', help='프로파일러로 실행할 단계')
+    parser.add_argument('--profiler', choices=PROFILERS, default='cprofile', help='프로파일러 (기본: cprofile)')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        deps = build_dag(STAGES)
+        scripts = {stage.name: stage.script for stage in STAGES}
+        for name in topological_order(deps):
+            after = f" ← {', '.join(sorted(deps[name]))}" if deps[name] else ''
+            print(f"{name:<20} {scripts[name]}{after}")
+        return 0
+
+    run_id, start = new_run_id(), time.perf_counter()
+    try:
+        results = run_pipeline(STAGES, args.targets, jobs=args.jobs, force=args.force, dry_run=args.dry_run,
+                               run_id=run_id, profile=args.profile, profiler=args.profiler)
+    except KeyError as e:
+        print(f"❌ {e}")
+        return 1
+
+    print("\n[파이프라인 결과]")
+    for name, (status, reason, seconds) in results.items():
+        label = STATUS_LABELS.get(status, '건너뜀')
+        print(f" - {name:<20} {label:<4} {reason}" + (f" ({seconds:.1f}s)" if status in (RAN, FAILED) else ''))
+
+    if not args.dry_run and any(status in (RAN, FAILED) for status, _, _ in results.values()):
+        path, summary = write_run_report(run_id, results, time.perf_counter() - start)
+        print(f"📊 실행 리포트: {path}")
+        for r in summary['regressions']:
+            print(f"⚠️ 직전 실행 대비 회귀: {r['stage']} {r['metric']} {r['previous']} → {r['current']}")
+    failed = [name for name, (status, _, _) in results.items() if status == FAILED]
+    if failed:
+        print(f"❌ 실패한 단계: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())